@@ -8,17 +8,21 @@ Flask wrapper for LocalRankLens to run on Heroku.
 import os
 import sys
 import json
-import tempfile
 import logging
+import time
+import threading
 from pathlib import Path
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 
 # Add src directory to Python path
 src_path = Path(__file__).parent / 'src'
 sys.path.insert(0, str(src_path))
 
-from localranklens import LocalRankLens
+from app_context import AppContext
+from report_writer import precompile_templates
+from metrics import get_registry
+from job_queue import JobStore, JobQueue, COMPLETED, FAILED, TERMINAL_EVENTS
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend
@@ -27,6 +31,32 @@ CORS(app)  # Enable CORS for frontend
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Background analysis jobs
+JOB_DB = os.environ.get('JOB_DB', 'cache/jobs.sqlite3')
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_STALE_SECONDS = float(os.environ.get('JOB_STALE_SECONDS', 3600))
+# Seconds between SerpAPI key revalidations for the shared scraper
+SERPAPI_REVALIDATE_SECONDS = float(os.environ.get('SERPAPI_REVALIDATE_SECONDS', 3600))
+# Stay under the gunicorn timeout when /api/analyze waits for the PDF
+ANALYZE_SYNC_TIMEOUT = float(os.environ.get('ANALYZE_SYNC_TIMEOUT', 100))
+# Progress streams poll the job's event log at this interval (seconds)
+EVENT_POLL_INTERVAL = 0.25
+EVENT_HEARTBEAT_SECONDS = 15
+# Streams end after this long so a stuck job cannot hold a server thread;
+# clients reconnect with Last-Event-ID
+EVENT_STREAM_MAX_SECONDS = float(os.environ.get('EVENT_STREAM_MAX_SECONDS', 300))
+# A finished job whose terminal event is still missing after this long gets
+# one synthesized from its record
+TERMINAL_EVENT_GRACE_SECONDS = 10
+
+# Compile report templates once per worker so the first report renders warm
+if os.environ.get('PRECOMPILE_TEMPLATES', 'true').lower() in ('1', 'true', 'yes'):
+    try:
+        compiled = precompile_templates('templates', os.environ.get('TEMPLATE_CACHE_DIR', 'cache/templates') or None)
+        logger.info(f"Precompiled {compiled} report templates")
+    except Exception as e:
+        logger.warning(f"Template precompilation failed: {e}")
+
 @app.route('/', methods=['GET'])
 def health_check():
     """Health check endpoint."""
@@ -36,6 +66,113 @@ def health_check():
         'version': '1.0.0'
     })
 
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Expose pipeline timers and counters in the Prometheus text format."""
+    return Response(
+        get_registry().render_prometheus(),
+        mimetype='text/plain; version=0.0.4'
+    )
+
+def _build_analysis_config(data):
+    """
+    Build a LocalRankLens config from an analyze payload.
+
+    Returns:
+        Tuple of (config, error message); the config is None on invalid input
+    """
+    # Validate required fields
+    if not data or not data.get('business_name') or not data.get('location') or not data.get('keywords'):
+        return None, 'Missing required fields: business_name, location, or keywords'
+
+    # Process keywords - convert from textarea string to structured format
+    keyword_lines = [line.strip() for line in data['keywords'].split('\n') if line.strip()]
+
+    if not keyword_lines:
+        return None, 'No valid keywords provided'
+
+    # Create structured config for LocalRankLens
+    config = {
+        "business_name": data['business_name'],
+        "location": {
+            "city": data['location']['city'],
+            "state": data['location']['state']
+        },
+        "keywords": {
+            "core": keyword_lines  # Use all keywords in one group to avoid multiplying API calls
+        },
+        "output_prefix": data['business_name'].lower().replace(' ', '-').replace('&', 'and')
+    }
+    return config, None
+
+_app_context = None
+_app_context_lock = threading.Lock()
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+def get_app_context():
+    """Get this worker's shared pipeline components, building them on first use."""
+    global _app_context
+    with _app_context_lock:
+        if _app_context is None:
+            _app_context = AppContext(revalidate_interval=SERPAPI_REVALIDATE_SECONDS)
+        return _app_context
+
+def run_analysis_job(job_id, payload, progress):
+    """Run one queued analysis and return its report path."""
+    config = payload['config']
+    logger.info(f"Starting analysis for {config['business_name']} (job {job_id})")
+    lrl = get_app_context().create_analysis(config, report_format=payload.get('format', 'pdf'))
+    return os.path.abspath(lrl.run_analysis(progress_callback=progress))
+
+def get_job_queue():
+    """Get the worker pool, starting it on first use (after gunicorn forks)."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            store = JobStore(JOB_DB)
+            requeued = store.requeue_stale(JOB_STALE_SECONDS)
+            if requeued:
+                logger.info(f"Requeued {requeued} abandoned jobs")
+            _job_queue = JobQueue(store, run_analysis_job, workers=JOB_WORKERS).start()
+        return _job_queue
+
+def _job_status(job):
+    """Public view of a job record."""
+    status = {
+        'job_id': job['id'],
+        'status': job['status'],
+        'progress': {
+            'done': job['progress_done'],
+            'total': job['progress_total']
+        },
+        'status_url': f"/api/jobs/{job['id']}",
+        'created_at': job['created_at'],
+        'started_at': job['started_at'],
+        'finished_at': job['finished_at']
+    }
+    if job['status'] == COMPLETED:
+        status['report_url'] = f"/api/jobs/{job['id']}/report"
+    status['events_url'] = f"/api/jobs/{job['id']}/events"
+    if job['status'] == FAILED:
+        status['error'] = job['error']
+    return status
+
+def _submit_analysis(data):
+    """Validate an analyze payload and queue it; returns (job id, error response)."""
+    config, error = _build_analysis_config(data)
+    if error:
+        return None, (jsonify({'error': error}), 400)
+
+    report_format = data.get('format', 'pdf')
+    if report_format not in ('pdf', 'html'):
+        return None, (jsonify({'error': "format must be 'pdf' or 'html'"}), 400)
+
+    job_id = get_job_queue().submit({'config': config, 'format': report_format})
+    logger.info(f"Queued analysis for {config['business_name']} with "
+                f"{len(config['keywords']['core'])} keywords as job {job_id}")
+    return job_id, None
+
 @app.route('/api/analyze', methods=['POST'])
 def analyze():
     """
@@ -48,75 +185,181 @@ def analyze():
             "city": "City",
             "state": "State"
         },
-        "keywords": "keyword1\nkeyword2\nkeyword3"
+        "keywords": "keyword1\nkeyword2\nkeyword3",
+        "format": "pdf"
     }
+
+    The analysis runs on the background job queue. The PDF is returned
+    directly if it finishes within ANALYZE_SYNC_TIMEOUT seconds; otherwise,
+    or when called with ``?async=true``, the response is 202 with the job
+    status to poll.
     """
     try:
-        data = request.get_json()
-        
-        # Validate required fields
-        if not data or not data.get('business_name') or not data.get('location') or not data.get('keywords'):
-            return jsonify({'error': 'Missing required fields: business_name, location, or keywords'}), 400
-        
-        # Process keywords - convert from textarea string to structured format
-        keyword_lines = [line.strip() for line in data['keywords'].split('\n') if line.strip()]
+        job_id, error_response = _submit_analysis(request.get_json())
+        if error_response:
+            return error_response
 
-        if not keyword_lines:
-            return jsonify({'error': 'No valid keywords provided'}), 400
+        job_queue = get_job_queue()
+        if request.args.get('async', '').lower() in ('1', 'true', 'yes'):
+            return jsonify(_job_status(job_queue.store.get(job_id))), 202
 
-        # Limit total keywords to avoid timeout (max 3 keywords total)
-        if len(keyword_lines) > 3:
-            keyword_lines = keyword_lines[:3]
-            logger.info(f"Limited keywords to first 3 to avoid timeout: {keyword_lines}")
-        
-        # Create structured config for LocalRankLens
-        config = {
-            "business_name": data['business_name'],
-            "location": {
-                "city": data['location']['city'],
-                "state": data['location']['state']
-            },
-            "keywords": {
-                "core": keyword_lines  # Use all keywords in one group to avoid multiplying API calls
-            },
-            "output_prefix": data['business_name'].lower().replace(' ', '-').replace('&', 'and')
-        }
-        
-        # Create temporary config file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as temp_config:
-            json.dump(config, temp_config, indent=2)
-            temp_config_path = temp_config.name
-        
-        try:
-            # Run LocalRankLens analysis
-            logger.info(f"Starting analysis for {config['business_name']}")
-            lrl = LocalRankLens(config_path=temp_config_path)
-            report_path = lrl.run_analysis()
-
-            logger.info(f"Analysis complete. Report saved to: {report_path}")
-
-            # Clean up temp config file
-            os.unlink(temp_config_path)
-
-            # Return PDF file for download
-            pdf_filename = f"{config['business_name'].lower().replace(' ', '-')}_report.pdf"
-            return send_file(
-                report_path,
-                as_attachment=True,
-                download_name=pdf_filename,
-                mimetype='application/pdf'
-            )
-            
-        except Exception as e:
-            # Clean up temp config file on error
-            if os.path.exists(temp_config_path):
-                os.unlink(temp_config_path)
-            raise e
+        job = job_queue.wait(job_id, ANALYZE_SYNC_TIMEOUT)
+        if job['status'] == FAILED:
+            return jsonify({'error': f"Analysis failed: {job['error']}", 'job_id': job_id}), 500
+        if job['status'] != COMPLETED:
+            return jsonify(_job_status(job)), 202
+
+        logger.info(f"Analysis complete. Report saved to: {job['report_path']}")
+        return _send_report(job)
             
     except Exception as e:
         logger.error(f"Analysis failed: {str(e)}")
         return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
 
+@app.route('/api/jobs', methods=['POST'])
+def create_job():
+    """Queue an analysis (same payload as /api/analyze) and return its job id."""
+    try:
+        job_id, error_response = _submit_analysis(request.get_json())
+        if error_response:
+            return error_response
+        return jsonify(_job_status(get_job_queue().store.get(job_id))), 202
+
+    except Exception as e:
+        logger.error(f"Job submission failed: {str(e)}")
+        return jsonify({'error': f'Job submission failed: {str(e)}'}), 500
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Get a job's status and progress (keywords done/total)."""
+    job = get_job_queue().store.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(_job_status(job))
+
+@app.route('/api/jobs/<job_id>/report', methods=['GET'])
+def job_report(job_id):
+    """Download a finished job's PDF or HTML report."""
+    job = get_job_queue().store.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] != COMPLETED:
+        return jsonify(_job_status(job)), 409
+    if not os.path.exists(job['report_path']):
+        return jsonify({'error': 'Report is no longer available'}), 410
+    return _send_report(job)
+
+def _public_event(job_id, event):
+    """Client view of a progress event: report URLs instead of server paths."""
+    event = dict(event, job_id=job_id)
+    report_path = event.pop('report_path', None)
+    if report_path is not None:
+        event['report_url'] = f"/api/jobs/{job_id}/report"
+    return event
+
+def _stream_job_events(job_id, ndjson=False, after=0):
+    """
+    Stream a job's progress events until it completes or fails.
+
+    Events are sent as Server-Sent Events (``id`` is the sequence number, so
+    clients can resume with Last-Event-ID) or as newline-delimited JSON. A
+    finished job whose terminal event was never recorded gets one built from
+    its record, and streams end after ``EVENT_STREAM_MAX_SECONDS``.
+    """
+    store = get_job_queue().store
+
+    def format_event(seq, event):
+        payload = json.dumps(_public_event(job_id, event))
+        if ndjson:
+            return payload + '\n'
+        return (f"id: {seq}\n" if seq is not None else '') + f"event: {event['type']}\ndata: {payload}\n\n"
+
+    def generate():
+        last_seq = after
+        started = last_sent = time.monotonic()
+        while True:
+            for seq, event in store.get_events(job_id, last_seq):
+                last_seq = seq
+                last_sent = time.monotonic()
+                yield format_event(seq, event)
+                if event['type'] in TERMINAL_EVENTS:
+                    return
+
+            job = store.get(job_id)
+            if job is None:
+                return
+            if job['status'] in (COMPLETED, FAILED) and \
+                    time.time() - (job['finished_at'] or 0) >= TERMINAL_EVENT_GRACE_SECONDS:
+                if job['status'] == COMPLETED:
+                    yield format_event(None, {'type': 'completed', 'report_path': job['report_path']})
+                else:
+                    yield format_event(None, {'type': 'failed', 'error': job['error']})
+                return
+            if time.monotonic() - started >= EVENT_STREAM_MAX_SECONDS:
+                return
+
+            if time.monotonic() - last_sent >= EVENT_HEARTBEAT_SECONDS:
+                # Keep proxies from closing an idle stream
+                yield '\n' if ndjson else ': keep-alive\n\n'
+                last_sent = time.monotonic()
+            time.sleep(EVENT_POLL_INTERVAL)
+
+    mimetype = 'application/x-ndjson' if ndjson else 'text/event-stream'
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def _wants_ndjson():
+    return (request.args.get('format') == 'ndjson'
+            or 'application/x-ndjson' in request.headers.get('Accept', ''))
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """
+    Stream a job's progress: one event per processed keyword with its top
+    competitors, then a final ``completed`` event with the report URL (or
+    ``failed``). SSE by default; NDJSON with ``?format=ndjson``.
+    """
+    if get_job_queue().store.get(job_id) is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    try:
+        after = int(request.headers.get('Last-Event-ID') or request.args.get('after', 0))
+    except ValueError:
+        return jsonify({'error': 'Invalid event id'}), 400
+    return _stream_job_events(job_id, ndjson=_wants_ndjson(), after=after)
+
+@app.route('/api/analyze/stream', methods=['POST'])
+def analyze_stream():
+    """Queue an analysis (same payload as /api/analyze) and stream its progress events."""
+    try:
+        job_id, error_response = _submit_analysis(request.get_json())
+        if error_response:
+            return error_response
+        return _stream_job_events(job_id, ndjson=_wants_ndjson())
+
+    except Exception as e:
+        logger.error(f"Analysis failed: {str(e)}")
+        return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
+
+def _send_report(job):
+    """Send a finished job's report file."""
+    report_path = job['report_path']
+    business_name = job['payload']['config']['business_name']
+    if report_path.endswith('.html'):
+        return send_file(report_path, mimetype='text/html')
+
+    # Return PDF file for download
+    pdf_filename = f"{business_name.lower().replace(' ', '-')}_report.pdf"
+    return send_file(
+        report_path,
+        as_attachment=True,
+        download_name=pdf_filename,
+        mimetype='application/pdf'
+    )
+
 @app.route('/api/config', methods=['POST'])
 def generate_config():
     """
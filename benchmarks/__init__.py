@@ -0,0 +1,6 @@
+"""
+LocalRankLens benchmark suite.
+
+Synthetic-load benchmarks for the analysis pipeline. Run from the repository
+root, e.g. ``python benchmarks/bench_pipeline.py --sizes 1,100,1000``.
+"""
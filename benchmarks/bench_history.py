@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+History store benchmark for LocalRankLens
+
+Fills a SQLite history store with daily runs for many businesses (synthetic
+processed results), then times the query APIs against it:
+
+- rank_history:   one keyword's daily positions for a business
+- movers:         position changes between the two latest days
+- share_of_voice: per-day competitor shares over the last 30 days
+
+The defaults (50 businesses x 20 keywords x 90 days) append roughly a
+million result rows. Pass ``--db`` to reuse a filled database.
+
+Usage:
+    python benchmarks/bench_history.py --businesses 50 --keywords 20 --days 90
+"""
+
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT))
+
+from data_processor import DataProcessor
+from history_store import HistoryStore, RESULT_TABLES
+from benchmarks.synthetic import SyntheticSerpGenerator
+from benchmarks.bench_pipeline import measure, git_revision
+
+LOCATION = 'Spokane, WA'
+
+
+def fill(store: HistoryStore, businesses: int, keywords: int, days: int, seed: int) -> Dict[str, Any]:
+    """Append one run per business per day."""
+    generator = SyntheticSerpGenerator(seed=seed)
+    processor = DataProcessor()
+    rng = random.Random(seed)
+
+    # A few processed variants per keyword, reshuffled per run, keep filling cheap
+    pairs = generator.keywords(keywords)
+    variants = {
+        keyword: [processor.process_search_results(generator.response(keyword), keyword, group) for _ in range(4)]
+        for keyword, group in pairs
+    }
+
+    start_day = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0) - timedelta(days=days)
+    started = time.perf_counter()
+    for day in range(days):
+        observed_at = (start_day + timedelta(days=day)).timestamp()
+        for business in range(businesses):
+            results = [rng.choice(variants[keyword]) for keyword, _ in pairs]
+            store.record_run(f"Business {business}", LOCATION, results, observed_at=observed_at)
+    elapsed = time.perf_counter() - started
+
+    runs = businesses * days
+    return {
+        'runs': runs,
+        'observations': store.count(),
+        'result_rows': sum(store.count(table) for table in RESULT_TABLES),
+        'seconds': elapsed,
+        'runs_per_second': runs / elapsed if elapsed else 0.0,
+        'first_keyword': pairs[0][0]
+    }
+
+
+def bench_queries(store: HistoryStore, keyword: str, repeat: int) -> Dict[str, Any]:
+    """Time each query API for a business in the middle of the data set."""
+    business = 'Business 0'
+    top = store.share_of_voice(business, LOCATION, limit=1)
+    competitor = top[-1]['competitors'][0]['competitor'] if top else None
+    last_day = top[-1]['date'] if top else None
+    since = (datetime.strptime(last_day, '%Y-%m-%d') - timedelta(days=30)).strftime('%Y-%m-%d') if last_day else None
+
+    return {
+        'rank_history': measure(lambda: store.rank_history(business, LOCATION, keyword), repeat),
+        'rank_history_competitor': measure(
+            lambda: store.rank_history(business, LOCATION, keyword, competitor=competitor), repeat
+        ),
+        'movers': measure(lambda: store.movers(business, LOCATION), repeat),
+        'movers_maps': measure(lambda: store.movers(business, LOCATION, kind='maps_listings'), repeat),
+        'share_of_voice_30d': measure(lambda: store.share_of_voice(business, LOCATION, since=since), repeat),
+    }
+
+
+def main() -> int:
+    """Run the history store benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Benchmark the LocalRankLens history store")
+    parser.add_argument('--businesses', type=int, default=50)
+    parser.add_argument('--keywords', type=int, default=20, help='Keywords per business')
+    parser.add_argument('--days', type=int, default=90)
+    parser.add_argument('--repeat', type=int, default=20, help='Timed runs per query')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', help='Existing or new database file (default: temporary)')
+    parser.add_argument('--output', help='JSON results file (default: benchmarks/results/history_<timestamp>.json)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = HistoryStore(args.db or str(Path(tmp_dir) / 'history.sqlite3'))
+        generator = SyntheticSerpGenerator(seed=args.seed)
+        if store.count() == 0:
+            print(f"Filling {args.businesses} businesses x {args.keywords} keywords x {args.days} days...",
+                  flush=True)
+            fill_stats = fill(store, args.businesses, args.keywords, args.days, args.seed)
+        else:
+            fill_stats = {'observations': store.count(),
+                          'result_rows': sum(store.count(table) for table in RESULT_TABLES)}
+
+        queries = bench_queries(store, generator.keywords(1)[0][0], args.repeat)
+        store.close()
+
+    results = {
+        'benchmark': 'history',
+        'timestamp': datetime.now().isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'fill': fill_stats,
+        'queries': queries
+    }
+
+    output_path = Path(args.output) if args.output else (
+        ROOT / 'benchmarks' / 'results' / f"history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\n{fill_stats['observations']} observations, {fill_stats['result_rows']} result rows")
+    if 'seconds' in fill_stats:
+        print(f"Fill: {fill_stats['seconds']:.1f}s ({fill_stats['runs_per_second']:.0f} runs/s)")
+    print(f"\n{'query':<26} {'p50 ms':>10} {'p95 ms':>10}")
+    for name, stats in queries.items():
+        print(f"{name:<26} {stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f}")
+    print(f"\nResults written to {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+PDF engine benchmark for LocalRankLens
+
+Compares the PDF backends on the same synthetic report data:
+
+- xhtml2pdf: Jinja render + PDF styles + HTML/CSS conversion
+- reportlab: platypus layout built directly from the template data
+
+Each engine is timed end to end from the prepared template data, so the
+xhtml2pdf numbers include the template render it depends on. For every
+keyword count it reports latency percentiles, peak traced memory and the
+size of the written PDF, and writes the results as JSON.
+
+Usage:
+    python benchmarks/bench_pdf_engines.py --sizes 1,10,50,100
+"""
+
+import sys
+import json
+import logging
+import argparse
+import platform
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT))
+
+from data_processor import DataProcessor
+from report_writer import ReportWriter
+from pdf_backends import PDF_BACKENDS
+from benchmarks.synthetic import SyntheticSerpGenerator
+from benchmarks.bench_pipeline import measure, git_revision
+
+DEFAULT_SIZES = [1, 10, 50, 100]
+
+
+def bench_size(size: int, engines: List[str], repeat: int, output_dir: str, seed: int) -> Dict[str, Any]:
+    """Render one synthetic report with every engine."""
+    generator = SyntheticSerpGenerator(seed=seed)
+    processor = DataProcessor()
+    results = [processor.process_search_results(response, keyword, group)
+               for keyword, group, response in generator.responses(size)]
+    aggregated = processor.aggregate_results(results)
+
+    run = {'keywords': size, 'engines': {}}
+    for engine in engines:
+        writer = ReportWriter(template_dir=str(ROOT / 'templates'), output_dir=output_dir, pdf_backend=engine)
+        if not writer.pdf_backend.available:
+            run['engines'][engine] = {'error': f"{writer.pdf_backend.requirement} not installed"}
+            continue
+
+        template_data = writer._prepare_template_data(aggregated, 'Benchmark Business', 'Spokane, WA')
+        paths = []
+        try:
+            stats = measure(lambda: paths.append(writer._generate_pdf_report(template_data, engine)), repeat)
+        except Exception as e:
+            run['engines'][engine] = {'error': str(e).splitlines()[0]}
+            continue
+
+        stats['pdf_bytes'] = Path(paths[-1]).stat().st_size
+        run['engines'][engine] = stats
+        for path in paths:
+            Path(path).unlink(missing_ok=True)
+    return run
+
+
+def print_table(results: Dict[str, Any]) -> None:
+    """Print a compact per-engine table."""
+    print(f"{'keywords':>8} {'engine':<10} {'p50 ms':>10} {'p95 ms':>10} {'peak KB':>10} {'PDF KB':>9}")
+    for run in results['runs']:
+        for engine, stats in run['engines'].items():
+            if 'error' in stats:
+                print(f"{run['keywords']:>8} {engine:<10} error: {stats['error']}")
+                continue
+            print(f"{run['keywords']:>8} {engine:<10} {stats['p50_ms']:>10.1f} {stats['p95_ms']:>10.1f} "
+                  f"{stats['peak_memory_kb']:>10.1f} {stats['pdf_bytes'] / 1024:>9.1f}")
+
+
+def main() -> int:
+    """Run the PDF engine benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Compare LocalRankLens PDF engines")
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='Comma-separated keyword counts')
+    parser.add_argument('--engines', default=','.join(PDF_BACKENDS), help='Comma-separated engines')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per engine')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='JSON results file (default: benchmarks/results/pdf_engines_<timestamp>.json)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.disable(logging.INFO)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    engines = [engine.strip() for engine in args.engines.split(',') if engine.strip()]
+
+    results = {
+        'benchmark': 'pdf_engines',
+        'timestamp': datetime.now().isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'runs': []
+    }
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        for size in sizes:
+            print(f"Benchmarking {size} keywords...", flush=True)
+            results['runs'].append(bench_size(size, engines, args.repeat, output_dir, args.seed))
+
+    output_path = Path(args.output) if args.output else (
+        ROOT / 'benchmarks' / 'results' / f"pdf_engines_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    print()
+    print_table(results)
+    print(f"\nResults written to {output_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
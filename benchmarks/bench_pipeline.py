@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+End-to-end pipeline benchmark for LocalRankLens
+
+Times each stage of the analysis pipeline on synthetic SerpAPI payloads:
+
+- process:   DataProcessor.process_search_results (one sample per keyword)
+- aggregate: DataProcessor.aggregate_results
+- insights:  ReportWriter._generate_insights
+- summary:   ReportWriter.generate_summary_report
+- columnar:  ColumnarResults build plus group stats, rankings and rating averages
+             (NumPy when installed)
+- render:    ReportWriter._render_template (Jinja, report_template.html)
+- pdf:       ReportWriter._generate_pdf_report (xhtml2pdf)
+
+For every keyword count it reports latency percentiles and peak traced
+memory per stage, and writes the results as JSON so runs can be compared
+between releases (``--baseline``).
+
+Usage:
+    python benchmarks/bench_pipeline.py --sizes 1,10,100,1000,10000
+"""
+
+import sys
+import gc
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Callable, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'src'))
+sys.path.insert(0, str(ROOT))
+
+from data_processor import DataProcessor
+from report_writer import ReportWriter
+from columnar import ColumnarResults
+from benchmarks.synthetic import SyntheticSerpGenerator
+
+DEFAULT_SIZES = [1, 10, 100, 1000, 10000]
+PERCENTILES = [50, 90, 95, 99]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: List[float], peak_bytes: int) -> Dict[str, Any]:
+    """Summarize latency samples (seconds) as milliseconds plus peak memory."""
+    ordered = sorted(samples)
+    stats = {
+        'samples': len(ordered),
+        'mean_ms': (sum(ordered) / len(ordered) * 1000) if ordered else 0.0,
+        'min_ms': ordered[0] * 1000 if ordered else 0.0,
+        'max_ms': ordered[-1] * 1000 if ordered else 0.0,
+        'total_ms': sum(ordered) * 1000,
+        'peak_memory_kb': peak_bytes / 1024
+    }
+    for pct in PERCENTILES:
+        stats[f'p{pct}_ms'] = percentile(ordered, pct) * 1000
+    return stats
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """
+    Time ``fn`` ``repeat`` times, then run it once more under tracemalloc.
+
+    Timing runs are untraced so tracemalloc overhead doesn't skew latency.
+    """
+    samples = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        fn()
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    return summarize(samples, peak)
+
+
+def bench_process(generator: SyntheticSerpGenerator, processor: DataProcessor,
+                  size: int) -> (Dict[str, Any], List[Dict[str, Any]]):
+    """Process ``size`` synthetic responses, timing each call."""
+    samples = []
+    peak = 0
+    results = []
+
+    tracemalloc.start()
+    try:
+        for keyword, group, response in generator.responses(size):
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            start = time.perf_counter()
+            results.append(processor.process_search_results(response, keyword, group))
+            samples.append(time.perf_counter() - start)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+
+    stats = summarize(samples, peak)
+    stats['payload_bytes_sample'] = len(json.dumps(generator.response('sample')))
+    return stats, results
+
+
+def columnar_aggregate(all_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build a columnar store and compute the report's group and competitor aggregates."""
+    store = ColumnarResults.from_results(all_results)
+    return {
+        'groups': store.group_stats(),
+        'top_maps': store.competitor_rankings('maps_listings', 5),
+        'top_organic': store.competitor_rankings('organic_results', 5),
+        'ratings': store.rating_stats(),
+        'reviews': store.review_stats()
+    }
+
+
+def bench_size(size: int, repeat: int, pdf_max_keywords: int, output_dir: str,
+               seed: int, skip: List[str]) -> Dict[str, Any]:
+    """Run every stage for one keyword count."""
+    generator = SyntheticSerpGenerator(seed=seed)
+    processor = DataProcessor()
+    writer = ReportWriter(template_dir=str(ROOT / 'templates'), output_dir=output_dir)
+    stages = {}
+
+    process_stats, all_results = bench_process(generator, processor, size)
+    stages['process'] = process_stats
+
+    aggregated = processor.aggregate_results(all_results)
+    stages['aggregate'] = measure(lambda: processor.aggregate_results(all_results), repeat)
+    stages['insights'] = measure(lambda: writer._generate_insights(aggregated), repeat)
+    stages['summary'] = measure(
+        lambda: writer.generate_summary_report(aggregated, 'Benchmark Business', 'Spokane, WA'),
+        repeat
+    )
+
+    if 'columnar' not in skip:
+        stages['columnar'] = measure(lambda: columnar_aggregate(all_results), repeat)
+
+    template_data = writer._prepare_template_data(aggregated, 'Benchmark Business', 'Spokane, WA')
+    if 'render' not in skip:
+        stages['render'] = measure(lambda: writer._render_template(template_data), repeat)
+
+    if 'pdf' not in skip and writer.pdf_backend.available and size <= pdf_max_keywords:
+        html = writer._render_template(template_data)
+        try:
+            stages['pdf'] = measure(
+                lambda: writer._generate_pdf_report(template_data, 'benchmark', html), max(1, repeat // 5)
+            )
+        except Exception as e:
+            stages['pdf'] = {'error': str(e).splitlines()[0]}
+
+    return {'keywords': size, 'stages': stages}
+
+
+def git_revision() -> Optional[str]:
+    """Current git commit, if available."""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=str(ROOT), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compare p50 latencies against a baseline run.
+
+    Returns:
+        Human-readable regressions above ``threshold`` (e.g. 0.2 = 20% slower)
+    """
+    regressions = []
+    baseline_by_size = {run['keywords']: run['stages'] for run in baseline.get('runs', [])}
+
+    for run in current['runs']:
+        old_stages = baseline_by_size.get(run['keywords'], {})
+        for stage, stats in run['stages'].items():
+            old = old_stages.get(stage, {})
+            if 'p50_ms' not in stats or not old.get('p50_ms'):
+                continue
+            change = stats['p50_ms'] / old['p50_ms'] - 1
+            if change > threshold:
+                regressions.append(
+                    f"{stage} @ {run['keywords']} keywords: p50 {old['p50_ms']:.3f}ms -> "
+                    f"{stats['p50_ms']:.3f}ms (+{change:.0%})"
+                )
+    return regressions
+
+
+def print_table(results: Dict[str, Any]) -> None:
+    """Print a compact per-stage table."""
+    print(f"{'keywords':>8} {'stage':<10} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} "
+          f"{'total ms':>11} {'peak KB':>10}")
+    for run in results['runs']:
+        for stage, stats in run['stages'].items():
+            if 'error' in stats:
+                print(f"{run['keywords']:>8} {stage:<10} error: {stats['error']}")
+                continue
+            print(f"{run['keywords']:>8} {stage:<10} {stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f} "
+                  f"{stats['p99_ms']:>10.3f} {stats['total_ms']:>11.1f} {stats['peak_memory_kb']:>10.1f}")
+
+
+def main() -> int:
+    """Run the pipeline benchmark from the command line."""
+    parser = argparse.ArgumentParser(description="Benchmark the LocalRankLens analysis pipeline")
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='Comma-separated keyword counts')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed runs per stage')
+    parser.add_argument('--pdf-max-keywords', type=int, default=100,
+                        help='Skip PDF generation above this keyword count')
+    parser.add_argument('--skip', default='', help='Comma-separated stages to skip (columnar, render, pdf)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='JSON results file (default: benchmarks/results/pipeline_<timestamp>.json)')
+    parser.add_argument('--baseline', help='Previous results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Allowed p50 slowdown versus the baseline before failing')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    logging.disable(logging.INFO)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    skip = [stage.strip() for stage in args.skip.split(',') if stage.strip()]
+
+    results = {
+        'benchmark': 'pipeline',
+        'timestamp': datetime.now().isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'runs': []
+    }
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        for size in sizes:
+            print(f"Benchmarking {size} keywords...", flush=True)
+            results['runs'].append(
+                bench_size(size, args.repeat, args.pdf_max_keywords, output_dir, args.seed, skip)
+            )
+
+    output_path = Path(args.output) if args.output else (
+        ROOT / 'benchmarks' / 'results' / f"pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    print()
+    print_table(results)
+    print(f"\nResults written to {output_path}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print("\nNo regressions against baseline")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Synthetic SerpAPI payloads for LocalRankLens benchmarks
+
+Generates responses shaped like ``debug_raw_response.json`` (local pack,
+organic results, related questions, filters, pagination and so on) with
+varied competitors, so benchmarks exercise realistic payload sizes and
+competitor overlap without calling SerpAPI.
+"""
+
+import copy
+import json
+import random
+from pathlib import Path
+from typing import Dict, Any, List, Tuple, Iterator
+
+TEMPLATE_PATH = Path(__file__).parent.parent / 'debug_raw_response.json'
+
+KEYWORD_GROUPS = ['core', 'upsell', 'efficiency', 'emergency']
+
+SERVICES = ['sprinkler repair', 'irrigation installation', 'sprinkler blowout',
+            'drip irrigation', 'smart irrigation controller', 'lawn sprinkler startup',
+            'backflow testing', 'irrigation winterization']
+
+MODIFIERS = ['', 'near me', 'cost', 'best', 'emergency', 'residential', 'commercial', 'company']
+
+
+class SyntheticSerpGenerator:
+    """Builds deterministic synthetic SerpAPI responses for benchmarking."""
+
+    def __init__(self, seed: int = 42, competitor_pool: int = 60, domain_pool: int = 120,
+                 template_path: Path = TEMPLATE_PATH):
+        """
+        Initialize the generator.
+
+        Args:
+            seed: Random seed so runs are reproducible
+            competitor_pool: Number of distinct Maps businesses to draw from
+            domain_pool: Number of distinct organic domains to draw from
+            template_path: Recorded response used for the filler sections
+        """
+        self.random = random.Random(seed)
+        with open(template_path, 'r', encoding='utf-8') as f:
+            self.template = json.load(f)
+
+        self.place_template = self.template['local_results']['places'][0]
+        self.organic_template = self.template['organic_results'][0]
+        self.competitors = [f"Competitor {i} Sprinklers" for i in range(competitor_pool)]
+        self.domains = [f"competitor{i}.com" for i in range(domain_pool)]
+
+    def keywords(self, count: int) -> List[Tuple[str, str]]:
+        """Return ``count`` (keyword, group) pairs spread over the keyword groups."""
+        pairs = []
+        for i in range(count):
+            service = SERVICES[i % len(SERVICES)]
+            modifier = MODIFIERS[(i // len(SERVICES)) % len(MODIFIERS)]
+            keyword = ' '.join(part for part in [service, modifier, 'Spokane', str(i)] if part)
+            pairs.append((keyword, KEYWORD_GROUPS[i % len(KEYWORD_GROUPS)]))
+        return pairs
+
+    def response(self, keyword: str) -> Dict[str, Any]:
+        """Build one synthetic SerpAPI response for a keyword."""
+        data = {
+            'search_metadata': dict(self.template['search_metadata'], query=keyword),
+            'search_parameters': dict(self.template['search_parameters'], q=keyword),
+            'search_information': self.template['search_information'],
+            'local_map': self.template['local_map'],
+            'local_results': {'places': [self._place(i + 1) for i in range(self.random.randint(3, 5))]},
+            'related_questions': copy.deepcopy(self.template['related_questions']),
+            'organic_results': [self._organic(i + 1) for i in range(10)],
+            'filters': copy.deepcopy(self.template['filters']),
+            'related_searches': copy.deepcopy(self.template['related_searches']),
+            'pagination': self.template['pagination'],
+            'serpapi_pagination': self.template['serpapi_pagination']
+        }
+
+        if self.random.random() < 0.3:
+            data['local_services'] = [self._local_service(i + 1) for i in range(3)]
+        if self.random.random() < 0.4:
+            data['ads'] = [self._ad(i + 1) for i in range(2)]
+        return data
+
+    def responses(self, count: int) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Yield (keyword, group, response) triples for ``count`` keywords."""
+        for keyword, group in self.keywords(count):
+            yield keyword, group, self.response(keyword)
+
+    def _place(self, position: int) -> Dict[str, Any]:
+        name = self.random.choice(self.competitors)
+        place = copy.deepcopy(self.place_template)
+        place.update({
+            'position': position,
+            'title': name,
+            'place_id': str(abs(hash(name)) % 10 ** 19),
+            'rating': round(self.random.uniform(3.5, 5.0), 1),
+            'reviews': self.random.randint(0, 1500),
+            'phone': f"(509) 555-{self.random.randint(1000, 9999)}"
+        })
+        return place
+
+    def _organic(self, position: int) -> Dict[str, Any]:
+        domain = self.random.choice(self.domains)
+        result = copy.deepcopy(self.organic_template)
+        result.update({
+            'position': position,
+            'title': f"{domain} | Sprinkler Services in Spokane, WA",
+            'link': f"https://www.{domain}/services/{position}",
+            'displayed_link': f"https://www.{domain}",
+            'source': domain
+        })
+        return result
+
+    def _local_service(self, position: int) -> Dict[str, Any]:
+        return {
+            'position': position,
+            'title': self.random.choice(self.competitors),
+            'phone': f"(509) 555-{self.random.randint(1000, 9999)}",
+            'rating': round(self.random.uniform(3.5, 5.0), 1),
+            'reviews': self.random.randint(0, 500),
+            'years_in_business': f"{self.random.randint(1, 30)}+ years in business",
+            'service_areas': ['Spokane', 'Spokane Valley']
+        }
+
+    def _ad(self, position: int) -> Dict[str, Any]:
+        domain = self.random.choice(self.domains)
+        return {
+            'position': position,
+            'title': f"{domain} - Sprinkler Experts",
+            'link': f"https://{domain}/offer",
+            'displayed_link': domain,
+            'snippet': 'Fast, reliable sprinkler service. Book online today.',
+            'extensions': ['Free Estimates', 'Licensed & Insured']
+        }
@@ -15,6 +15,7 @@ from config_manager import ConfigManager
 from search_scraper import SearchScraper
 from data_processor import DataProcessor
 from report_writer import ReportWriter
+from records import json_default
 
 def setup_debug_logging():
     """Setup detailed logging for debugging."""
@@ -71,7 +72,7 @@ def debug_single_keyword(keyword="sprinkler system installation Spokane", locati
         
         # Save processed data for inspection
         with open('debug_processed_data.json', 'w') as f:
-            json.dump(processed_data, f, indent=2)
+            json.dump(processed_data, f, indent=2, default=json_default)
         print("✓ Processed data saved to debug_processed_data.json")
         
         # Check processed data counts
@@ -102,9 +103,10 @@ def debug_single_keyword(keyword="sprinkler system installation Spokane", locati
     try:
         aggregated_data = data_processor.aggregate_results([processed_data])
         
-        # Save aggregated data for inspection
+        # Save aggregated data for inspection (the competitor index is rebuilt on load)
         with open('debug_aggregated_data.json', 'w') as f:
-            json.dump(aggregated_data, f, indent=2)
+            json.dump({k: v for k, v in aggregated_data.items() if k != 'competitor_index'}, f, indent=2,
+                      default=json_default)
         print("✓ Aggregated data saved to debug_aggregated_data.json")
         
         # Check aggregated counts
@@ -147,7 +149,7 @@ def debug_single_keyword(keyword="sprinkler system installation Spokane", locati
         )
         
         with open('debug_template_data.json', 'w') as f:
-            json.dump(template_data, f, indent=2)
+            json.dump(template_data, f, indent=2, default=json_default)
         print("✓ Template data saved to debug_template_data.json")
         
         print(f"  - Total maps listings in template: {template_data.get('total_maps_listings', 0)}")
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+LocalRankLens Batch Entry Point
+
+Runs LocalRankLens for every client config in a directory or manifest.
+
+Usage:
+    python run_batch.py clients/ --format pdf --concurrency 4
+"""
+
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent / 'src'
+sys.path.insert(0, str(src_path))
+
+# Import and run the batch runner
+from batch_runner import main
+
+if __name__ == "__main__":
+    sys.exit(main())
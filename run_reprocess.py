@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+LocalRankLens Reprocessing Entry Point
+
+Rebuilds a business's history from archived SerpAPI responses.
+
+Usage:
+    python run_reprocess.py --config config.json --archive archive/responses.lra --workers 8
+"""
+
+import sys
+from pathlib import Path
+
+# Add src directory to Python path
+src_path = Path(__file__).parent / 'src'
+sys.path.insert(0, str(src_path))
+
+# Import and run the reprocessor
+from reprocess import main
+
+if __name__ == "__main__":
+    sys.exit(main())
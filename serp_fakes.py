@@ -0,0 +1,57 @@
+"""
+Shared test fakes for LocalRankLens
+
+Stand-ins for ``requests`` responses and sessions, so scraper tests run
+without making actual API calls.
+"""
+
+import json
+import time
+import threading
+from typing import Any, Callable, Dict
+
+
+def recorded_response() -> Dict[str, Any]:
+    """The recorded SerpAPI debug response."""
+    with open('debug_raw_response.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+class FakeResponse:
+    """Minimal stand-in for requests.Response."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+    @property
+    def content(self):
+        return json.dumps(self.data).encode('utf-8')
+
+
+class FakeSession:
+    """
+    Stand-in for requests.Session answering every GET with ``respond(params)``.
+
+    Counts requests (``calls``) and keeps their parameters (``requests``);
+    ``delay`` seconds pass before each response.
+    """
+
+    def __init__(self, respond: Callable[[Dict[str, Any]], Dict[str, Any]], delay: float = 0.0):
+        self.respond = respond
+        self.delay = delay
+        self.calls = 0
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None):
+        with self.lock:
+            self.calls += 1
+            self.requests.append(dict(params or {}))
+        time.sleep(self.delay)
+        return FakeResponse(self.respond(params))
@@ -0,0 +1,156 @@
+"""
+Application Context for LocalRankLens
+
+Long-lived, per-process home for the pipeline components a web worker
+reuses across requests: the SerpAPI scraper (with its pooled session, rate
+limiter and response cache), the run history store and report writers.
+Data processors are not shared: each analysis builds one for its own
+configured result depth. The API key is validated once and rechecked periodically
+instead of on every analysis.
+"""
+
+import sys
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from dotenv import load_dotenv
+
+from config_manager import ConfigManager
+from search_scraper import SearchScraper, SearchScraperError
+from response_cache import ResponseCache
+from rate_limiter import create_rate_limiter
+from single_flight import get_shared_single_flight
+from report_writer import ReportWriter
+from pdf_renderer import pdf_pool_from_settings
+from history_store import history_store_from_settings
+from localranklens import LocalRankLens
+
+
+class AppContext:
+    """Shared pipeline components for every analysis in a worker process."""
+
+    def __init__(self, env_path: str = ".env", settings: Optional[Dict[str, Any]] = None,
+                 revalidate_interval: float = 3600, template_dir: str = "templates"):
+        """
+        Initialize the application context.
+
+        Args:
+            env_path: Environment file, loaded once
+            settings: Optional settings sections (``performance_settings``,
+                ``cache_settings``, ...) layered over the environment
+            revalidate_interval: Seconds before the API key is checked again
+            template_dir: Directory containing Jinja2 templates
+        """
+        self.logger = logging.getLogger(__name__)
+        self.revalidate_interval = revalidate_interval
+        self.template_dir = template_dir
+
+        if Path(env_path).exists():
+            load_dotenv(env_path)
+
+        self.config_manager = ConfigManager(config=settings or {}, load_env=False, validate=False)
+        self.performance_settings = self.config_manager.get_performance_settings()
+
+        self.response_cache = self._build_response_cache()
+        self.search_scraper = SearchScraper(
+            self.config_manager.get_serpapi_key(),
+            rate_limit_delay=self.performance_settings['rate_limit_delay'],
+            pool_maxsize=max(10, self.performance_settings['max_concurrency']),
+            cache=self.response_cache,
+            rate_limiter=create_rate_limiter(
+                self.performance_settings['rate_limit_delay'],
+                burst=self.performance_settings['rate_limit_burst'],
+                shared_path=self.performance_settings['rate_limit_db'] or None
+            ),
+            single_flight=get_shared_single_flight(),
+            **self.config_manager.get_serpapi_settings()
+        )
+        self.history_store = history_store_from_settings(self.config_manager.get_history_settings())
+
+        self._report_writers: Dict[str, ReportWriter] = {}
+        self._validated_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+        self.logger.info("Application context initialized")
+
+    def _build_response_cache(self) -> Optional[ResponseCache]:
+        """Create the response cache if one is configured."""
+        cache_settings = self.config_manager.get_cache_settings()
+        if not cache_settings['enabled']:
+            return None
+
+        return ResponseCache(
+            path=cache_settings['path'],
+            ttls=cache_settings['ttl_seconds'],
+            default_ttl=cache_settings['default_ttl'],
+            max_entries=cache_settings['max_entries']
+        )
+
+    def ensure_api_key(self) -> None:
+        """
+        Validate the SerpAPI key unless it was validated recently.
+
+        The request is made without holding the context lock, so report
+        writer lookups never wait on it.
+
+        Raises:
+            SearchScraperError: If the key is invalid
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._validated_at is not None and now - self._validated_at < self.revalidate_interval:
+                return
+
+        valid = self.search_scraper.validate_api_key()
+
+        with self._lock:
+            if not valid:
+                self._validated_at = None
+                raise SearchScraperError("Invalid SerpAPI key")
+            self._validated_at = now
+        self.logger.info("SerpAPI key validated")
+
+    def get_report_writer(self, output_dir: str) -> ReportWriter:
+        """Get the shared report writer for an output directory."""
+        with self._lock:
+            writer = self._report_writers.get(output_dir)
+            if writer is None:
+                writer = ReportWriter(
+                    template_dir=self.template_dir,
+                    output_dir=output_dir,
+                    bytecode_cache_dir=self.performance_settings['template_cache_dir'] or None,
+                    pdf_pool=pdf_pool_from_settings(self.performance_settings),
+                    pdf_backend=self.performance_settings['pdf_engine']
+                )
+                self._report_writers[output_dir] = writer
+            return writer
+
+    def create_analysis(self, config: Dict[str, Any], report_format: str = "pdf") -> LocalRankLens:
+        """
+        Create an analysis for an in-memory configuration.
+
+        Args:
+            config: Analysis configuration (same shape as config.json)
+            report_format: Report format to generate ('pdf' or 'html')
+
+        Returns:
+            LocalRankLens that reuses this context's components
+
+        Raises:
+            ConfigurationError: If the configuration is invalid
+        """
+        return LocalRankLens(config=config, context=self, report_format=report_format)
+
+    def close(self) -> None:
+        """Release pooled connections."""
+        self.search_scraper.session.close()
+        if self.response_cache is not None:
+            self.response_cache.close()
+        if self.history_store is not None:
+            self.history_store.close()
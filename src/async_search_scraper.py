@@ -0,0 +1,437 @@
+"""
+Async Search Scraper for LocalRankLens
+
+asyncio counterpart of SearchScraper backed by a pooled aiohttp client, so a
+single process can run many analyses concurrently without blocking a worker
+per request.
+"""
+
+import json
+import asyncio
+import logging
+from typing import Dict, Any, Iterable, Optional
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from response_cache import ResponseCache, request_fingerprint
+from replay_server import FixtureStore
+from response_archive import ResponseArchiveError, response_archive_from_path
+from single_flight import AsyncSingleFlight
+from metrics import metrics
+from rate_limiter import RateLimiter
+from search_scraper import (
+    DEFAULT_BASE_URL,
+    RETRY_STATUSES,
+    _ERROR_LABELS,
+    SearchScraperError,
+    build_search_params,
+    build_maps_params,
+    check_response_data,
+    default_rate_limiter,
+    attach_raw_body,
+    project_response,
+    response_cache_params,
+    page_starts,
+    paging_done,
+    merge_pages
+)
+from data_processor import ResponseProjection
+
+
+class AsyncSearchScraper:
+    """
+    Handles search queries using SerpAPI from asyncio code.
+
+    One instance owns a single keep-alive connection pool and rate limiter;
+    share it between coroutines (and analyses) running on the same event loop.
+    """
+
+    def __init__(self, api_key: str, rate_limit_delay: float = 1.0,
+                 max_connections: int = 10, keepalive_timeout: float = 30.0,
+                 max_retries: int = 3, backoff_factor: float = 1.0,
+                 cache: Optional[ResponseCache] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 base_url: Optional[str] = None, record_dir: Optional[str] = None,
+                 project_responses: bool = False, keep_raw_body: bool = False,
+                 archive_path: Optional[str] = None):
+        """
+        Initialize the async search scraper.
+
+        Args:
+            api_key: SerpAPI key
+            rate_limit_delay: Delay between requests in seconds, used when no
+                ``rate_limiter`` is given
+            max_connections: Size of the shared connection pool
+            keepalive_timeout: Seconds an idle pooled connection is kept open
+            max_retries: Retries for connection errors and retryable statuses
+            backoff_factor: Base for exponential backoff between retries
+            cache: Optional persistent response cache
+            rate_limiter: Optional rate limiter shared with other scrapers
+            base_url: SerpAPI search endpoint, e.g. a local replay server
+            record_dir: Directory to record live responses to as fixtures
+            project_responses: Keep only the sections and fields DataProcessor
+                reads; fixtures are still recorded in full
+            keep_raw_body: Attach the raw response body to live responses as
+                ``raw_body`` bytes (debugging only; never cached)
+            archive_path: Response archive to append every live response to,
+                in full, for later reprocessing
+        """
+        if not AIOHTTP_AVAILABLE:
+            raise SearchScraperError("Async search not available. Install aiohttp: pip install aiohttp")
+
+        self.api_key = api_key
+        self.rate_limit_delay = rate_limit_delay
+        self.rate_limiter = rate_limiter or default_rate_limiter(rate_limit_delay)
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.cache = cache
+        self.single_flight = AsyncSingleFlight()
+        self.base_url = base_url or DEFAULT_BASE_URL
+        self.recorder = FixtureStore(record_dir) if record_dir else None
+        self.projection = ResponseProjection() if project_responses else None
+        self.keep_raw_body = keep_raw_body
+        self.archive = response_archive_from_path(archive_path)
+        self.logger = logging.getLogger(__name__)
+
+        self.session = None
+
+    async def __aenter__(self) -> "AsyncSearchScraper":
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def _get_session(self) -> "aiohttp.ClientSession":
+        """Return the shared client session, creating it on first use."""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    async def search(self, query: str, location: str, bypass_cache: bool = False,
+                     refresh_cache: bool = False, **kwargs) -> Dict[str, Any]:
+        """
+        Perform a search query using SerpAPI.
+
+        Args:
+            query: Search query string
+            location: Location for the search (e.g., "Seattle, WA")
+            bypass_cache: Neither read nor write the response cache
+            refresh_cache: Skip the cached response and store a fresh one
+            **kwargs: Additional parameters for SerpAPI
+
+        Returns:
+            SerpAPI response as dictionary
+
+        Raises:
+            SearchScraperError: If the search fails
+        """
+        params = build_search_params(self.api_key, query, location, **kwargs)
+        return await self._cached_request(params, query, location, 'search',
+                                          bypass_cache, refresh_cache)
+
+    async def search_depth(self, query: str, location: str, depth: int,
+                           stop_domains: Iterable[str] = (), page_concurrency: int = 1,
+                           bypass_cache: bool = False, refresh_cache: bool = False) -> Dict[str, Any]:
+        """
+        Search deep enough to cover the first ``depth`` organic results.
+
+        Pages after the first are requested ``page_concurrency`` at a time
+        and only while they can change the result; see
+        ``SearchScraper.search_depth``.
+        """
+        pages = [await self.search(query, location, bypass_cache=bypass_cache, refresh_cache=refresh_cache)]
+        remaining = page_starts(depth)[1:]
+        batch_size = max(1, page_concurrency)
+
+        while remaining and not paging_done(pages, stop_domains):
+            batch, remaining = remaining[:batch_size], remaining[batch_size:]
+            responses = await asyncio.gather(
+                *(self.search(query, location, bypass_cache=bypass_cache, refresh_cache=refresh_cache,
+                              start=start) for start in batch),
+                return_exceptions=True
+            )
+            for start, response in zip(batch, responses):
+                if isinstance(response, SearchScraperError):
+                    self.logger.warning(f"Stopped paging '{query}' at start={start}: {response}")
+                    remaining = []
+                    break
+                if isinstance(response, BaseException):
+                    raise response
+                pages.append(response)
+                if paging_done(pages, stop_domains):
+                    break
+
+        metrics.increment('search_pages_total', len(pages))
+        if len(pages) == 1:
+            return pages[0]
+        self.logger.info(f"Fetched {len(pages)} results pages for '{query}'")
+        return merge_pages(pages)
+
+    async def search_local(self, query: str, location: str, bypass_cache: bool = False,
+                           refresh_cache: bool = False) -> Dict[str, Any]:
+        """Perform a local search optimized for local business results."""
+        return await self.search(
+            query=query,
+            location=location,
+            bypass_cache=bypass_cache,
+            refresh_cache=refresh_cache,
+            tbm='lcl',  # Local search
+            num_results=20  # Get more results for local searches
+        )
+
+    async def search_maps(self, query: str, location: str, bypass_cache: bool = False,
+                          refresh_cache: bool = False) -> Dict[str, Any]:
+        """Perform a Google Maps search."""
+        params = build_maps_params(self.api_key, query, location)
+        return await self._cached_request(params, query, location, 'maps',
+                                          bypass_cache, refresh_cache)
+
+    async def _cached_request(self, params: Dict[str, Any], query: str, location: str,
+                              kind: str, bypass_cache: bool = False,
+                              refresh_cache: bool = False) -> Dict[str, Any]:
+        """
+        Serve a request from the response cache, falling back to SerpAPI.
+
+        Concurrent identical requests with the same cache mode are coalesced
+        into one.
+        """
+        with metrics.timer('search_seconds', kind=kind):
+            return await self.single_flight.do(
+                (request_fingerprint(response_cache_params(params, self.projection)),
+                 bypass_cache, refresh_cache),
+                lambda: self._fetch(params, query, location, kind, bypass_cache, refresh_cache)
+            )
+
+    async def _fetch(self, params: Dict[str, Any], query: str, location: str, kind: str,
+                     bypass_cache: bool, refresh_cache: bool) -> Dict[str, Any]:
+        """Look up the response cache and request from SerpAPI on a miss."""
+        use_cache = self.cache is not None and not bypass_cache
+        cache_params = response_cache_params(params, self.projection)
+
+        # Cache I/O is blocking SQLite work, so keep it off the event loop
+        if use_cache and not refresh_cache:
+            cached = await asyncio.to_thread(self.cache.get, cache_params)
+            metrics.increment('cache_lookups_total', kind=kind,
+                              result='miss' if cached is None else 'hit')
+            if cached is not None:
+                self.logger.info(f"Using cached results for '{query}' in '{location}'")
+                return cached
+
+        data = await self._request(params, query, location, kind=kind)
+
+        if self.recorder is not None:
+            await asyncio.to_thread(self.recorder.save, params, data)
+
+        if self.archive is not None:
+            await asyncio.to_thread(self._archive, params, data)
+
+        data = project_response(data, self.projection)
+
+        if use_cache:
+            await asyncio.to_thread(self.cache.set, cache_params, data)
+
+        return data
+
+    async def batch_search(self, queries: list, location: str,
+                           search_type: str = 'regular',
+                           max_concurrency: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Perform multiple searches concurrently with proper rate limiting.
+
+        Args:
+            queries: List of search queries
+            location: Location for all searches
+            search_type: Type of search ('regular', 'local', 'maps')
+            max_concurrency: Maximum searches in flight (defaults to pool size)
+
+        Returns:
+            Dictionary mapping queries to their results, in query order
+        """
+        total_queries = len(queries)
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_connections)
+
+        self.logger.info(f"Starting async batch search for {total_queries} queries")
+
+        async def run_query(query: str) -> Dict[str, Any]:
+            async with semaphore:
+                try:
+                    if search_type == 'local':
+                        return await self.search_local(query, location)
+                    elif search_type == 'maps':
+                        return await self.search_maps(query, location)
+                    return await self.search(query, location)
+
+                except SearchScraperError as e:
+                    self.logger.error(f"Failed to search for '{query}': {e}")
+                    return {'error': str(e)}
+
+                except Exception as e:
+                    self.logger.error(f"Unexpected error searching for '{query}': {e}")
+                    return {'error': f"Unexpected error: {e}"}
+
+        responses = await asyncio.gather(*(run_query(query) for query in queries))
+        results = dict(zip(queries, responses))
+
+        successful_searches = len([r for r in results.values() if 'error' not in r])
+        self.logger.info(f"Async batch search completed: {successful_searches}/{total_queries} successful")
+
+        return results
+
+    def _archive(self, params: Dict[str, Any], data: Dict[str, Any]) -> None:
+        """Append a live response to the archive; a failure never fails the search."""
+        try:
+            self.archive.append(params, data)
+        except ResponseArchiveError as e:
+            self.logger.warning(f"Failed to archive response for '{params.get('q', '')}': {e}")
+
+    async def _request(self, params: Dict[str, Any], query: str, location: str,
+                       kind: str = 'search', timeout: float = 30) -> Dict[str, Any]:
+        """
+        Send a rate-limited request to SerpAPI and return the parsed payload.
+
+        Connection errors and retryable statuses are retried with exponential
+        backoff, honouring Retry-After on 429 responses.
+
+        Raises:
+            SearchScraperError: If the request fails or SerpAPI reports an error
+        """
+        labels = _ERROR_LABELS[kind]
+        session = await self._get_session()
+
+        # aiohttp only accepts str/int/float query values; encode the rest
+        # the way requests does so fingerprints match across both scrapers
+        query_params = {k: (v if isinstance(v, (str, int, float)) and not isinstance(v, bool) else str(v))
+                        for k, v in params.items() if v is not None}
+
+        try:
+            self.logger.info(f"{labels['start']} '{query}' in '{location}'")
+
+            for attempt in range(self.max_retries + 1):
+                # Rate limiting
+                await self._enforce_rate_limit()
+
+                retry_after = None
+                body = None
+                try:
+                    with metrics.timer('serpapi_request_seconds', kind=kind):
+                        async with session.get(self.base_url, params=query_params,
+                                               timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                            if response.status in RETRY_STATUSES and attempt < self.max_retries:
+                                retry_after = response.headers.get('Retry-After')
+                                self.logger.warning(f"SerpAPI returned {response.status} for '{query}', retrying")
+                            else:
+                                response.raise_for_status()
+                                body = await response.read()
+
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    self.logger.warning(f"Request error for '{query}', retrying: {e}")
+
+                if body is not None:
+                    with metrics.timer('json_parse_seconds', kind=kind):
+                        data = json.loads(body)
+                    if self.keep_raw_body:
+                        data = attach_raw_body(data, body)
+                    break
+
+                await asyncio.sleep(self._backoff_delay(attempt, retry_after))
+
+            # Check for SerpAPI errors
+            check_response_data(data, kind)
+
+            self.logger.info(f"Successfully retrieved {labels['results']} for '{query}'")
+            return data
+
+        except SearchScraperError as e:
+            self.logger.error(str(e))
+            raise
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error_msg = f"{labels['http']} '{query}': {e!r}"
+            self.logger.error(error_msg)
+            raise SearchScraperError(error_msg)
+
+        except ValueError as e:
+            error_msg = f"Failed to parse JSON response for query '{query}': {e}"
+            self.logger.error(error_msg)
+            raise SearchScraperError(error_msg)
+
+        except Exception as e:
+            error_msg = f"{labels['unexpected']} '{query}': {e}"
+            self.logger.error(error_msg)
+            raise SearchScraperError(error_msg)
+
+    def _backoff_delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before retry number ``attempt + 1``."""
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+        return self.backoff_factor * (2 ** attempt)
+
+    async def _enforce_rate_limit(self) -> None:
+        """
+        Enforce rate limiting between requests without blocking the loop.
+
+        A token is reserved before awaiting, so coroutines sharing the rate
+        limiter stay within one budget.
+        """
+        sleep_time = await self.rate_limiter.acquire_async()
+        metrics.observe('rate_limit_wait_seconds', sleep_time)
+        if sleep_time > 0:
+            self.logger.debug(f"Rate limiting: slept for {sleep_time:.2f} seconds")
+
+    def get_requests_saved(self) -> int:
+        """Number of requests avoided by coalescing identical in-flight requests."""
+        return self.single_flight.requests_saved
+
+    async def validate_api_key(self) -> bool:
+        """
+        Validate the SerpAPI key by making a test request.
+
+        Returns:
+            True if API key is valid, False otherwise
+        """
+        try:
+            test_params = {
+                'api_key': self.api_key,
+                'engine': 'google',
+                'q': 'test',
+                'location': 'United States',
+                'num': 1
+            }
+
+            session = await self._get_session()
+            async with session.get(self.base_url, params=test_params,
+                                   timeout=aiohttp.ClientTimeout(total=10)) as response:
+                data = await response.json(content_type=None)
+
+            if 'error' in data:
+                self.logger.error(f"API key validation failed: {data['error']}")
+                return False
+
+            self.logger.info("API key validation successful")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"API key validation error: {e}")
+            return False
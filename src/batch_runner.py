@@ -0,0 +1,377 @@
+"""
+Batch Runner for LocalRankLens
+
+Runs analyses for many clients in one process. Every client's searches go
+through one shared scraper (with its rate limiter, single-flight group and
+response cache); identical query/location pairs across clients are
+searched once. Each client's report is rendered as soon as its last search
+is processed, on a pool of render threads, and a manifest of outputs with
+per-client timing is written at the end.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app_context import AppContext
+from config_manager import ConfigurationError
+from data_processor import ResultAggregator
+from localranklens import LocalRankLens
+
+
+class BatchError(Exception):
+    """Custom exception for batch runner errors."""
+    pass
+
+
+def load_batch_configs(source: str) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Load client configurations from a directory or a manifest file.
+
+    A directory contributes every ``*.json`` file in it. A manifest is a
+    JSON list of clients, or an object with ``clients`` and optional shared
+    ``settings`` (``performance_settings``, ``cache_settings``, ...). Each
+    client is a config path (relative to the manifest) or an object with
+    ``name`` and either ``config_path`` or an inline ``config``.
+
+    Args:
+        source: Directory of configs or manifest file
+
+    Returns:
+        Tuple of (clients as ``{'name', 'config'}`` dicts, shared settings)
+
+    Raises:
+        BatchError: If the source cannot be read
+    """
+    path = Path(source)
+    if path.is_dir():
+        entries = sorted(str(config_path) for config_path in path.glob('*.json'))
+        base_dir, settings = path, {}
+    else:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise BatchError(f"Cannot read batch manifest {source}: {e}")
+        if isinstance(manifest, dict):
+            entries, settings = manifest.get('clients', []), manifest.get('settings', {})
+        else:
+            entries, settings = manifest, {}
+        base_dir = path.parent
+
+    clients = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {'config_path': entry}
+        if 'config' in entry:
+            config = entry['config']
+            name = entry.get('name') or config.get('output_prefix') or config.get('business_name')
+        else:
+            config_path = base_dir / entry['config_path'] if not Path(entry['config_path']).is_absolute() \
+                else Path(entry['config_path'])
+            try:
+                with open(config_path, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                raise BatchError(f"Cannot read client config {config_path}: {e}")
+            name = entry.get('name') or config_path.stem
+        clients.append({'name': name, 'config': config})
+
+    if not clients:
+        raise BatchError(f"No client configurations found in {source}")
+    return clients, settings
+
+
+class _ClientRun:
+    """Bookkeeping for one client in a batch."""
+
+    def __init__(self, name: str, analysis: Optional[LocalRankLens] = None):
+        self.name = name
+        self.analysis = analysis
+        self.tasks: List[Tuple[str, str]] = []
+        self.search_indexes: List[int] = []
+        self.aggregator: Optional[ResultAggregator] = None
+        self.pending = 0
+        self.location = ''
+        self.searches_done_at: Optional[float] = None
+        self.render_started_at: Optional[float] = None
+        self.render_seconds: Optional[float] = None
+        self.report_path: Optional[str] = None
+        self.error: Optional[str] = None
+
+
+class BatchRunner:
+    """Runs many client analyses on one shared application context."""
+
+    def __init__(self, context: AppContext, max_concurrency: Optional[int] = None,
+                 render_workers: Optional[int] = None, report_format: str = "pdf"):
+        """
+        Initialize the batch runner.
+
+        Args:
+            context: Application context providing the shared scraper, rate
+                limiter, cache and report writers
+            max_concurrency: Searches in flight at once (defaults to the
+                context's ``max_concurrency``)
+            render_workers: Reports rendered at once (defaults to the CPU
+                count). With xhtml2pdf, set ``pdf_workers`` as well so PDF
+                conversion runs outside the GIL.
+            report_format: Report format to generate ('pdf' or 'html')
+        """
+        self.context = context
+        self.max_concurrency = max_concurrency or context.performance_settings['max_concurrency']
+        self.render_workers = render_workers or os.cpu_count() or 1
+        self.report_format = report_format
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+    def run(self, clients: List[Dict[str, Any]], manifest_path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analyze every client and write the output manifest.
+
+        Invalid configs and failed reports are recorded in the manifest
+        rather than stopping the batch.
+
+        Args:
+            clients: ``{'name', 'config'}`` dicts, e.g. from ``load_batch_configs``
+            manifest_path: Where to write the manifest JSON (skipped when omitted)
+
+        Returns:
+            The manifest
+        """
+        started_at = time.time()
+        self.context.ensure_api_key()
+
+        runs = [self._prepare_client(client) for client in clients]
+        searches = self._plan_searches([run for run in runs if run.analysis is not None])
+        total_tasks = sum(len(run.tasks) for run in runs)
+        self.logger.info(
+            f"Batch of {len(runs)} clients: {total_tasks} keyword tasks, "
+            f"{len(searches)} unique searches"
+        )
+
+        search_started = time.monotonic()
+        renders: List[Future] = []
+        with ThreadPoolExecutor(max_workers=self.render_workers,
+                                thread_name_prefix="lrl-render") as render_pool:
+            # Clients without keywords or with only fresh stored results need no searches
+            for run in runs:
+                if run.analysis is not None and run.pending == 0:
+                    run.searches_done_at = time.monotonic()
+                    renders.append(render_pool.submit(contextvars.copy_context().run, self._render, run))
+
+            def run_search(item: Tuple[Tuple[str, str], List[Tuple[_ClientRun, int]]]) -> None:
+                (keyword, location), targets = item
+                ready = self._search(keyword, location, targets)
+                for run in ready:
+                    renders.append(render_pool.submit(contextvars.copy_context().run, self._render, run))
+
+            workers = max(1, min(self.max_concurrency, len(searches)))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lrl-search") as search_pool:
+                contexts = [(contextvars.copy_context(), item) for item in searches.items()]
+                list(search_pool.map(lambda pair: pair[0].run(run_search, pair[1]), contexts))
+
+            for future in list(renders):
+                future.result()
+
+        manifest = self._build_manifest(runs, searches, total_tasks, started_at, search_started)
+        if manifest_path:
+            Path(manifest_path).parent.mkdir(parents=True, exist_ok=True)
+            with open(manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2)
+            self.logger.info(f"Batch manifest written to {manifest_path}")
+        return manifest
+
+    def _prepare_client(self, client: Dict[str, Any]) -> _ClientRun:
+        """Validate a client's config and build its keyword tasks."""
+        try:
+            analysis = self.context.create_analysis(client['config'], report_format=self.report_format)
+            analysis.initialize_components()
+        except ConfigurationError as e:
+            run = _ClientRun(client['name'])
+            run.error = f"Invalid configuration: {e}"
+            self.logger.error(f"Skipping client {client['name']}: {run.error}")
+            return run
+
+        run = _ClientRun(client['name'], analysis)
+        run.location = analysis.config_manager.get_location_string()
+        run.tasks = analysis._build_tasks()
+        # In incremental mode fresh stored results fill in some tasks up front
+        stored_results, run.search_indexes = analysis._reuse_stored_results(run.tasks, run.location)
+        run.aggregator = analysis._start_aggregation(stored_results)
+        run.pending = len(run.search_indexes)
+        return run
+
+    def _plan_searches(self, runs: List[_ClientRun]) -> Dict[Tuple[str, str], List[Tuple[_ClientRun, int]]]:
+        """Map each distinct (keyword, location) to the client tasks that need it."""
+        searches: Dict[Tuple[str, str], List[Tuple[_ClientRun, int]]] = {}
+        for run in runs:
+            for index in run.search_indexes:
+                searches.setdefault((run.tasks[index][0], run.location), []).append((run, index))
+        return searches
+
+    def _search(self, keyword: str, location: str,
+                targets: List[Tuple[_ClientRun, int]]) -> List[_ClientRun]:
+        """
+        Search once, process the response for every client task that uses it.
+
+        Returns:
+            Clients whose last pending search this was (ready to render)
+        """
+        try:
+            analyses = [run.analysis for run, _ in targets]
+            if any(analysis._needs_paging() for analysis in analyses):
+                search_result = self.context.search_scraper.search_depth(
+                    keyword, location, **self._depth_kwargs(analyses))
+            else:
+                search_result = self.context.search_scraper.search(keyword, location)
+            error = None
+        except Exception as e:
+            search_result, error = None, e
+
+        ready = []
+        for run, index in targets:
+            group_name = run.tasks[index][1]
+            if error is not None:
+                result = run.analysis._error_result(error, keyword, group_name)
+            else:
+                result = run.analysis._safe_process_result(search_result, keyword, group_name)
+            with self._lock:
+                run.aggregator.add_at(index, result)
+                run.pending -= 1
+                if run.pending == 0:
+                    run.searches_done_at = time.monotonic()
+                    ready.append(run)
+        return ready
+
+    def _depth_kwargs(self, analyses: List[LocalRankLens]) -> Dict[str, Any]:
+        """
+        ``search_depth`` arguments covering every client sharing a search.
+
+        The deepest client sets the depth; paging stops early only once every
+        client's domain is found, and not at all if any client has none.
+        """
+        depth_kwargs = [analysis._depth_kwargs() for analysis in analyses]
+        stop_domains = sorted({domain for kwargs in depth_kwargs for domain in kwargs['stop_domains']})
+        return {
+            'depth': max(kwargs['depth'] for kwargs in depth_kwargs),
+            'stop_domains': stop_domains if all(kwargs['stop_domains'] for kwargs in depth_kwargs) else [],
+            'page_concurrency': max(kwargs['page_concurrency'] for kwargs in depth_kwargs)
+        }
+
+    def _render(self, run: _ClientRun) -> None:
+        """Aggregate and render one client's report, recording failures."""
+        run.render_started_at = time.monotonic()
+        try:
+            aggregated_data = run.aggregator.aggregated()
+            run.report_path = run.analysis._generate_outputs(aggregated_data['all_results'], aggregated_data)
+        except Exception as e:
+            run.error = f"Report generation failed: {e}"
+            self.logger.error(f"Client {run.name}: {run.error}")
+        finally:
+            run.render_seconds = time.monotonic() - run.render_started_at
+            # Processed results are no longer needed once the report exists
+            run.aggregator = None
+
+    def _build_manifest(self, runs: List[_ClientRun], searches: Dict[Tuple[str, str], list],
+                        total_tasks: int, started_at: float, search_started: float) -> Dict[str, Any]:
+        """Summarize the batch and every client's outputs and timing."""
+        finished = time.monotonic()
+        clients = []
+        for run in runs:
+            entry = {
+                'name': run.name,
+                'status': 'failed' if run.error else 'completed',
+                'report_path': run.report_path,
+                'error': run.error,
+                'keywords': len(run.tasks),
+            }
+            if run.analysis is not None:
+                entry.update({
+                    'business_name': run.analysis.config_manager.get_business_name(),
+                    'location': run.location,
+                    'searches_seconds': round(run.searches_done_at - search_started, 3)
+                    if run.searches_done_at is not None else None,
+                    'render_wait_seconds': round(run.render_started_at - run.searches_done_at, 3)
+                    if run.render_started_at is not None else None,
+                    'render_seconds': round(run.render_seconds, 3) if run.render_seconds is not None else None,
+                    'total_seconds': round(run.render_started_at + run.render_seconds - search_started, 3)
+                    if run.render_seconds is not None else None,
+                })
+            clients.append(entry)
+
+        return {
+            'started_at': datetime.fromtimestamp(started_at).isoformat(),
+            'duration_seconds': round(finished - search_started, 3),
+            'report_format': self.report_format,
+            'clients_total': len(runs),
+            'clients_completed': sum(1 for entry in clients if entry['status'] == 'completed'),
+            'keyword_tasks': total_tasks,
+            'unique_searches': len(searches),
+            'searches_deduplicated': total_tasks - len(searches),
+            'requests_coalesced': self.context.search_scraper.get_requests_saved(),
+            'clients': clients
+        }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point for batch runs."""
+    parser = argparse.ArgumentParser(description="Run LocalRankLens for many clients")
+    parser.add_argument('source', help='Directory of client config files or a batch manifest')
+    parser.add_argument('--manifest', help='Output manifest path (default: output/batch_<timestamp>.json)')
+    parser.add_argument('--format', default='pdf', choices=['pdf', 'html'], help='Report format')
+    parser.add_argument('--concurrency', type=int, help='Searches in flight at once')
+    parser.add_argument('--render-workers', type=int, help='Reports rendered at once')
+    parser.add_argument('--env', default='.env', help='Environment file')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper(), logging.INFO),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+
+    try:
+        clients, settings = load_batch_configs(args.source)
+        context = AppContext(env_path=args.env, settings=settings)
+        try:
+            runner = BatchRunner(context, args.concurrency, args.render_workers, args.format)
+            manifest_path = args.manifest or str(
+                Path(os.getenv('OUTPUT_DIR', 'output')) / f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            )
+            manifest = runner.run(clients, manifest_path)
+        finally:
+            context.close()
+    except KeyboardInterrupt:
+        print("\nBatch cancelled by user")
+        return 1
+    except Exception as e:
+        print(f"\nBatch failed: {e}")
+        return 1
+
+    print("\n" + "="*60)
+    print("LocalRankLens Batch Complete!")
+    print("="*60)
+    print(f"Clients: {manifest['clients_completed']}/{manifest['clients_total']} completed")
+    print(f"Searches: {manifest['unique_searches']} unique for {manifest['keyword_tasks']} keyword tasks")
+    print(f"Duration: {manifest['duration_seconds']:.1f}s")
+    print(f"Manifest: {manifest_path}")
+    print("="*60)
+
+    return 0 if manifest['clients_completed'] == manifest['clients_total'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
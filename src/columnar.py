@@ -0,0 +1,256 @@
+"""
+Columnar Results for LocalRankLens
+
+Optional column-oriented view of processed search results for large
+portfolio runs. Every Maps listing, organic result, Local Services Ad and
+paid ad becomes one row in a set of typed columns:
+- keyword index, keyword group index and result type
+- position, rating and review count
+- competitor id (business name or domain, dictionary-encoded)
+
+Group stats, competitor rankings and rating averages are then computed
+with group-by operations over whole columns. The columns are ``array``
+module arrays; when NumPy is installed they are viewed as NumPy arrays
+without copying and aggregated with vectorized ``bincount`` calls,
+otherwise the same aggregations run as single loops over the arrays.
+"""
+
+from array import array
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+
+# Result types, in column code order, with the field used as competitor name
+RESULT_KINDS: Tuple[Tuple[str, str], ...] = (
+    ('maps_listings', 'title'),
+    ('organic_results', 'domain'),
+    ('local_services_ads', 'title'),
+    ('ads', 'domain'),
+)
+KIND_CODES = {kind: code for code, (kind, _) in enumerate(RESULT_KINDS)}
+
+
+class ColumnarResults:
+    """Processed search results stored as typed columns."""
+
+    def __init__(self, use_numpy: Optional[bool] = None):
+        """
+        Initialize an empty store.
+
+        Args:
+            use_numpy: Aggregate with NumPy; defaults to whether it is installed
+        """
+        if use_numpy and not NUMPY_AVAILABLE:
+            raise ValueError("NumPy is not installed")
+        self.use_numpy = NUMPY_AVAILABLE if use_numpy is None else use_numpy
+
+        # One entry per keyword/group result
+        self.keywords: List[str] = []
+        self.groups: List[str] = []
+        self._group_ids: Dict[str, int] = {}
+        self.keyword_group = array('i')
+        self.keyword_failed = array('b')
+
+        # One entry per listing/result/ad
+        self.keyword_index = array('i')
+        self.group_index = array('i')
+        self.kind = array('b')
+        self.position = array('i')
+        self.rating = array('d')
+        self.reviews = array('q')
+        self.competitor = array('i')
+
+        # Dictionary encoding of competitor names; -1 means no name
+        self.competitors: List[str] = []
+        self._competitor_ids: Dict[str, int] = {}
+
+    @classmethod
+    def from_results(cls, results: Iterable[Dict[str, Any]],
+                     use_numpy: Optional[bool] = None) -> 'ColumnarResults':
+        """Build a store from processed results in one pass."""
+        store = cls(use_numpy=use_numpy)
+        for result in results:
+            store.add(result)
+        return store
+
+    def __len__(self) -> int:
+        """Number of rows (listings, results and ads)."""
+        return len(self.kind)
+
+    def add(self, result: Dict[str, Any]) -> None:
+        """Append one processed search result's entries as rows."""
+        keyword_index = len(self.keywords)
+        group = result.get('keyword_group', '')
+        group_index = self._group_ids.get(group)
+        if group_index is None:
+            group_index = self._group_ids[group] = len(self.groups)
+            self.groups.append(group)
+
+        self.keywords.append(result.get('keyword', ''))
+        self.keyword_group.append(group_index)
+        self.keyword_failed.append(1 if result.get('error') else 0)
+
+        for code, (kind, name_field) in enumerate(RESULT_KINDS):
+            entries = result.get(kind, [])
+            if not entries:
+                continue
+            count = len(entries)
+            self.keyword_index.extend([keyword_index] * count)
+            self.group_index.extend([group_index] * count)
+            self.kind.extend([code] * count)
+            self.position.extend([int(entry.get('position') or 0) for entry in entries])
+            self.rating.extend([float(entry.get('rating') or 0) for entry in entries])
+            self.reviews.extend([int(entry.get('reviews') or 0) for entry in entries])
+            self.competitor.extend([self._encode(entry.get(name_field, '')) for entry in entries])
+
+    def _encode(self, name: str) -> int:
+        if not name:
+            return -1
+        competitor_id = self._competitor_ids.get(name)
+        if competitor_id is None:
+            competitor_id = self._competitor_ids[name] = len(self.competitors)
+            self.competitors.append(name)
+        return competitor_id
+
+    def group_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Per-group keyword and result counts.
+
+        Returns:
+            Mapping of group name to ``keyword_count``, ``successful_searches``,
+            ``total_maps_listings``, ``total_local_services`` and
+            ``total_organic_results``, as in ``aggregate_results``
+        """
+        size = len(self.groups)
+        if self.use_numpy:
+            keyword_group = _view(self.keyword_group)
+            failed = _view(self.keyword_failed).astype(bool)
+            group_index = _view(self.group_index)
+            kind = _view(self.kind)
+            columns = {
+                'keyword_count': np.bincount(keyword_group, minlength=size),
+                'successful_searches': np.bincount(keyword_group[~failed], minlength=size),
+                'total_maps_listings': np.bincount(group_index[kind == KIND_CODES['maps_listings']], minlength=size),
+                'total_local_services': np.bincount(group_index[kind == KIND_CODES['local_services_ads']],
+                                                    minlength=size),
+                'total_organic_results': np.bincount(group_index[kind == KIND_CODES['organic_results']],
+                                                     minlength=size),
+            }
+            columns = {name: column.tolist() for name, column in columns.items()}
+        else:
+            columns = {name: [0] * size for name in ('keyword_count', 'successful_searches', 'total_maps_listings',
+                                                     'total_local_services', 'total_organic_results')}
+            for group, failed in zip(self.keyword_group, self.keyword_failed):
+                columns['keyword_count'][group] += 1
+                if not failed:
+                    columns['successful_searches'][group] += 1
+            totals = {KIND_CODES['maps_listings']: columns['total_maps_listings'],
+                      KIND_CODES['local_services_ads']: columns['total_local_services'],
+                      KIND_CODES['organic_results']: columns['total_organic_results']}
+            for group, kind in zip(self.group_index, self.kind):
+                if kind in totals:
+                    totals[kind][group] += 1
+
+        return {
+            group: {name: column[index] for name, column in columns.items()}
+            for index, group in enumerate(self.groups)
+        }
+
+    def competitor_rankings(self, kind: str = 'organic_results',
+                            limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Competitors of one result type ranked by appearances in successful searches.
+
+        Ties keep the order in which competitors first appear for this
+        result type, as in ``CompetitorIndex``.
+
+        Returns:
+            List of ``competitor``, ``appearances`` and ``avg_position``
+        """
+        code = KIND_CODES[kind]
+        size = len(self.competitors)
+        if self.use_numpy:
+            ids, positions = self._successful_rows(code)
+            named = ids >= 0
+            ids, positions = ids[named], positions[named]
+            counts = np.bincount(ids, minlength=size)
+            position_totals = np.bincount(ids, weights=positions, minlength=size)
+            # Most appearances first, then by first row of this result type
+            present, first_rows = np.unique(ids, return_index=True)
+            order = present[np.lexsort((first_rows, -counts[present]))]
+            if limit is not None:
+                order = order[:limit]
+            return [
+                {'competitor': self.competitors[i], 'appearances': int(counts[i]),
+                 'avg_position': float(position_totals[i]) / int(counts[i])}
+                for i in order.tolist()
+            ]
+
+        counts: Dict[int, int] = {}
+        position_totals: Dict[int, int] = {}
+        for row in self._successful_row_indexes(code):
+            competitor = self.competitor[row]
+            if competitor < 0:
+                continue
+            counts[competitor] = counts.get(competitor, 0) + 1
+            position_totals[competitor] = position_totals.get(competitor, 0) + self.position[row]
+        # counts is in first-seen order and sorted() is stable
+        order = sorted(counts, key=lambda i: counts[i], reverse=True)
+        if limit is not None:
+            order = order[:limit]
+        return [
+            {'competitor': self.competitors[i], 'appearances': counts[i],
+             'avg_position': position_totals[i] / counts[i]}
+            for i in order
+        ]
+
+    def rating_stats(self, kind: str = 'maps_listings') -> Dict[str, Any]:
+        """Count, average and maximum of the non-zero ratings of one result type."""
+        count, total, largest = self._nonzero_stats(self.rating, kind)
+        return {'count': count, 'average': total / count if count else 0, 'max': largest}
+
+    def review_stats(self, kind: str = 'maps_listings') -> Dict[str, Any]:
+        """Count and average of the non-zero review counts of one result type."""
+        count, total, _ = self._nonzero_stats(self.reviews, kind)
+        return {'count': count, 'average': total / count if count else 0}
+
+    def _nonzero_stats(self, column: array, kind: str) -> Tuple[int, Any, Any]:
+        """Count, sum and maximum of a column's non-zero values for one result type."""
+        code = KIND_CODES[kind]
+        if self.use_numpy:
+            values = _view(column)[_view(self.kind) == code]
+            values = values[values != 0]
+            if not len(values):
+                return 0, 0, 0
+            return len(values), values.sum().item(), values.max().item()
+
+        count, total, largest = 0, 0, 0
+        for row_kind, value in zip(self.kind, column):
+            if row_kind == code and value:
+                count += 1
+                total += value
+                largest = max(largest, value)
+        return count, total, largest
+
+    def _successful_rows(self, code: int):
+        """Competitor ids and positions of one result type's rows in successful searches (NumPy)."""
+        failed = _view(self.keyword_failed).astype(bool)
+        mask = (_view(self.kind) == code) & ~failed[_view(self.keyword_index)]
+        return _view(self.competitor)[mask], _view(self.position)[mask].astype(np.float64)
+
+    def _successful_row_indexes(self, code: int) -> Iterable[int]:
+        failed = self.keyword_failed
+        keyword_index = self.keyword_index
+        return (row for row, kind in enumerate(self.kind)
+                if kind == code and not failed[keyword_index[row]])
+
+
+def _view(column: array):
+    """Zero-copy NumPy view of an ``array`` column (typecodes match NumPy dtype codes)."""
+    return np.frombuffer(column, dtype=column.typecode)
@@ -0,0 +1,184 @@
+"""
+Competitor Index for LocalRankLens
+
+Single-pass index of the competitors found across a run's processed results:
+- Maps competitors by business title, with appearances, rating and keywords
+- Organic competitors by domain, with positions and keywords
+- Rating, review and result counts for the report's benchmarks
+
+Every report insight reads from the index instead of rescanning the results.
+With a ``ColumnarResults`` store attached, competitor rankings and rating
+and review averages are computed from its columns instead; per-competitor
+details still come from the index.
+"""
+
+from typing import Dict, Any, List, Iterable, Optional
+
+from columnar import ColumnarResults
+
+
+class CompetitorIndex:
+    """Incrementally built index of Maps and organic competitors."""
+
+    def __init__(self, columnar: Optional[ColumnarResults] = None):
+        """
+        Initialize an empty index.
+
+        Args:
+            columnar: Optional store that added results are also appended to,
+                used for rankings and rating averages
+        """
+        self.columnar = columnar
+        self.total_searches = 0
+        self.successful_searches = 0
+        self.keywords: List[str] = []
+        self.successful_keywords: List[str] = []
+        self.maps_competitors: Dict[str, Dict[str, Any]] = {}
+        self.organic_competitors: Dict[str, Dict[str, Any]] = {}
+        self.organic_titles: List[str] = []
+        self.maps_listing_count = 0
+        self.organic_result_count = 0
+        self._group_domains: Dict[str, Dict[str, int]] = {}
+        self._position_totals: Dict[str, int] = {}
+        self._rating_total = 0
+        self._rating_count = 0
+        self._rating_max = 0
+        self._review_total = 0
+        self._review_count = 0
+
+    @classmethod
+    def from_results(cls, results: Iterable[Dict[str, Any]]) -> 'CompetitorIndex':
+        """Build an index from processed results in one pass."""
+        index = cls()
+        for result in results:
+            index.add(result)
+        return index
+
+    def add(self, result: Dict[str, Any]) -> None:
+        """
+        Add one processed search result to the index.
+
+        Failed searches count towards the totals and keywords only; they
+        carry no listings.
+        """
+        if self.columnar is not None:
+            self.columnar.add(result)
+        keyword = result.get('keyword', '')
+        self.total_searches += 1
+        self.keywords.append(keyword)
+        if result.get('error'):
+            return
+
+        self.successful_searches += 1
+        self.successful_keywords.append(keyword)
+
+        maps_listings = result.get('maps_listings', [])
+        self.maps_listing_count += len(maps_listings)
+        for listing in maps_listings:
+            self._add_maps_listing(listing, keyword)
+
+        organic_results = result.get('organic_results', [])
+        self.organic_result_count += len(organic_results)
+        domains = self._group_domains.setdefault(result.get('keyword_group', ''), {})
+        for organic in organic_results:
+            title = organic.get('title', '')
+            if title:
+                self.organic_titles.append(title)
+            domain = organic.get('domain', '')
+            if domain:
+                domains[domain] = domains.get(domain, 0) + 1
+                self._add_organic_result(organic, domain, keyword)
+
+    def _add_maps_listing(self, listing: Dict[str, Any], keyword: str) -> None:
+        rating = listing.get('rating')
+        reviews = listing.get('reviews')
+        if rating:
+            self._rating_total += rating
+            self._rating_count += 1
+            self._rating_max = max(self._rating_max, rating)
+        if reviews:
+            self._review_total += reviews
+            self._review_count += 1
+
+        name = listing.get('title', '')
+        if not name:
+            return
+        competitor = self.maps_competitors.get(name)
+        if competitor is None:
+            competitor = self.maps_competitors[name] = {
+                'name': name,
+                'appearances': 0,
+                'avg_rating': 0,
+                'total_reviews': 0,
+                'phone': listing.get('phone', ''),
+                'keywords': []
+            }
+        competitor['appearances'] += 1
+        competitor['keywords'].append(keyword)
+        # The latest rated listing wins
+        if rating:
+            competitor['avg_rating'] = rating
+            competitor['total_reviews'] = listing.get('reviews', 0)
+
+    def _add_organic_result(self, organic: Dict[str, Any], domain: str, keyword: str) -> None:
+        competitor = self.organic_competitors.get(domain)
+        if competitor is None:
+            competitor = self.organic_competitors[domain] = {
+                'domain': domain,
+                'appearances': 0,
+                'keywords': [],
+                'avg_position': 0,
+                'positions': []
+            }
+        competitor['appearances'] += 1
+        competitor['keywords'].append(keyword)
+        position = organic.get('position', 0)
+        competitor['positions'].append(position)
+        self._position_totals[domain] = self._position_totals.get(domain, 0) + position
+        competitor['avg_position'] = self._position_totals[domain] / competitor['appearances']
+
+    def top_maps_competitors(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """Maps competitors with the most appearances, first seen first on ties."""
+        if self.columnar is not None:
+            return [self.maps_competitors[row['competitor']]
+                    for row in self.columnar.competitor_rankings('maps_listings', limit)]
+        return sorted(self.maps_competitors.values(), key=lambda x: x['appearances'], reverse=True)[:limit]
+
+    def top_organic_competitors(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """Organic competitors with the most appearances, first seen first on ties."""
+        if self.columnar is not None:
+            return [self.organic_competitors[row['competitor']]
+                    for row in self.columnar.competitor_rankings('organic_results', limit)]
+        return sorted(self.organic_competitors.values(), key=lambda x: x['appearances'], reverse=True)[:limit]
+
+    def domain_counts(self) -> Dict[str, int]:
+        """
+        Organic result count per domain.
+
+        Domains are counted per keyword group and merged group by group, so
+        ties keep the order in which the report's group sections list them.
+        """
+        counts: Dict[str, int] = {}
+        for domains in self._group_domains.values():
+            for domain, count in domains.items():
+                counts[domain] = counts.get(domain, 0) + count
+        return counts
+
+    def rating_stats(self) -> Dict[str, Any]:
+        """Count, average and maximum of the Maps listings' ratings."""
+        if self.columnar is not None:
+            return self.columnar.rating_stats()
+        return {
+            'count': self._rating_count,
+            'average': self._rating_total / self._rating_count if self._rating_count else 0,
+            'max': self._rating_max
+        }
+
+    def review_stats(self) -> Dict[str, Any]:
+        """Count and average of the Maps listings' review counts."""
+        if self.columnar is not None:
+            return self.columnar.review_stats()
+        return {
+            'count': self._review_count,
+            'average': self._review_total / self._review_count if self._review_count else 0
+        }
@@ -5,6 +5,7 @@ Handles loading, validation, and management of configuration files
 and environment variables.
 """
 
+import copy
 import json
 import os
 import logging
@@ -18,16 +19,33 @@ class ConfigurationError(Exception):
     pass
 
 
+def normalize_domain(value: str) -> str:
+    """Bare host of a domain or URL: ``https://www.Example.com/`` -> ``example.com``."""
+    domain = value.strip().lower()
+    if '://' in domain:
+        domain = domain.split('://', 1)[1]
+    domain = domain.split('/', 1)[0]
+    return domain[4:] if domain.startswith('www.') else domain
+
+
 class ConfigManager:
     """Manages configuration loading and validation for LocalRankLens."""
     
-    def __init__(self, config_path: str = "config.json", env_path: str = ".env"):
+    def __init__(self, config_path: str = "config.json", env_path: str = ".env",
+                 config: Optional[Dict[str, Any]] = None, load_env: bool = True,
+                 validate: bool = True):
         """
         Initialize the configuration manager.
         
         Args:
             config_path: Path to the JSON configuration file
             env_path: Path to the environment variables file
+            config: In-memory configuration to use instead of reading
+                ``config_path``
+            load_env: Whether to load ``env_path`` (long-lived processes
+                load it once up front)
+            validate: Whether to require the analysis fields (business,
+                location, keywords); disable for settings-only use
         """
         self.config_path = Path(config_path)
         self.env_path = Path(env_path)
@@ -35,11 +53,16 @@ class ConfigManager:
         self.logger = logging.getLogger(__name__)
         
         # Load environment variables
-        self._load_environment()
+        if load_env:
+            self._load_environment()
         
         # Load and validate configuration
-        self._load_config()
-        self._validate_config()
+        if config is not None:
+            self.config = copy.deepcopy(config)
+        else:
+            self._load_config()
+        if validate:
+            self._validate_config()
     
     def _load_environment(self) -> None:
         """Load environment variables from .env file."""
@@ -124,6 +147,25 @@ class ConfigManager:
             )
         return api_key
     
+    def get_serpapi_settings(self) -> Dict[str, Any]:
+        """
+        Get SerpAPI endpoint settings from environment variables.
+
+        SERPAPI_BASE_URL points searches at another endpoint, such as the
+        local replay server; SERPAPI_RECORD_DIR records live responses as
+        replay fixtures. Responses are trimmed to the data the report uses
+        unless SERPAPI_PROJECT_RESPONSES is false, and SERPAPI_KEEP_RAW keeps
+        each live response body for debugging. SERPAPI_ARCHIVE appends every
+        live response, in full, to a compressed response archive.
+        """
+        return {
+            'base_url': os.getenv('SERPAPI_BASE_URL') or None,
+            'record_dir': os.getenv('SERPAPI_RECORD_DIR') or None,
+            'project_responses': os.getenv('SERPAPI_PROJECT_RESPONSES', 'true').lower() in ('1', 'true', 'yes'),
+            'keep_raw_body': os.getenv('SERPAPI_KEEP_RAW', 'false').lower() in ('1', 'true', 'yes'),
+            'archive_path': os.getenv('SERPAPI_ARCHIVE') or None
+        }
+    
     def get_business_name(self) -> str:
         """Get the business name from configuration."""
         return self.config['business_name']
@@ -198,17 +240,175 @@ class ConfigManager:
         return self.config['output_prefix']
     
     def get_report_settings(self) -> Dict[str, Any]:
-        """Get report settings with defaults."""
+        """
+        Get report settings with defaults.
+
+        ``max_maps_results`` and ``max_organic_results`` set how many listings
+        and organic results are extracted per keyword. Organic depths beyond
+        one results page (10) are fetched page by page, up to
+        ``page_concurrency`` pages at a time, and paging stops early once
+        ``client_domain`` (e.g. ``example.com``) has been found. The default
+        of one page at a time never pays for a page that is not used; higher
+        values may request pages past the stopping point to save latency.
+        """
         default_settings = {
             'include_maps_listings': True,
             'include_local_services': True,
             'include_organic_results': True,
             'max_maps_results': 3,
-            'max_organic_results': 5
+            'max_organic_results': 5,
+            'client_domain': '',
+            'page_concurrency': 1
         }
         
         user_settings = self.config.get('report_settings', {})
         default_settings.update(user_settings)
+        
+        try:
+            for key in ('max_maps_results', 'max_organic_results', 'page_concurrency'):
+                default_settings[key] = int(default_settings[key])
+        except (TypeError, ValueError) as e:
+            raise ConfigurationError(f"Invalid report setting: {e}")
+        
+        for key in ('max_maps_results', 'max_organic_results', 'page_concurrency'):
+            if default_settings[key] < 1:
+                raise ConfigurationError(f"'{key}' must be at least 1")
+        
+        default_settings['client_domain'] = normalize_domain(default_settings['client_domain'] or '')
+        return default_settings
+    
+    def get_performance_settings(self) -> Dict[str, Any]:
+        """
+        Get search execution settings with defaults.
+
+        Values come from the optional ``performance_settings`` config object,
+        falling back to the MAX_CONCURRENCY, RATE_LIMIT_DELAY,
+        RATE_LIMIT_BURST, RATE_LIMIT_DB, TEMPLATE_CACHE_DIR, PDF_ENGINE,
+        PDF_WORKERS, PDF_MAX_PENDING and COLUMNAR_AGGREGATION environment
+        variables. An empty ``template_cache_dir`` keeps compiled templates in
+        memory only; ``pdf_engine`` is ``xhtml2pdf`` (HTML conversion) or
+        ``reportlab`` (direct layout); ``pdf_workers`` of 0 renders xhtml2pdf
+        PDFs inline instead of in a process pool; ``columnar_aggregation``
+        computes group stats, competitor rankings and rating averages from a
+        column store (see ``columnar``), for large runs.
+        """
+        default_settings = {
+            'max_concurrency': os.getenv('MAX_CONCURRENCY', 1),
+            'rate_limit_delay': os.getenv('RATE_LIMIT_DELAY', 1.5),
+            'rate_limit_burst': os.getenv('RATE_LIMIT_BURST', 1),
+            'rate_limit_db': os.getenv('RATE_LIMIT_DB', ''),
+            'template_cache_dir': os.getenv('TEMPLATE_CACHE_DIR', 'cache/templates'),
+            'pdf_engine': os.getenv('PDF_ENGINE', 'xhtml2pdf'),
+            'pdf_workers': os.getenv('PDF_WORKERS', 0),
+            'pdf_max_pending': os.getenv('PDF_MAX_PENDING', 0),
+            'columnar_aggregation': os.getenv('COLUMNAR_AGGREGATION', 'false')
+        }
+        
+        user_settings = self.config.get('performance_settings', {})
+        default_settings.update(user_settings)
+        
+        try:
+            default_settings['max_concurrency'] = int(default_settings['max_concurrency'])
+            default_settings['rate_limit_delay'] = float(default_settings['rate_limit_delay'])
+            default_settings['rate_limit_burst'] = float(default_settings['rate_limit_burst'])
+            default_settings['pdf_workers'] = int(default_settings['pdf_workers'])
+            default_settings['pdf_max_pending'] = int(default_settings['pdf_max_pending'])
+        except (TypeError, ValueError) as e:
+            raise ConfigurationError(f"Invalid performance setting: {e}")
+        
+        if default_settings['max_concurrency'] < 1:
+            raise ConfigurationError("'max_concurrency' must be at least 1")
+        if default_settings['rate_limit_delay'] < 0:
+            raise ConfigurationError("'rate_limit_delay' cannot be negative")
+        if default_settings['rate_limit_burst'] < 1:
+            raise ConfigurationError("'rate_limit_burst' must be at least 1")
+        if default_settings['pdf_workers'] < 0 or default_settings['pdf_max_pending'] < 0:
+            raise ConfigurationError("'pdf_workers' and 'pdf_max_pending' cannot be negative")
+        if default_settings['pdf_engine'] not in ('xhtml2pdf', 'reportlab'):
+            raise ConfigurationError("'pdf_engine' must be 'xhtml2pdf' or 'reportlab'")
+        
+        default_settings['columnar_aggregation'] = \
+            str(default_settings['columnar_aggregation']).lower() in ('1', 'true', 'yes')
+        return default_settings
+    
+    def get_cache_settings(self) -> Dict[str, Any]:
+        """
+        Get SerpAPI response cache settings with defaults.
+
+        The cache is enabled when ``cache_settings.path`` or the SERP_CACHE_PATH
+        environment variable is set. ``ttl_seconds`` maps SerpAPI engines to
+        time-to-live values.
+        """
+        default_settings = {
+            'path': os.getenv('SERP_CACHE_PATH', ''),
+            'default_ttl': os.getenv('SERP_CACHE_TTL', 24 * 3600),
+            'ttl_seconds': {},
+            'max_entries': os.getenv('SERP_CACHE_MAX_ENTRIES', 10000)
+        }
+        
+        user_settings = self.config.get('cache_settings', {})
+        default_settings.update(user_settings)
+        
+        try:
+            default_settings['default_ttl'] = float(default_settings['default_ttl'])
+            default_settings['max_entries'] = int(default_settings['max_entries'])
+            default_settings['ttl_seconds'] = {
+                engine: float(ttl) for engine, ttl in default_settings['ttl_seconds'].items()
+            }
+        except (AttributeError, TypeError, ValueError) as e:
+            raise ConfigurationError(f"Invalid cache setting: {e}")
+        
+        default_settings['enabled'] = bool(default_settings['path'])
+        return default_settings
+    
+    def get_metrics_settings(self) -> Dict[str, Any]:
+        """
+        Get metrics settings with defaults.
+
+        A JSON metrics dump is written for every run when
+        ``metrics_settings.dump_dir`` or the METRICS_DIR environment variable
+        is set.
+        """
+        default_settings = {
+            'dump_dir': os.getenv('METRICS_DIR', '')
+        }
+        
+        user_settings = self.config.get('metrics_settings', {})
+        default_settings.update(user_settings)
+        
+        default_settings['dump_enabled'] = bool(default_settings['dump_dir'])
+        return default_settings
+    
+    def get_history_settings(self) -> Dict[str, Any]:
+        """
+        Get run history settings with defaults.
+
+        Processed results of every run are appended to a SQLite history
+        store when ``history_settings.path`` or the HISTORY_DB environment
+        variable is set. With ``incremental`` (HISTORY_INCREMENTAL) a run
+        only searches keywords whose stored result is missing or older
+        than ``max_age_hours`` (HISTORY_MAX_AGE_HOURS) and reuses the rest.
+        """
+        default_settings = {
+            'path': os.getenv('HISTORY_DB', ''),
+            'incremental': os.getenv('HISTORY_INCREMENTAL', 'false').lower() in ('1', 'true', 'yes'),
+            'max_age_hours': os.getenv('HISTORY_MAX_AGE_HOURS', 7 * 24)
+        }
+        
+        user_settings = self.config.get('history_settings', {})
+        default_settings.update(user_settings)
+        
+        try:
+            default_settings['max_age_hours'] = float(default_settings['max_age_hours'])
+        except (TypeError, ValueError) as e:
+            raise ConfigurationError(f"Invalid history setting: {e}")
+        if default_settings['max_age_hours'] < 0:
+            raise ConfigurationError("'max_age_hours' cannot be negative")
+        
+        default_settings['enabled'] = bool(default_settings['path'])
+        # Settings files may carry the flag as a string, like the environment
+        incremental = str(default_settings['incremental']).lower() in ('1', 'true', 'yes')
+        default_settings['incremental'] = incremental and default_settings['enabled']
         return default_settings
     
     def get_output_dir(self) -> Path:
@@ -5,20 +5,129 @@ Extracts and structures data from SerpAPI responses including:
 - Google Maps listings
 - Local Services Ads
 - Organic search results
+
+Listings, results and ads are returned as compact read-only records (see
+``records``) that also behave as mappings. How many Maps listings and
+organic results are kept is configurable (``max_maps_results`` and
+``max_organic_results``) and recorded on each result as ``result_depth``.
+``ResponseProjection`` trims a parsed SerpAPI
+payload down to the sections and fields extracted here, so scrapers can
+drop the rest before responses are cached or kept in memory.
 """
 
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 from urllib.parse import urlparse
 
+from metrics import metrics
+from competitor_index import CompetitorIndex
+from columnar import ColumnarResults
+from records import MapsListing, LocalServiceAd, OrganicResult, PaidAd, KnowledgeGraph
+
+
+# Default entries kept per result type
+MAX_MAPS_RESULTS = 3
+MAX_ORGANIC_RESULTS = 5
+
+# search_metadata fields read by _extract_search_metadata
+SEARCH_METADATA_FIELDS = ('query', 'location', 'total_results', 'total_time_taken', 'google_url')
+
+# Bump when the projected shape changes, so cached projections are not reused
+PROJECTION_VERSION = 2
+
+
+def extract_domain(url: str) -> str:
+    """Host of a URL without any ``www.`` prefix ('' if there is none)."""
+    if not url:
+        return ''
+    
+    try:
+        domain = urlparse(url).netloc
+        # Remove www. prefix if present
+        if domain.startswith('www.'):
+            domain = domain[4:]
+        return domain
+    except Exception:
+        return ''
+
+
+def _project_entries(entries: Any, fields: tuple) -> Any:
+    """Keep ``fields`` of every dict entry; other shapes pass through."""
+    if not isinstance(entries, list):
+        return entries
+    return [{key: entry[key] for key in fields if key in entry} if isinstance(entry, dict) else entry
+            for entry in entries]
+
+
+class ResponseProjection:
+    """
+    Projection of a SerpAPI payload onto what DataProcessor reads.
+
+    Sections the processor never looks at (related questions, filters,
+    search parameters, ...) are dropped and every entry keeps only its
+    record fields; of the pagination only the next-page link is kept, for
+    depth-aware fetching. Entries are not cut to a result depth, so one
+    projected page serves every configured depth. Processing a projected
+    payload gives the same result as processing the full one.
+    """
+
+    @property
+    def key(self) -> str:
+        """Marker identifying this projection, e.g. in response cache keys."""
+        return f"v{PROJECTION_VERSION}"
+
+    def apply(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Return a new payload with only the projected sections and fields."""
+        projected = {}
+
+        search_metadata = response.get('search_metadata')
+        if isinstance(search_metadata, dict):
+            projected['search_metadata'] = {key: search_metadata[key] for key in SEARCH_METADATA_FIELDS
+                                            if key in search_metadata}
+
+        maps_fields = tuple(key for key, _ in MapsListing.FIELDS)
+        local_results = response.get('local_results')
+        if isinstance(local_results, dict):
+            projected['local_results'] = {'places': _project_entries(local_results.get('places', []), maps_fields)}
+        elif local_results is not None:
+            projected['local_results'] = _project_entries(local_results, maps_fields)
+
+        for section, record in (('local_services', LocalServiceAd), ('organic_results', OrganicResult),
+                                ('ads', PaidAd)):
+            if section in response:
+                projected[section] = _project_entries(response[section], tuple(key for key, _ in record.FIELDS))
+
+        knowledge_graph = response.get('knowledge_graph')
+        if knowledge_graph:
+            projected['knowledge_graph'] = (
+                {key: knowledge_graph[key] for key, _ in KnowledgeGraph.FIELDS if key in knowledge_graph}
+                if isinstance(knowledge_graph, dict) else knowledge_graph
+            )
+
+        pagination = response.get('serpapi_pagination')
+        if isinstance(pagination, dict) and pagination.get('next'):
+            projected['serpapi_pagination'] = {'next': pagination['next']}
+
+        return projected
+
 
 class DataProcessor:
     """Processes and extracts structured data from SerpAPI responses."""
     
-    def __init__(self):
-        """Initialize the data processor."""
+    def __init__(self, max_maps_results: int = MAX_MAPS_RESULTS,
+                 max_organic_results: int = MAX_ORGANIC_RESULTS):
+        """
+        Initialize the data processor.
+        
+        Args:
+            max_maps_results: Maps listings kept per response
+            max_organic_results: Organic results kept per response
+        """
+        self.max_maps_results = max_maps_results
+        self.max_organic_results = max_organic_results
         self.logger = logging.getLogger(__name__)
     
+    @metrics.timed('process_search_results_seconds')
     def process_search_results(self, serpapi_response: Dict[str, Any], keyword: str, 
                              keyword_group: str) -> Dict[str, Any]:
         """
@@ -41,7 +150,8 @@ class DataProcessor:
                 'local_services_ads': self._extract_local_services_ads(serpapi_response),
                 'organic_results': self._extract_organic_results(serpapi_response),
                 'ads': self._extract_ads(serpapi_response),
-                'knowledge_graph': self._extract_knowledge_graph(serpapi_response)
+                'knowledge_graph': self._extract_knowledge_graph(serpapi_response),
+                'result_depth': self.result_depth()
             }
             
             self.logger.info(f"Processed search results for keyword: {keyword}")
@@ -55,6 +165,10 @@ class DataProcessor:
             self.logger.error(f"Full traceback: {traceback.format_exc()}")
             return self._create_empty_result(keyword, keyword_group)
     
+    def result_depth(self) -> Dict[str, int]:
+        """Entries kept per result type, as recorded on each processed result."""
+        return {'maps_listings': self.max_maps_results, 'organic_results': self.max_organic_results}
+    
     def _extract_search_metadata(self, response: Dict[str, Any]) -> Dict[str, Any]:
         """Extract search metadata from the response."""
         search_metadata = response.get('search_metadata', {})
@@ -66,7 +180,7 @@ class DataProcessor:
             'search_url': search_metadata.get('google_url', '')
         }
     
-    def _extract_maps_listings(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _extract_maps_listings(self, response: Dict[str, Any]) -> List[MapsListing]:
         """Extract Google Maps listings from the response."""
         # SerpAPI returns local business data in local_results.places
         local_results_data = response.get('local_results', {})
@@ -84,29 +198,13 @@ class DataProcessor:
             places = local_results_data if isinstance(local_results_data, list) else []
             self.logger.debug(f"Using local_results as list with {len(places)} items")
 
-        for result in places[:3]:  # Top 3 results
-            listing = {
-                'position': result.get('position', 0),
-                'title': result.get('title', ''),
-                'business_name': result.get('title', ''),
-                'rating': result.get('rating', 0),
-                'reviews': result.get('reviews', 0),
-                'type': result.get('type', ''),
-                'address': result.get('address', ''),
-                'phone': result.get('phone', ''),
-                'website': result.get('website', ''),
-                'hours': result.get('hours', ''),
-                'service_options': result.get('service_options', {}),
-                'gps_coordinates': result.get('gps_coordinates', {}),
-                'place_id': result.get('place_id', ''),
-                'thumbnail': result.get('thumbnail', '')
-            }
-            maps_listings.append(listing)
+        for result in places[:self.max_maps_results]:
+            maps_listings.append(MapsListing.from_serp(result))
         
         self.logger.debug(f"Extracted {len(maps_listings)} maps listings")
         return maps_listings
     
-    def _extract_local_services_ads(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _extract_local_services_ads(self, response: Dict[str, Any]) -> List[LocalServiceAd]:
         """Extract Local Services Ads from the response."""
         local_services = response.get('local_services', [])
         ads_listings = []
@@ -117,24 +215,12 @@ class DataProcessor:
             local_services = []
 
         for ad in local_services:
-            ad_data = {
-                'position': ad.get('position', 0),
-                'title': ad.get('title', ''),
-                'phone': ad.get('phone', ''),
-                'website': ad.get('website', ''),
-                'rating': ad.get('rating', 0),
-                'reviews': ad.get('reviews', 0),
-                'years_in_business': ad.get('years_in_business', ''),
-                'license_info': ad.get('license_info', ''),
-                'thumbnail': ad.get('thumbnail', ''),
-                'service_areas': ad.get('service_areas', [])
-            }
-            ads_listings.append(ad_data)
+            ads_listings.append(LocalServiceAd.from_serp(ad))
         
         self.logger.debug(f"Extracted {len(ads_listings)} local services ads")
         return ads_listings
     
-    def _extract_organic_results(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _extract_organic_results(self, response: Dict[str, Any]) -> List[OrganicResult]:
         """Extract organic search results from the response."""
         organic_results = response.get('organic_results', [])
         structured_results = []
@@ -144,25 +230,15 @@ class DataProcessor:
             self.logger.warning(f"organic_results is not a list, it's {type(organic_results)}. Converting to empty list.")
             organic_results = []
 
-        for result in organic_results[:5]:  # Top 5 results
-            organic_data = {
-                'position': result.get('position', 0),
-                'title': result.get('title', ''),
-                'link': result.get('link', ''),
-                'domain': self._extract_domain(result.get('link', '')),
-                'snippet': result.get('snippet', ''),
-                'displayed_link': result.get('displayed_link', ''),
-                'favicon': result.get('favicon', ''),
-                'sitelinks': result.get('sitelinks', []),
-                'rich_snippet': result.get('rich_snippet', {}),
-                'about_this_result': result.get('about_this_result', {})
-            }
-            structured_results.append(organic_data)
+        for result in organic_results[:self.max_organic_results]:
+            structured_results.append(
+                OrganicResult.from_serp(result, domain=self._extract_domain(result.get('link', '')))
+            )
         
         self.logger.debug(f"Extracted {len(structured_results)} organic results")
         return structured_results
     
-    def _extract_ads(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _extract_ads(self, response: Dict[str, Any]) -> List[PaidAd]:
         """Extract paid ads from the response."""
         ads = response.get('ads', [])
         structured_ads = []
@@ -173,55 +249,23 @@ class DataProcessor:
             ads = []
 
         for ad in ads:
-            ad_data = {
-                'position': ad.get('position', 0),
-                'title': ad.get('title', ''),
-                'link': ad.get('link', ''),
-                'domain': self._extract_domain(ad.get('link', '')),
-                'displayed_link': ad.get('displayed_link', ''),
-                'snippet': ad.get('snippet', ''),
-                'extensions': ad.get('extensions', []),
-                'tracking_link': ad.get('tracking_link', '')
-            }
-            structured_ads.append(ad_data)
+            structured_ads.append(PaidAd.from_serp(ad, domain=self._extract_domain(ad.get('link', ''))))
         
         self.logger.debug(f"Extracted {len(structured_ads)} paid ads")
         return structured_ads
     
-    def _extract_knowledge_graph(self, response: Dict[str, Any]) -> Dict[str, Any]:
+    def _extract_knowledge_graph(self, response: Dict[str, Any]) -> Union[KnowledgeGraph, Dict[str, Any]]:
         """Extract knowledge graph information if present."""
         knowledge_graph = response.get('knowledge_graph', {})
         
         if not knowledge_graph:
             return {}
         
-        return {
-            'title': knowledge_graph.get('title', ''),
-            'type': knowledge_graph.get('type', ''),
-            'description': knowledge_graph.get('description', ''),
-            'website': knowledge_graph.get('website', ''),
-            'phone': knowledge_graph.get('phone', ''),
-            'address': knowledge_graph.get('address', ''),
-            'hours': knowledge_graph.get('hours', {}),
-            'rating': knowledge_graph.get('rating', 0),
-            'reviews': knowledge_graph.get('reviews', 0),
-            'thumbnail': knowledge_graph.get('thumbnail', '')
-        }
+        return KnowledgeGraph.from_serp(knowledge_graph)
     
     def _extract_domain(self, url: str) -> str:
         """Extract domain from a URL."""
-        if not url:
-            return ''
-        
-        try:
-            parsed = urlparse(url)
-            domain = parsed.netloc
-            # Remove www. prefix if present
-            if domain.startswith('www.'):
-                domain = domain[4:]
-            return domain
-        except Exception:
-            return ''
+        return extract_domain(url)
     
     def _create_empty_result(self, keyword: str, keyword_group: str) -> Dict[str, Any]:
         """Create an empty result structure for failed processing."""
@@ -237,44 +281,129 @@ class DataProcessor:
             'error': True
         }
     
-    def aggregate_results(self, all_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    @metrics.timed('aggregate_results_seconds')
+    def aggregate_results(self, all_results: List[Dict[str, Any]], columnar: bool = False) -> Dict[str, Any]:
         """
         Aggregate results from multiple keywords for reporting.
         
         Args:
             all_results: List of processed search results
+            columnar: Compute group stats, rankings and rating averages
+                from a ``ColumnarResults`` store
             
         Returns:
             Aggregated data organized by keyword groups
         """
-        aggregated = {
-            'summary': {
-                'total_keywords': len(all_results),
-                'successful_searches': len([r for r in all_results if not r.get('error', False)]),
-                'failed_searches': len([r for r in all_results if r.get('error', False)])
-            },
-            'by_keyword_group': {},
-            'all_results': all_results
-        }
-        
-        # Group results by keyword group
+        aggregator = ResultAggregator(columnar=columnar)
         for result in all_results:
-            group = result['keyword_group']
-            if group not in aggregated['by_keyword_group']:
-                aggregated['by_keyword_group'][group] = []
-            aggregated['by_keyword_group'][group].append(result)
-        
-        # Add group-level statistics
-        for group, results in aggregated['by_keyword_group'].items():
-            group_stats = {
-                'keyword_count': len(results),
-                'successful_searches': len([r for r in results if not r.get('error', False)]),
-                'total_maps_listings': sum(len(r['maps_listings']) for r in results),
-                'total_local_services': sum(len(r['local_services_ads']) for r in results),
-                'total_organic_results': sum(len(r['organic_results']) for r in results),
-                'results': results
-            }
-            aggregated['by_keyword_group'][group] = group_stats
+            aggregator.add(result)
+        aggregated = aggregator.aggregated()
         
         self.logger.info(f"Aggregated {len(all_results)} search results into {len(aggregated['by_keyword_group'])} groups")
         return aggregated
+
+
+class ResultAggregator:
+    """
+    Single-pass, incremental aggregation of processed search results.
+    
+    Each result is folded into the summary counts, per-group statistics and
+    the run's ``CompetitorIndex`` once, as it arrives, so no later stage has
+    to walk every result again. Results fed with ``add_at`` may arrive in
+    any order; they are folded in task order, so the aggregated data
+    (including tie order in the competitor tallies) matches a sequential
+    run. Not thread-safe: feed it from one thread.
+    
+    With ``columnar`` the results are also appended to a ``ColumnarResults``
+    store, and group stats, competitor rankings and rating averages are
+    computed from its columns (vectorized when NumPy is installed) once all
+    results are in, which pays off for large portfolio runs.
+    """
+    
+    def __init__(self, columnar: bool = False):
+        """
+        Initialize an empty aggregator.
+        
+        Args:
+            columnar: Aggregate through a ``ColumnarResults`` store
+        """
+        self.results: List[Dict[str, Any]] = []
+        self.competitors = CompetitorIndex(columnar=ColumnarResults() if columnar else None)
+        self._waiting: Dict[int, Dict[str, Any]] = {}
+        self._failed = 0
+        self._groups: Dict[str, Dict[str, Any]] = {}
+    
+    def add_at(self, index: int, result: Dict[str, Any]) -> None:
+        """
+        Add the result of task ``index``, holding it until earlier tasks arrive.
+        
+        Args:
+            index: Position of the result's task in config order
+            result: Processed search result
+        """
+        self._waiting[index] = result
+        while len(self.results) in self._waiting:
+            self.add(self._waiting.pop(len(self.results)))
+    
+    def add(self, result: Dict[str, Any]) -> None:
+        """Fold the next result (in task order) into the aggregates."""
+        self.results.append(result)
+        failed = result.get('error', False)
+        if failed:
+            self._failed += 1
+        
+        group = self._groups.get(result['keyword_group'])
+        if group is None:
+            group = self._groups[result['keyword_group']] = {
+                'keyword_count': 0,
+                'successful_searches': 0,
+                'total_maps_listings': 0,
+                'total_local_services': 0,
+                'total_organic_results': 0,
+                'results': []
+            }
+        if self.competitors.columnar is None:
+            group['keyword_count'] += 1
+            if not failed:
+                group['successful_searches'] += 1
+            group['total_maps_listings'] += len(result['maps_listings'])
+            group['total_local_services'] += len(result['local_services_ads'])
+            group['total_organic_results'] += len(result['organic_results'])
+        group['results'].append(result)
+        
+        self.competitors.add(result)
+    
+    @property
+    def pending(self) -> int:
+        """Number of results held back waiting for earlier tasks."""
+        return len(self._waiting)
+    
+    def aggregated(self) -> Dict[str, Any]:
+        """
+        Build the aggregated data for reporting.
+        
+        Returns:
+            Dictionary with ``summary``, ``by_keyword_group``, ``all_results``
+            and the run's ``competitor_index``
+            
+        Raises:
+            ValueError: If results are still waiting for an earlier task
+        """
+        if self._waiting:
+            raise ValueError(f"{len(self._waiting)} results are waiting for earlier tasks")
+        
+        if self.competitors.columnar is not None:
+            for group_name, stats in self.competitors.columnar.group_stats().items():
+                self._groups[group_name].update(stats)
+        
+        total = len(self.results)
+        return {
+            'summary': {
+                'total_keywords': total,
+                'successful_searches': total - self._failed,
+                'failed_searches': self._failed
+            },
+            'by_keyword_group': self._groups,
+            'all_results': self.results,
+            'competitor_index': self.competitors
+        }
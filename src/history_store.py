@@ -0,0 +1,584 @@
+"""
+History Store for LocalRankLens
+
+Appends every run's processed results to SQLite so rank changes can be
+tracked without re-querying SerpAPI. Each keyword result becomes an
+``observations`` row, and its maps listings, organic results, local
+services ads and paid ads become rows in per-type tables keyed by business,
+keyword, location and date, with a ``competitor`` column (place id or
+domain) for competitor queries.
+
+Query APIs cover rank history, movers between two dates and competitor
+share of voice over time. Every query is answered from an index range on
+(business, ...) so it stays fast as the tables grow to millions of rows.
+"""
+
+import json
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from records import json_default
+
+
+class HistoryStoreError(Exception):
+    """Custom exception for history store errors."""
+    pass
+
+
+def _domain_or_title(row: Dict[str, Any]) -> str:
+    return row.get('domain') or row.get('title', '')
+
+
+# Result tables: extra columns (name, SQL type) and how a row's competitor is identified
+RESULT_TABLES: Dict[str, Dict[str, Any]] = {
+    'maps_listings': {
+        'columns': (('title', 'TEXT'), ('place_id', 'TEXT'), ('rating', 'REAL'), ('reviews', 'INTEGER'),
+                    ('phone', 'TEXT'), ('website', 'TEXT')),
+        'competitor': lambda row: row.get('place_id') or row.get('title', ''),
+    },
+    'organic_results': {
+        'columns': (('title', 'TEXT'), ('link', 'TEXT'), ('domain', 'TEXT')),
+        'competitor': _domain_or_title,
+    },
+    'local_services_ads': {
+        'columns': (('title', 'TEXT'), ('phone', 'TEXT'), ('website', 'TEXT'), ('rating', 'REAL'),
+                    ('reviews', 'INTEGER')),
+        'competitor': lambda row: row.get('title', ''),
+    },
+    'ads': {
+        'columns': (('title', 'TEXT'), ('link', 'TEXT'), ('domain', 'TEXT')),
+        'competitor': _domain_or_title,
+    },
+}
+
+MIN_DATE = '0000-00-00'
+MAX_DATE = '9999-12-31'
+
+
+def _observed_date(observed_at: float) -> str:
+    return datetime.fromtimestamp(observed_at).strftime('%Y-%m-%d')
+
+
+def prepare_observation(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Serialize one processed result for the history tables.
+
+    Runs in worker processes during bulk reprocessing, so the writer only
+    executes inserts.
+
+    Returns:
+        Dict of ``keyword``, ``keyword_group``, ``error``, ``result`` (JSON)
+        and ``rows``: per result table, ``(position, competitor, *columns)``
+        tuples
+    """
+    failed = bool(result.get('error') or result.get('error_message'))
+    rows = {}
+    for table, spec in RESULT_TABLES.items():
+        items = result.get(table) or []
+        if items:
+            rows[table] = [(item.get('position'), spec['competitor'](item))
+                           + tuple(item.get(name) for name, _ in spec['columns'])
+                           for item in items]
+    return {
+        'keyword': result.get('keyword', ''),
+        'keyword_group': result.get('keyword_group', ''),
+        'error': int(failed),
+        'result': json.dumps(result, default=json_default),
+        'rows': rows
+    }
+
+
+class HistoryStore:
+    """
+    Persistent run history in SQLite.
+
+    Safe to share between threads (one connection per thread); each run is
+    appended in a single transaction.
+    """
+
+    def __init__(self, path: str = "cache/history.sqlite3"):
+        """
+        Initialize the history store.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self.logger = logging.getLogger(__name__)
+        self._local = threading.local()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._initialize_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _initialize_schema(self) -> None:
+        """Create the tables and indexes if needed."""
+        try:
+            conn = self._connect()
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY,
+                    business TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    observed_at REAL NOT NULL,
+                    observed_date TEXT NOT NULL,
+                    keywords INTEGER NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS observations (
+                    id INTEGER PRIMARY KEY,
+                    run_id INTEGER NOT NULL,
+                    business TEXT NOT NULL,
+                    keyword TEXT NOT NULL,
+                    keyword_group TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    observed_at REAL NOT NULL,
+                    observed_date TEXT NOT NULL,
+                    error INTEGER NOT NULL DEFAULT 0,
+                    result TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_observations_bkld
+                ON observations (business, keyword, location, observed_date)
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_observations_blat
+                ON observations (business, location, observed_at)
+            """)
+            # Latest successful observation per keyword and day
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_observations_latest
+                ON observations (business, location, keyword, observed_date, error, observed_at)
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_observations_run ON observations (run_id)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_runs_bla ON runs (business, location, observed_at)")
+
+            for table, spec in RESULT_TABLES.items():
+                extra = ''.join(f", {name} {sql_type}" for name, sql_type in spec['columns'])
+                conn.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {table} (
+                        observation_id INTEGER NOT NULL,
+                        business TEXT NOT NULL,
+                        keyword TEXT NOT NULL,
+                        location TEXT NOT NULL,
+                        observed_date TEXT NOT NULL,
+                        position INTEGER,
+                        competitor TEXT NOT NULL{extra}
+                    )
+                """)
+                # Superseded by the indexes below, which also cover observation_id
+                conn.execute(f"DROP INDEX IF EXISTS idx_{table}_bkld")
+                conn.execute(f"DROP INDEX IF EXISTS idx_{table}_bldc")
+                # Rank history for one keyword
+                conn.execute(f"""
+                    CREATE INDEX IF NOT EXISTS idx_{table}_keyword
+                    ON {table} (business, keyword, location, observed_date, competitor, position, observation_id)
+                """)
+                # Movers and share of voice across a business's keywords
+                conn.execute(f"""
+                    CREATE INDEX IF NOT EXISTS idx_{table}_business
+                    ON {table} (business, location, observed_date, competitor, keyword, position, observation_id)
+                """)
+                # One competitor (domain or place id) across businesses
+                conn.execute(f"""
+                    CREATE INDEX IF NOT EXISTS idx_{table}_competitor
+                    ON {table} (competitor, observed_date)
+                """)
+        except sqlite3.Error as e:
+            raise HistoryStoreError(f"Failed to initialize history store at {self.path}: {e}")
+
+    def record_run(self, business: str, location: str, results: List[Dict[str, Any]],
+                   observed_at: Optional[float] = None) -> int:
+        """
+        Append one run's processed results.
+
+        Args:
+            business: Business name
+            location: Location string (e.g. "Spokane, WA")
+            results: Processed results from ``DataProcessor.process_search_results``
+            observed_at: Epoch seconds of the run (defaults to now)
+
+        Returns:
+            Id of the recorded run
+        """
+        observed_at = observed_at if observed_at is not None else time.time()
+        observations = [prepare_observation(result) for result in results]
+
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            run_id, row_count = self._insert_run(conn, business, location, observed_at, observations)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        self.logger.info(f"Recorded {len(results)} keyword results for {business} ({row_count} result rows)")
+        return run_id
+
+    def replace_observations(self, business: str, location: str,
+                             observations: List[Tuple[float, Dict[str, Any]]]) -> int:
+        """
+        Replace stored results with reprocessed ones, in one transaction.
+
+        Every stored observation for the same business, keyword, location and
+        day as a given one is deleted (with its result rows), then the given
+        observations are recorded as one run per day. Runs left empty are
+        removed.
+
+        Args:
+            business: Business name
+            location: Location string
+            observations: ``(observed_at, prepare_observation(result))`` pairs
+
+        Returns:
+            Number of stored observations replaced
+        """
+        by_date: Dict[str, List[Tuple[float, Dict[str, Any]]]] = {}
+        for observed_at, observation in observations:
+            by_date.setdefault(_observed_date(observed_at), []).append((observed_at, observation))
+
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            replaced = 0
+            touched_runs = set()
+            for observed_date, day in by_date.items():
+                keywords = list(dict.fromkeys(observation['keyword'] for _, observation in day))
+                for start in range(0, len(keywords), 500):
+                    chunk = keywords[start:start + 500]
+                    where = (f"WHERE business = ? AND keyword IN ({', '.join('?' * len(chunk))}) "
+                             "AND location = ? AND observed_date = ?")
+                    params = [business] + chunk + [location, observed_date]
+                    rows = conn.execute(f"SELECT id, run_id FROM observations {where}", params).fetchall()
+                    if not rows:
+                        continue
+                    replaced += len(rows)
+                    touched_runs.update(row['run_id'] for row in rows)
+                    conn.execute(f"DELETE FROM observations {where}", params)
+                    for table in RESULT_TABLES:
+                        conn.execute(f"DELETE FROM {table} {where}", params)
+                self._insert_run(conn, business, location, min(observed_at for observed_at, _ in day),
+                                 [observation for _, observation in day], observed_date)
+
+            for run_id in touched_runs:
+                if conn.execute("SELECT 1 FROM observations WHERE run_id = ? LIMIT 1", (run_id,)).fetchone() is None:
+                    conn.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return replaced
+
+    def _insert_run(self, conn: sqlite3.Connection, business: str, location: str, observed_at: float,
+                    observations: List[Dict[str, Any]],
+                    observed_date: Optional[str] = None) -> Tuple[int, int]:
+        """Insert a run and its prepared observations; returns the run id and result row count."""
+        observed_date = observed_date or _observed_date(observed_at)
+        run_id = conn.execute(
+            "INSERT INTO runs (business, location, observed_at, observed_date, keywords) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (business, location, observed_at, observed_date, len(observations))
+        ).lastrowid
+
+        # Ids are assigned up front (the write lock is held) so every insert can be batched
+        first_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM observations").fetchone()[0]
+        conn.executemany(
+            "INSERT INTO observations (id, run_id, business, keyword, keyword_group, location, "
+            "observed_at, observed_date, error, result) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(first_id + i, run_id, business, observation['keyword'], observation['keyword_group'], location,
+              observed_at, observed_date, observation['error'], observation['result'])
+             for i, observation in enumerate(observations)]
+        )
+
+        rows: Dict[str, List[tuple]] = {table: [] for table in RESULT_TABLES}
+        for i, observation in enumerate(observations):
+            prefix = (first_id + i, business, observation['keyword'], location, observed_date)
+            for table, table_rows in observation['rows'].items():
+                rows[table].extend(prefix + row for row in table_rows)
+
+        for table, spec in RESULT_TABLES.items():
+            if not rows[table]:
+                continue
+            names = ['observation_id', 'business', 'keyword', 'location', 'observed_date',
+                     'position', 'competitor'] + [name for name, _ in spec['columns']]
+            conn.executemany(
+                f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})",
+                rows[table]
+            )
+        return run_id, sum(len(table_rows) for table_rows in rows.values())
+
+    def latest_results(self, business: str, location: str,
+                       keywords: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Most recent successful result stored for each keyword.
+
+        Args:
+            business: Business name
+            location: Location string
+            keywords: Keywords to look up
+
+        Returns:
+            Mapping of keyword to ``{'observed_at', 'result'}`` for keywords
+            with a stored result
+        """
+        latest: Dict[str, Dict[str, Any]] = {}
+        distinct = list(dict.fromkeys(keywords))
+        conn = self._connect()
+        for start in range(0, len(distinct), 500):
+            chunk = distinct[start:start + 500]
+            # SQLite returns the row holding MAX(observed_at) for the bare columns
+            rows = conn.execute(
+                "SELECT keyword, result, MAX(observed_at) AS observed_at FROM observations "
+                f"WHERE business = ? AND location = ? AND error = 0 AND keyword IN ({', '.join('?' * len(chunk))}) "
+                "GROUP BY keyword",
+                [business, location] + chunk
+            )
+            for row in rows:
+                latest[row['keyword']] = {'observed_at': row['observed_at'], 'result': json.loads(row['result'])}
+        return latest
+
+    def keyword_groups(self, business: str, location: str) -> Dict[str, str]:
+        """Every keyword stored for a business and location, with its most recent group."""
+        rows = self._connect().execute(
+            "SELECT keyword, keyword_group, MAX(observed_at) AS observed_at FROM observations "
+            "WHERE business = ? AND location = ? GROUP BY keyword",
+            (business, location)
+        )
+        return {row['keyword']: row['keyword_group'] for row in rows}
+
+    def rank_history(self, business: str, location: str, keyword: str,
+                     competitor: Optional[str] = None, kind: str = 'organic_results',
+                     since: Optional[str] = None, until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Daily best position of each competitor (or one competitor) for a keyword.
+
+        Each day uses the keyword's latest successful observation that day.
+
+        Args:
+            business: Business name
+            location: Location string
+            keyword: Search keyword
+            competitor: Domain (organic/ads), place id (maps) or title (local
+                services) to follow; all competitors when omitted
+            kind: Result table (``organic_results``, ``maps_listings``, ...)
+            since: First date (``YYYY-MM-DD``), inclusive
+            until: Last date (``YYYY-MM-DD``), inclusive
+
+        Returns:
+            Rows of ``date``, ``competitor`` and ``position`` ordered by date
+            and position
+        """
+        table = self._table(kind)
+        latest_sql, latest_params = self._latest_observations(business, location, since, until, keyword)
+        sql = (f"SELECT observed_date, competitor, MIN(position) AS position FROM {table} "
+               "WHERE business = ? AND keyword = ? AND location = ? AND observed_date BETWEEN ? AND ? "
+               f"AND observation_id IN ({latest_sql})")
+        params = [business, keyword, location, since or MIN_DATE, until or MAX_DATE, *latest_params]
+        if competitor is not None:
+            sql += " AND competitor = ?"
+            params.append(competitor)
+        sql += " GROUP BY observed_date, competitor ORDER BY observed_date, position"
+
+        return [{'date': row['observed_date'], 'competitor': row['competitor'], 'position': row['position']}
+                for row in self._connect().execute(sql, params)]
+
+    def movers(self, business: str, location: str, kind: str = 'organic_results',
+               start_date: Optional[str] = None, end_date: Optional[str] = None,
+               limit: Optional[int] = 20) -> Dict[str, Any]:
+        """
+        Competitors whose position changed between two dates.
+
+        Defaults compare the two most recent dates with data.
+
+        Args:
+            business: Business name
+            location: Location string
+            kind: Result table (``organic_results``, ``maps_listings``, ...)
+            start_date: Earlier date (``YYYY-MM-DD``)
+            end_date: Later date (``YYYY-MM-DD``)
+            limit: Maximum movers to return (all when None)
+
+        Returns:
+            Dict with ``start_date``, ``end_date`` and ``movers``: rows of
+            ``keyword``, ``competitor``, ``before``, ``after``, ``change``
+            (positive = moved up) and ``status`` (``up``, ``down``, ``new``
+            or ``dropped``), biggest moves first
+        """
+        table = self._table(kind)
+        if end_date is None:
+            dates = self._dates(table, business, location, limit=1)
+            end_date = dates[0] if dates else None
+        if start_date is None and end_date is not None:
+            dates = self._dates(table, business, location, until=end_date, limit=2)
+            start_date = next((date for date in dates if date < end_date), None)
+        if start_date is None or end_date is None:
+            return {'start_date': start_date, 'end_date': end_date, 'movers': []}
+
+        before = self._snapshot(table, business, location, start_date)
+        after = self._snapshot(table, business, location, end_date)
+
+        movers = []
+        for key in before.keys() | after.keys():
+            old, new = before.get(key), after.get(key)
+            if old == new:
+                continue
+            if old is None:
+                status, change = 'new', None
+            elif new is None:
+                status, change = 'dropped', None
+            else:
+                change = old - new
+                status = 'up' if change > 0 else 'down'
+            movers.append({'keyword': key[0], 'competitor': key[1], 'before': old, 'after': new,
+                           'change': change, 'status': status})
+
+        # Position changes first (largest first), then entries and exits
+        movers.sort(key=lambda row: (row['change'] is None, -abs(row['change'] or 0),
+                                     row['status'], row['keyword'], row['competitor']))
+        return {'start_date': start_date, 'end_date': end_date,
+                'movers': movers[:limit] if limit is not None else movers}
+
+    def share_of_voice(self, business: str, location: str, kind: str = 'organic_results',
+                       since: Optional[str] = None, until: Optional[str] = None,
+                       limit: Optional[int] = 10) -> List[Dict[str, Any]]:
+        """
+        Each competitor's share of the result slots, per day.
+
+        Each keyword counts once per day, with its latest successful
+        observation, however many runs searched it that day.
+
+        Args:
+            business: Business name
+            location: Location string
+            kind: Result table (``organic_results``, ``maps_listings``, ...)
+            since: First date (``YYYY-MM-DD``), inclusive
+            until: Last date (``YYYY-MM-DD``), inclusive
+            limit: Competitors per day (all when None)
+
+        Returns:
+            One row per date with ``date``, ``total`` result slots and
+            ``competitors`` (``competitor``, ``appearances``, ``share``),
+            largest share first
+        """
+        table = self._table(kind)
+        latest_sql, latest_params = self._latest_observations(business, location, since, until)
+        rows = self._connect().execute(
+            f"SELECT observed_date, competitor, COUNT(*) AS appearances FROM {table} "
+            "WHERE business = ? AND location = ? AND observed_date BETWEEN ? AND ? "
+            f"AND observation_id IN ({latest_sql}) "
+            "GROUP BY observed_date, competitor",
+            (business, location, since or MIN_DATE, until or MAX_DATE, *latest_params)
+        ).fetchall()
+
+        by_date: Dict[str, List[Tuple[str, int]]] = {}
+        for row in rows:
+            by_date.setdefault(row['observed_date'], []).append((row['competitor'], row['appearances']))
+
+        series = []
+        for date in sorted(by_date):
+            counts = sorted(by_date[date], key=lambda item: (-item[1], item[0]))
+            total = sum(count for _, count in counts)
+            series.append({
+                'date': date,
+                'total': total,
+                'competitors': [
+                    {'competitor': competitor, 'appearances': count, 'share': count / total}
+                    for competitor, count in (counts[:limit] if limit is not None else counts)
+                ]
+            })
+        return series
+
+    def count(self, kind: Optional[str] = None) -> int:
+        """Number of stored observations, or rows of one result table."""
+        table = self._table(kind) if kind else 'observations'
+        return self._connect().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _table(self, kind: str) -> str:
+        """Validate a result table name (it is interpolated into SQL)."""
+        if kind not in RESULT_TABLES:
+            raise HistoryStoreError(f"Unknown result kind '{kind}' (choose from {', '.join(RESULT_TABLES)})")
+        return kind
+
+    def _latest_observations(self, business: str, location: str, since: Optional[str],
+                             until: Optional[str], keyword: Optional[str] = None) -> Tuple[str, List[Any]]:
+        """
+        Subquery selecting the latest successful observation per keyword and day.
+
+        Several runs a day (or an incremental run re-searching some keywords)
+        would otherwise count a keyword's results once per run.
+        """
+        # SQLite takes the bare id from the row holding MAX(observed_at)
+        sql = ("SELECT id FROM (SELECT id, MAX(observed_at) FROM observations "
+               "WHERE business = ? AND location = ? AND error = 0 AND observed_date BETWEEN ? AND ?")
+        params: List[Any] = [business, location, since or MIN_DATE, until or MAX_DATE]
+        if keyword is not None:
+            sql += " AND keyword = ?"
+            params.append(keyword)
+        return sql + " GROUP BY keyword, observed_date)", params
+
+    def _dates(self, table: str, business: str, location: str,
+               until: Optional[str] = None, limit: int = 2) -> List[str]:
+        """Most recent dates with data on or before ``until``, newest first."""
+        # One index seek per date instead of a DISTINCT over every row
+        conn = self._connect()
+        row = conn.execute(
+            f"SELECT MAX(observed_date) FROM {table} "
+            "WHERE business = ? AND location = ? AND observed_date <= ?",
+            (business, location, until or MAX_DATE)
+        ).fetchone()
+        dates = [row[0]] if row[0] is not None else []
+        while dates and len(dates) < limit:
+            row = conn.execute(
+                f"SELECT MAX(observed_date) FROM {table} "
+                "WHERE business = ? AND location = ? AND observed_date < ?",
+                (business, location, dates[-1])
+            ).fetchone()
+            if row[0] is None:
+                break
+            dates.append(row[0])
+        return dates
+
+    def _snapshot(self, table: str, business: str, location: str,
+                  date: str) -> Dict[Tuple[str, str], int]:
+        """Best position per (keyword, competitor) on one date, from each keyword's latest observation."""
+        latest_sql, latest_params = self._latest_observations(business, location, date, date)
+        rows = self._connect().execute(
+            f"SELECT keyword, competitor, MIN(position) AS position FROM {table} "
+            "WHERE business = ? AND location = ? AND observed_date = ? "
+            f"AND observation_id IN ({latest_sql}) "
+            "GROUP BY keyword, competitor",
+            (business, location, date, *latest_params)
+        )
+        return {(row['keyword'], row['competitor']): row['position'] for row in rows}
+
+
+def history_store_from_settings(history_settings: Dict[str, Any]) -> Optional[HistoryStore]:
+    """Open the history store if one is configured, else None."""
+    if not history_settings.get('enabled'):
+        return None
+    return HistoryStore(history_settings['path'])
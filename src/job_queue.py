@@ -0,0 +1,387 @@
+"""
+Job Queue for LocalRankLens
+
+SQLite-backed queue of analysis jobs with a background worker pool, so the
+web API can accept an analysis, return a job id immediately and report
+progress while the work runs.
+"""
+
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+# Event types that end a job's event stream
+TERMINAL_EVENTS = ('completed', 'failed')
+
+# Attempts at recording a finished job before leaving it to requeue_stale
+FINISH_ATTEMPTS = 3
+
+# A job runner receives the job id, its payload and a progress callback
+# taking LocalRankLens progress events, and returns the finished report path
+JobRunner = Callable[[str, Dict[str, Any], Callable[[Dict[str, Any]], None]], str]
+
+
+class JobQueueError(Exception):
+    """Custom exception for job queue errors."""
+    pass
+
+
+class JobStore:
+    """
+    Persistent job records in SQLite.
+
+    Safe to share between threads and processes: claiming a job is a single
+    ``BEGIN IMMEDIATE`` transaction, so each job runs exactly once.
+    """
+
+    def __init__(self, path: str = "cache/jobs.sqlite3"):
+        """
+        Initialize the job store.
+
+        Args:
+            path: SQLite database file
+        """
+        self.path = Path(path)
+        self.logger = logging.getLogger(__name__)
+        self._local = threading.local()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._initialize_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _initialize_schema(self) -> None:
+        """Create the jobs table and indexes if needed."""
+        try:
+            conn = self._connect()
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    progress_done INTEGER NOT NULL DEFAULT 0,
+                    progress_total INTEGER NOT NULL DEFAULT 0,
+                    report_path TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS job_events (
+                    job_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    event TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (job_id, seq)
+                )
+            """)
+        except sqlite3.Error as e:
+            raise JobQueueError(f"Failed to initialize job store at {self.path}: {e}")
+
+    def create(self, payload: Dict[str, Any]) -> str:
+        """
+        Add a queued job.
+
+        Args:
+            payload: JSON-serializable job input (e.g. the analysis config)
+
+        Returns:
+            New job id
+        """
+        job_id = uuid.uuid4().hex
+        self._connect().execute(
+            "INSERT INTO jobs (id, status, payload, created_at) VALUES (?, ?, ?, ?)",
+            (job_id, QUEUED, json.dumps(payload), time.time())
+        )
+        return job_id
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        """Atomically mark the oldest queued job as running and return it."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ? WHERE id = ?",
+                    (RUNNING, time.time(), row['id'])
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        if row is None:
+            return None
+        job = self._to_dict(row)
+        job['status'] = RUNNING
+        return job
+
+    def update_progress(self, job_id: str, done: int, total: int) -> None:
+        """Record how many keywords of a job are finished."""
+        self._connect().execute(
+            "UPDATE jobs SET progress_done = ?, progress_total = ? WHERE id = ?",
+            (done, total, job_id)
+        )
+
+    def complete(self, job_id: str, report_path: str) -> None:
+        """Mark a job as finished with its report."""
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, report_path = ?, finished_at = ? WHERE id = ?",
+            (COMPLETED, report_path, time.time(), job_id)
+        )
+
+    def fail(self, job_id: str, error: str) -> None:
+        """Mark a job as failed."""
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+            (FAILED, error, time.time(), job_id)
+        )
+
+    def add_event(self, job_id: str, event: Dict[str, Any]) -> int:
+        """
+        Append a progress event to a job's event log.
+
+        Returns:
+            Sequence number of the event (starting at 1)
+        """
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            seq = conn.execute(
+                "SELECT COALESCE(MAX(seq), 0) + 1 FROM job_events WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+            conn.execute(
+                "INSERT INTO job_events (job_id, seq, event, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, seq, json.dumps(event), time.time())
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return seq
+
+    def get_events(self, job_id: str, after: int = 0) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Get a job's events with a sequence number above ``after``.
+
+        Returns:
+            List of (seq, event) pairs in order
+        """
+        rows = self._connect().execute(
+            "SELECT seq, event FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+            (job_id, after)
+        ).fetchall()
+        return [(row['seq'], json.loads(row['event'])) for row in rows]
+
+    def requeue_stale(self, older_than: float) -> int:
+        """
+        Put jobs left running by a dead process back in the queue.
+
+        Args:
+            older_than: Seconds a job must have been running to count as
+                abandoned (longer than any real analysis takes)
+
+        Returns:
+            Number of requeued jobs
+        """
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ? AND started_at < ?",
+            (QUEUED, RUNNING, time.time() - older_than)
+        )
+        return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job by id, or None if unknown."""
+        row = self._connect().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def count(self, status: str) -> int:
+        """Number of jobs in a state."""
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)
+        ).fetchone()[0]
+
+    def _to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job['payload'] = json.loads(job['payload'])
+        return job
+
+    def close(self) -> None:
+        """Close this thread's database connection."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class JobQueue:
+    """Background worker pool that runs jobs from a :class:`JobStore`."""
+
+    def __init__(self, store: JobStore, runner: JobRunner, workers: int = 2,
+                 poll_interval: float = 1.0):
+        """
+        Initialize the job queue.
+
+        Args:
+            store: Job store to claim work from
+            runner: Callable that runs one job and returns its report path
+            workers: Number of worker threads
+            poll_interval: Seconds between checks for jobs submitted by
+                other processes
+        """
+        if workers < 1:
+            raise JobQueueError("'workers' must be at least 1")
+
+        self.store = store
+        self.runner = runner
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.logger = logging.getLogger(__name__)
+
+        self._wakeup = threading.Condition()
+        self._stopping = False
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "JobQueue":
+        """Start the worker threads."""
+        if self._threads:
+            return self
+
+        self._stopping = False
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"lrl-job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self.logger.info(f"Job queue started with {self.workers} workers")
+        return self
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop the workers after their current jobs."""
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, payload: Dict[str, Any]) -> str:
+        """
+        Queue a job and wake an idle worker.
+
+        Returns:
+            Job id
+        """
+        job_id = self.store.create(payload)
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def wait(self, job_id: str, timeout: float, interval: float = 0.25) -> Optional[Dict[str, Any]]:
+        """
+        Wait until a job finishes or ``timeout`` seconds pass.
+
+        Returns:
+            The job record (check ``status``), or None if unknown
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.store.get(job_id)
+            if job is None or job['status'] in (COMPLETED, FAILED) or time.monotonic() >= deadline:
+                return job
+            time.sleep(min(interval, max(0.0, deadline - time.monotonic())))
+
+    def _work(self) -> None:
+        while not self._stopping:
+            try:
+                job = self.store.claim_next()
+            except sqlite3.Error as e:
+                self.logger.warning(f"Failed to claim job: {e}")
+                job = None
+
+            if job is None:
+                with self._wakeup:
+                    if not self._stopping:
+                        self._wakeup.wait(self.poll_interval)
+                continue
+
+            try:
+                self._run(job)
+            except Exception as e:
+                # Keep the worker alive whatever happens to a single job
+                self.logger.error(f"Worker failed on job {job['id']}: {e}")
+
+    def _run(self, job: Dict[str, Any]) -> None:
+        job_id = job['id']
+        self.logger.info(f"Running job {job_id}")
+
+        def progress(event: Dict[str, Any]) -> None:
+            # Terminal events are recorded below, once the job status is final
+            if event.get('type') in TERMINAL_EVENTS:
+                return
+            try:
+                self.store.add_event(job_id, event)
+                if 'total' in event:
+                    self.store.update_progress(job_id, event.get('done', 0), event['total'])
+            except sqlite3.Error as e:
+                self.logger.warning(f"Failed to record progress for job {job_id}: {e}")
+
+        try:
+            report_path = self.runner(job_id, job['payload'], progress)
+        except (Exception, SystemExit) as e:
+            error = str(e) or e.__class__.__name__
+            self.logger.error(f"Job {job_id} failed: {error}")
+            self._finish(job_id, self.store.fail, error, {'type': 'failed', 'error': error})
+            return
+
+        if self._finish(job_id, self.store.complete, report_path, {'type': 'completed', 'report_path': report_path}):
+            self.logger.info(f"Job {job_id} completed: {report_path}")
+
+    def _finish(self, job_id: str, record: Callable[[str, str], None], value: str,
+                event: Dict[str, Any]) -> bool:
+        """
+        Record a finished job's status and terminal event.
+
+        SQLite errors (e.g. ``database is locked``) are retried; if every
+        attempt fails the job stays running until ``requeue_stale``.
+
+        Returns:
+            True if both were recorded
+        """
+        for attempt in range(1, FINISH_ATTEMPTS + 1):
+            try:
+                record(job_id, value)
+                self.store.add_event(job_id, event)
+                return True
+            except sqlite3.Error as e:
+                if attempt == FINISH_ATTEMPTS:
+                    self.logger.error(f"Failed to record the end of job {job_id}: {e}")
+                    return False
+                self.logger.warning(f"Failed to record the end of job {job_id} (attempt {attempt}): {e}")
+                time.sleep(self.poll_interval * attempt)
+        return False
@@ -6,38 +6,79 @@ for local search competitive intelligence analysis.
 """
 
 import sys
+import time
+import asyncio
 import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple, Callable, Iterator, TYPE_CHECKING
 
 # Add src directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config_manager import ConfigManager, ConfigurationError, setup_logging
-from search_scraper import SearchScraper, SearchScraperError
-from data_processor import DataProcessor
+from search_scraper import SearchScraper, SearchScraperError, ORGANIC_PAGE_SIZE
+from async_search_scraper import AsyncSearchScraper
+from response_cache import ResponseCache
+from rate_limiter import RateLimiter, create_rate_limiter
+from single_flight import get_shared_single_flight
+from metrics import metrics, MetricsRegistry
+from data_processor import DataProcessor, ResultAggregator
 from report_writer import ReportWriter, ReportWriterError
+from pdf_renderer import pdf_pool_from_settings
+from history_store import history_store_from_settings
+
+if TYPE_CHECKING:
+    from app_context import AppContext
 
 
 class LocalRankLens:
     """Main orchestrator for the LocalRankLens application."""
     
-    def __init__(self, config_path: str = "config.json"):
+    def __init__(self, config_path: str = "config.json",
+                 max_concurrency: Optional[int] = None, report_format: str = "pdf",
+                 config: Optional[Dict[str, Any]] = None, context: Optional["AppContext"] = None):
         """
         Initialize LocalRankLens with configuration.
         
         Args:
             config_path: Path to the configuration file
+            max_concurrency: Maximum number of searches in flight at once.
+                Defaults to the configured performance settings (1, i.e.
+                sequential, unless overridden).
+            report_format: Report format to generate ('pdf' or 'html')
+            config: In-memory configuration used instead of ``config_path``.
+                Invalid configurations raise ConfigurationError instead of
+                exiting.
+            context: Long-lived application context whose components
+                (scraper, processor, report writer) this run reuses
         """
         self.logger = None
         self.config_manager = None
         self.search_scraper = None
         self.data_processor = None
         self.report_writer = None
+        self.async_search_scraper = None
+        self.response_cache = None
+        self.history_store = None
+        self.max_concurrency = max_concurrency
+        self.report_format = report_format
+        self.context = context
+        self.progress_callback = None
+        self._progress_done = 0
+        self._progress_total = 0
+        self._progress_lock = threading.Lock()
         
         try:
             # Load configuration
-            self.config_manager = ConfigManager(config_path)
+            self.config_manager = ConfigManager(config_path, config=config, load_env=context is None)
+            self.performance_settings = self.config_manager.get_performance_settings()
+            self.report_settings = self.config_manager.get_report_settings()
+            if self.max_concurrency is None:
+                self.max_concurrency = self.performance_settings['max_concurrency']
             
             # Set up logging
             setup_logging(self.config_manager)
@@ -46,31 +87,40 @@ class LocalRankLens:
             self.logger.info("LocalRankLens initialized successfully")
             
         except ConfigurationError as e:
+            if config is not None:
+                raise
             print(f"Configuration error: {e}")
             sys.exit(1)
         except Exception as e:
+            if config is not None:
+                raise
             print(f"Initialization error: {e}")
             sys.exit(1)
     
     def initialize_components(self) -> None:
         """Initialize all components with proper error handling."""
+        if self.context is not None:
+            self._use_context_components()
+            return
+        
         try:
             # Initialize search scraper
             api_key = self.config_manager.get_serpapi_key()
-            self.search_scraper = SearchScraper(api_key, rate_limit_delay=1.5)
+            self.search_scraper = SearchScraper(
+                api_key,
+                rate_limit_delay=self.performance_settings['rate_limit_delay'],
+                pool_maxsize=max(10, self.max_concurrency),
+                cache=self._build_response_cache(),
+                rate_limiter=self._build_rate_limiter(),
+                single_flight=get_shared_single_flight(),
+                **self.config_manager.get_serpapi_settings()
+            )
             
             # Validate API key
             if not self.search_scraper.validate_api_key():
                 raise SearchScraperError("Invalid SerpAPI key")
             
-            # Initialize data processor
-            self.data_processor = DataProcessor()
-            
-            # Initialize report writer
-            self.report_writer = ReportWriter(
-                template_dir="templates",
-                output_dir=str(self.config_manager.get_output_dir())
-            )
+            self._initialize_processing_components()
             
             self.logger.info("All components initialized successfully")
             
@@ -78,85 +128,605 @@ class LocalRankLens:
             self.logger.error(f"Component initialization failed: {e}")
             raise
     
-    def run_analysis(self) -> str:
+    def _use_context_components(self) -> None:
+        """Reuse the application context's warm components for this run."""
+        # Validated once per context and periodically rechecked, not per run
+        self.context.ensure_api_key()
+        
+        self.search_scraper = self.context.search_scraper
+        self.response_cache = self.context.response_cache
+        self.data_processor = self._build_data_processor()
+        self.history_store = self.context.history_store
+        self.report_writer = self.context.get_report_writer(str(self.config_manager.get_output_dir()))
+        self.logger.info("Using shared application components")
+    
+    async def initialize_components_async(self, search_scraper: Optional[AsyncSearchScraper] = None) -> None:
         """
-        Run the complete analysis workflow.
+        Initialize components for an async analysis.
         
-        Returns:
-            Path to the generated report
+        Args:
+            search_scraper: Shared async scraper to use. When omitted a new
+                one is created (and its API key validated).
         """
         try:
-            self.logger.info("Starting LocalRankLens analysis")
-            
-            # Initialize components
-            self.initialize_components()
+            if search_scraper is None:
+                api_key = self.config_manager.get_serpapi_key()
+                search_scraper = AsyncSearchScraper(
+                    api_key,
+                    rate_limit_delay=self.performance_settings['rate_limit_delay'],
+                    max_connections=max(10, self.max_concurrency),
+                    cache=self._build_response_cache(),
+                    rate_limiter=self._build_rate_limiter(),
+                    **self.config_manager.get_serpapi_settings()
+                )
+                
+                # Validate API key
+                if not await search_scraper.validate_api_key():
+                    await search_scraper.close()
+                    raise SearchScraperError("Invalid SerpAPI key")
             
-            # Get configuration data
-            business_name = self.config_manager.get_business_name()
-            location = self.config_manager.get_location_string()
-            keywords = self.config_manager.get_keywords()
-            output_prefix = self.config_manager.get_output_prefix()
+            self.async_search_scraper = search_scraper
+            self._initialize_processing_components()
             
-            self.logger.info(f"Analyzing {business_name} in {location}")
+            self.logger.info("All async components initialized successfully")
             
-            # Collect all search results
-            all_results = []
+        except Exception as e:
+            self.logger.error(f"Component initialization failed: {e}")
+            raise
+    
+    def _build_rate_limiter(self) -> RateLimiter:
+        """Get the process-wide (or host-wide) rate limiter for SerpAPI."""
+        settings = self.performance_settings
+        if settings['rate_limit_db']:
+            self.logger.info(f"Sharing SerpAPI rate limit through {settings['rate_limit_db']}")
+        return create_rate_limiter(
+            settings['rate_limit_delay'],
+            burst=settings['rate_limit_burst'],
+            shared_path=settings['rate_limit_db'] or None
+        )
+    
+    def _build_response_cache(self) -> Optional[ResponseCache]:
+        """Create the response cache if one is configured."""
+        cache_settings = self.config_manager.get_cache_settings()
+        if not cache_settings['enabled']:
+            return None
+        
+        self.response_cache = ResponseCache(
+            path=cache_settings['path'],
+            ttls=cache_settings['ttl_seconds'],
+            default_ttl=cache_settings['default_ttl'],
+            max_entries=cache_settings['max_entries']
+        )
+        self.logger.info(f"Using SerpAPI response cache at {cache_settings['path']}")
+        return self.response_cache
+    
+    def _build_data_processor(self) -> DataProcessor:
+        """Create a data processor extracting this client's configured result depth."""
+        return DataProcessor(
+            max_maps_results=self.report_settings['max_maps_results'],
+            max_organic_results=self.report_settings['max_organic_results']
+        )
+    
+    def _initialize_processing_components(self) -> None:
+        """Initialize the data processor and report writer."""
+        # Initialize data processor
+        self.data_processor = self._build_data_processor()
+        
+        # Open the run history store, if configured
+        self.history_store = history_store_from_settings(self.config_manager.get_history_settings())
+        
+        # Initialize report writer
+        self.report_writer = ReportWriter(
+            template_dir="templates",
+            output_dir=str(self.config_manager.get_output_dir()),
+            bytecode_cache_dir=self.performance_settings['template_cache_dir'] or None,
+            pdf_pool=pdf_pool_from_settings(self.performance_settings),
+            pdf_backend=self.performance_settings['pdf_engine']
+        )
+    
+    def run_analysis(self, progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
+        """
+        Run the complete analysis workflow.
+        
+        Args:
+            progress_callback: Optional callable receiving progress events:
+                ``started`` (with ``total``), one ``keyword`` event per
+                processed keyword/group (with ``done`` and ``total``), then
+                ``completed`` (with ``report_path``) or ``failed``
+        
+        Returns:
+            Path to the generated report
+        """
+        self.progress_callback = progress_callback
+        started_at = time.time()
+        with metrics.run_scope() as run_metrics:
+            try:
+                self.logger.info("Starting LocalRankLens analysis")
+                
+                # Initialize components
+                self.initialize_components()
+                
+                location = self.config_manager.get_location_string()
+                tasks = self._build_tasks()
+                self._start_progress(len(tasks))
+                stored_results, pending = self._reuse_stored_results(tasks, location)
+                aggregator = self._start_aggregation(stored_results)
+                
+                # Fold each result into the aggregates as its search completes
+                for index, result in self._iter_searches([tasks[i] for i in pending], location):
+                    aggregator.add_at(pending[index], result)
+                
+                aggregated_data = aggregator.aggregated()
+                report_path = self._generate_outputs(aggregated_data['all_results'], aggregated_data)
+                self._report_progress({'type': 'completed', 'report_path': report_path})
+                return report_path
+                
+            except Exception as e:
+                self.logger.error(f"Analysis failed: {e}")
+                self._report_progress({'type': 'failed', 'error': str(e)})
+                raise
             
-            for group_name, keyword_list in keywords.items():
-                self.logger.info(f"Processing {group_name} keywords ({len(keyword_list)} keywords)")
+            finally:
+                self._dump_run_metrics(run_metrics, started_at)
+    
+    async def run_analysis_async(self, search_scraper: Optional[AsyncSearchScraper] = None,
+                                 progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> str:
+        """
+        Run the complete analysis workflow on the running event loop.
+        
+        Searches are awaited with at most ``max_concurrency`` in flight, and
+        the CPU-bound report generation runs in a worker thread, so many
+        analyses can share one process (and one ``search_scraper``).
+        
+        Args:
+            search_scraper: Shared async scraper. When omitted a scraper is
+                created for this run and closed afterwards.
+            progress_callback: Optional callable receiving progress events,
+                as for ``run_analysis``
+        
+        Returns:
+            Path to the generated report
+        """
+        self.progress_callback = progress_callback
+        owns_scraper = search_scraper is None
+        started_at = time.time()
+        with metrics.run_scope() as run_metrics:
+            try:
+                self.logger.info("Starting async LocalRankLens analysis")
+                
+                # Initialize components
+                await self.initialize_components_async(search_scraper)
                 
-                for keyword in keyword_list:
-                    try:
-                        # Perform search
-                        search_result = self.search_scraper.search(keyword, location)
-                        
-                        # Process the data
-                        processed_data = self.data_processor.process_search_results(
-                            search_result, keyword, group_name
+                location = self.config_manager.get_location_string()
+                tasks = self._build_tasks()
+                self._start_progress(len(tasks))
+                stored_results, pending = self._reuse_stored_results(tasks, location)
+                aggregator = self._start_aggregation(stored_results)
+                search_tasks = [tasks[i] for i in pending]
+                groups_by_keyword = self._group_tasks_by_keyword(search_tasks)
+                semaphore = asyncio.Semaphore(self.max_concurrency)
+                
+                async def run_keyword(keyword: str, indexes: List[int]) -> None:
+                    async with semaphore:
+                        processed = await self._analyze_keyword_async(
+                            keyword, [search_tasks[i][1] for i in indexes], location
                         )
-                        
-                        all_results.append(processed_data)
-                        
-                        self.logger.info(f"Successfully processed: {keyword}")
-                        
-                    except SearchScraperError as e:
-                        self.logger.error(f"Search failed for '{keyword}': {e}")
-                        # Add error result
-                        error_result = self.data_processor._create_empty_result(keyword, group_name)
-                        error_result['error_message'] = str(e)
-                        all_results.append(error_result)
-                    
-                    except Exception as e:
-                        self.logger.error(f"Unexpected error processing '{keyword}': {e}")
-                        error_result = self.data_processor._create_empty_result(keyword, group_name)
-                        error_result['error_message'] = f"Unexpected error: {e}"
-                        all_results.append(error_result)
-            
-            # Aggregate results
+                    # Fold results in by task index to keep config order
+                    for index, result in zip(indexes, processed):
+                        aggregator.add_at(pending[index], result)
+                    self._report_keyword_progress(processed)
+                
+                await asyncio.gather(
+                    *(run_keyword(keyword, indexes) for keyword, indexes in groups_by_keyword.items())
+                )
+                
+                aggregated_data = aggregator.aggregated()
+                report_path = await asyncio.to_thread(
+                    self._generate_outputs, aggregated_data['all_results'], aggregated_data
+                )
+                self._report_progress({'type': 'completed', 'report_path': report_path})
+                return report_path
+                
+            except Exception as e:
+                self.logger.error(f"Analysis failed: {e}")
+                self._report_progress({'type': 'failed', 'error': str(e)})
+                raise
+            
+            finally:
+                if owns_scraper and self.async_search_scraper is not None:
+                    await self.async_search_scraper.close()
+                self._dump_run_metrics(run_metrics, started_at)
+    
+    def _build_tasks(self) -> List[Tuple[str, str]]:
+        """Build the (keyword, group_name) search tasks in config order."""
+        business_name = self.config_manager.get_business_name()
+        location = self.config_manager.get_location_string()
+        keywords = self.config_manager.get_keywords()
+        
+        self.logger.info(f"Analyzing {business_name} in {location}")
+        
+        tasks = []
+        for group_name, keyword_list in keywords.items():
+            self.logger.info(f"Processing {group_name} keywords ({len(keyword_list)} keywords)")
+            tasks.extend((keyword, group_name) for keyword in keyword_list)
+        return tasks
+    
+    def _group_tasks_by_keyword(self, tasks: List[Tuple[str, str]]) -> Dict[str, List[int]]:
+        """
+        Map each distinct keyword to the indexes of the tasks that use it.
+        
+        A keyword listed in several groups is searched once and its response
+        processed for every group.
+        """
+        groups_by_keyword: Dict[str, List[int]] = {}
+        for index, (keyword, _) in enumerate(tasks):
+            groups_by_keyword.setdefault(keyword, []).append(index)
+        
+        duplicates = len(tasks) - len(groups_by_keyword)
+        if duplicates:
+            self.logger.info(f"Skipping {duplicates} duplicate keyword searches shared across groups")
+        return groups_by_keyword
+    
+    def _generate_outputs(self, all_results: List[Dict[str, Any]],
+                          aggregated_data: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Write the report for processed results and log a summary.
+        
+        Args:
+            all_results: Processed results in task order
+            aggregated_data: Aggregates already built while the results
+                streamed in; aggregated here when omitted
+        
+        Returns:
+            Path to the generated report
+        """
+        business_name = self.config_manager.get_business_name()
+        location = self.config_manager.get_location_string()
+        output_prefix = self.config_manager.get_output_prefix()
+        
+        self._record_history(all_results)
+        
+        if aggregated_data is None:
             self.logger.info("Aggregating results for reporting")
             aggregated_data = self.data_processor.aggregate_results(all_results)
-            
-            # Generate report (default to PDF)
-            self.logger.info("Generating PDF report")
-            report_path = self.report_writer.generate_report(
-                aggregated_data, business_name, location, output_prefix, format="pdf"
+        
+        # Generate report (default to PDF)
+        self.logger.info(f"Generating {self.report_format.upper()} report")
+        report_path = self.report_writer.generate_report(
+            aggregated_data, business_name, location, output_prefix, format=self.report_format,
+            max_maps_results=self.report_settings['max_maps_results'],
+            max_organic_results=self.report_settings['max_organic_results']
+        )
+        
+        # Generate summary
+        summary = self.report_writer.generate_summary_report(
+            aggregated_data, business_name, location
+        )
+        
+        # Log summary statistics
+        self._log_summary_stats(summary)
+        
+        scraper = self.search_scraper or self.async_search_scraper
+        if scraper is not None and scraper.get_requests_saved():
+            self.logger.info(f"Coalesced {scraper.get_requests_saved()} duplicate in-flight requests")
+        
+        if self.response_cache is not None:
+            stats = self.response_cache.get_stats()
+            self.logger.info(
+                f"Response cache: {stats['hits']} hits, {stats['misses']} misses, "
+                f"{stats['entries']} entries"
             )
+        
+        self.logger.info(f"Analysis completed successfully. Report saved to: {report_path}")
+        return report_path
+
+    def _reuse_stored_results(self, tasks: List[Tuple[str, str]],
+                              location: str) -> Tuple[List[Optional[Dict[str, Any]]], List[int]]:
+        """
+        Fill in tasks from fresh stored results when running incrementally.
+        
+        A keyword is searched again when the history store has no successful
+        result for it, the latest one is older than ``max_age_hours`` or it
+        was extracted at a shallower result depth than now configured.
+        Reused results are relabelled with the task's group and tagged with
+        ``history_observed_at`` so they are not recorded a second time.
+        
+        Args:
+            tasks: List of (keyword, group_name) pairs in config order
+            location: Location for all searches
             
-            # Generate summary
-            summary = self.report_writer.generate_summary_report(
-                aggregated_data, business_name, location
+        Returns:
+            Tuple of (results in task order, None for tasks still to search;
+            indexes of the tasks to search)
+        """
+        all_results: List[Optional[Dict[str, Any]]] = [None] * len(tasks)
+        settings = self.config_manager.get_history_settings()
+        if self.history_store is None or not settings['incremental']:
+            return all_results, list(range(len(tasks)))
+        
+        business_name = self.config_manager.get_business_name()
+        keywords = [keyword for keyword, _ in tasks]
+        try:
+            stored = self.history_store.latest_results(business_name, location, keywords)
+            # Every keyword ever stored: incremental runs record only what they searched
+            stored_keywords = self.history_store.keyword_groups(business_name, location)
+        except Exception as e:
+            self.logger.warning(f"Incremental mode unavailable, searching every keyword: {e}")
+            return all_results, list(range(len(tasks)))
+        
+        cutoff = time.time() - settings['max_age_hours'] * 3600
+        depth = {'maps_listings': self.report_settings['max_maps_results'],
+                 'organic_results': self.report_settings['max_organic_results']}
+        pending, missing, stale = [], set(), set()
+        for index, (keyword, group_name) in enumerate(tasks):
+            entry = stored.get(keyword)
+            if entry is None or entry['observed_at'] < cutoff or self._shallower(entry['result'], depth):
+                (missing if entry is None else stale).add(keyword)
+                pending.append(index)
+                continue
+            all_results[index] = dict(entry['result'], keyword_group=group_name,
+                                      history_observed_at=entry['observed_at'])
+        
+        removed = set(stored_keywords) - set(keywords)
+        self.logger.info(
+            f"Incremental run: reusing {len(set(keywords)) - len(missing) - len(stale)} fresh keywords, "
+            f"searching {len(missing)} new and {len(stale)} stale"
+            + (f"; {len(removed)} stored keywords no longer configured" if removed else "")
+        )
+        self._report_keyword_progress([result for result in all_results if result is not None])
+        return all_results, pending
+    
+    @staticmethod
+    def _shallower(result: Dict[str, Any], depth: Dict[str, int]) -> bool:
+        """Whether a stored result was extracted at a lower depth than ``depth``."""
+        stored_depth = result.get('result_depth')
+        if stored_depth is None:
+            # Recorded before depths were stored: only a full list proves the depth
+            return any(len(result.get(kind) or []) < limit for kind, limit in depth.items())
+        return any(stored_depth.get(kind, 0) < limit for kind, limit in depth.items())
+    
+    def _record_history(self, all_results: List[Dict[str, Any]]) -> None:
+        """Append this run's newly searched results to the history store, if configured."""
+        if self.history_store is None:
+            return
+        
+        # Results reused from the store are already recorded
+        fresh_results = [result for result in all_results if 'history_observed_at' not in result]
+        if not fresh_results:
+            return
+        
+        try:
+            self.history_store.record_run(
+                self.config_manager.get_business_name(),
+                self.config_manager.get_location_string(),
+                fresh_results
             )
+        except Exception as e:
+            # History is a side channel; never fail the report over it
+            self.logger.warning(f"Failed to record run history: {e}")
+
+    def _start_aggregation(self, stored_results: List[Optional[Dict[str, Any]]]) -> ResultAggregator:
+        """Create this run's aggregator, seeded with any results reused from history."""
+        aggregator = ResultAggregator(columnar=self.performance_settings['columnar_aggregation'])
+        for index, result in enumerate(stored_results):
+            if result is not None:
+                aggregator.add_at(index, result)
+        return aggregator
+
+    def _iter_searches(self, tasks: List[Tuple[str, str]],
+                       location: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Search and process every (keyword, group) task, yielding results as they complete.
+        
+        Each distinct keyword is searched once. With ``max_concurrency`` above
+        1 the searches run on a bounded thread pool; the scraper's rate
+        limiter is shared by all threads, so the global request budget is
+        unchanged. Only about twice as many searches as workers are queued at
+        a time, and each raw response is released as soon as it has been
+        processed, so memory does not grow with the keyword count beyond the
+        processed results the caller keeps.
+        
+        Args:
+            tasks: List of (keyword, group_name) pairs in config order
+            location: Location for all searches
             
-            # Log summary statistics
-            self._log_summary_stats(summary)
+        Yields:
+            (task index, processed result) pairs in completion order
+        """
+        groups_by_keyword = self._group_tasks_by_keyword(tasks)
+        items = iter(groups_by_keyword.items())
+        
+        workers = min(self.max_concurrency, len(groups_by_keyword))
+        if workers <= 1:
+            for keyword, indexes in items:
+                processed = self._analyze_keyword(keyword, [tasks[i][1] for i in indexes], location)
+                self._report_keyword_progress(processed)
+                yield from zip(indexes, processed)
+            return
+        
+        self.logger.info(f"Running {len(groups_by_keyword)} searches with concurrency {workers}")
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lrl-search") as executor:
+            in_flight = {}
             
-            self.logger.info(f"Analysis completed successfully. Report saved to: {report_path}")
-            return report_path
+            def submit_next() -> None:
+                item = next(items, None)
+                if item is not None:
+                    keyword, indexes = item
+                    # Run each search in a copy of this context so run-scoped metrics see it
+                    future = executor.submit(contextvars.copy_context().run, self._analyze_keyword,
+                                             keyword, [tasks[i][1] for i in indexes], location)
+                    in_flight[future] = indexes
             
+            for _ in range(workers * 2):
+                submit_next()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    indexes = in_flight.pop(future)
+                    processed = future.result()
+                    self._report_keyword_progress(processed)
+                    submit_next()
+                    yield from zip(indexes, processed)
+    
+    def _start_progress(self, total: int) -> None:
+        """Reset progress counters and report the start of a run."""
+        with self._progress_lock:
+            self._progress_done = 0
+            self._progress_total = total
+        self._report_progress({'type': 'started', 'total': total})
+    
+    def _report_keyword_progress(self, processed: List[Dict[str, Any]]) -> None:
+        """Report one progress event per processed keyword/group result."""
+        if self.progress_callback is None:
+            return
+        
+        for result in processed:
+            with self._progress_lock:
+                self._progress_done += 1
+                done = self._progress_done
+            event = {
+                'type': 'keyword',
+                'keyword': result.get('keyword'),
+                'keyword_group': result.get('keyword_group'),
+                'success': not (result.get('error') or result.get('error_message')),
+                'done': done,
+                'total': self._progress_total
+            }
+            if 'history_observed_at' in result:
+                event['reused'] = True
+            if result.get('error_message'):
+                event['error'] = result['error_message']
+            else:
+                event['competitors'] = self._summarize_competitors(result)
+            self._report_progress(event)
+    
+    def _summarize_competitors(self, result: Dict[str, Any], limit: int = 3) -> Dict[str, Any]:
+        """Compact view of a keyword's top competitors for progress events."""
+        return {
+            'maps_listings': [
+                {key: listing.get(key) for key in ('position', 'title', 'rating', 'reviews')}
+                for listing in result.get('maps_listings', [])[:limit]
+            ],
+            'local_services_ads': [
+                {key: ad.get(key) for key in ('position', 'title', 'rating', 'reviews')}
+                for ad in result.get('local_services_ads', [])[:limit]
+            ],
+            'organic_results': [
+                {key: organic.get(key) for key in ('position', 'title', 'domain')}
+                for organic in result.get('organic_results', [])[:limit]
+            ],
+            'counts': {
+                'maps_listings': len(result.get('maps_listings', [])),
+                'local_services_ads': len(result.get('local_services_ads', [])),
+                'organic_results': len(result.get('organic_results', [])),
+                'ads': len(result.get('ads', []))
+            }
+        }
+    
+    def _report_progress(self, event: Dict[str, Any]) -> None:
+        """Send a progress event to the callback; callback errors never fail the run."""
+        if self.progress_callback is None:
+            return
+        try:
+            self.progress_callback(event)
         except Exception as e:
-            self.logger.error(f"Analysis failed: {e}")
-            raise
+            self.logger.warning(f"Progress callback failed: {e}")
+    
+    def _analyze_keyword(self, keyword: str, group_names: List[str], location: str) -> List[Dict[str, Any]]:
+        """
+        Search a keyword once and process the response for each of its groups.
+        
+        Never raises: failures become error results.
+        """
+        try:
+            # Perform search
+            if self._needs_paging():
+                search_result = self.search_scraper.search_depth(keyword, location, **self._depth_kwargs())
+            else:
+                search_result = self.search_scraper.search(keyword, location)
+        except Exception as e:
+            return [self._error_result(e, keyword, group_name) for group_name in group_names]
+        
+        return [self._safe_process_result(search_result, keyword, group_name)
+                for group_name in group_names]
+    
+    async def _analyze_keyword_async(self, keyword: str, group_names: List[str],
+                                     location: str) -> List[Dict[str, Any]]:
+        """Async variant of ``_analyze_keyword`` using the async scraper."""
+        try:
+            if self._needs_paging():
+                search_result = await self.async_search_scraper.search_depth(keyword, location,
+                                                                             **self._depth_kwargs())
+            else:
+                search_result = await self.async_search_scraper.search(keyword, location)
+        except Exception as e:
+            return [self._error_result(e, keyword, group_name) for group_name in group_names]
+        
+        return [self._safe_process_result(search_result, keyword, group_name)
+                for group_name in group_names]
+    
+    def _needs_paging(self) -> bool:
+        """Whether the configured organic depth goes beyond the first results page."""
+        return self.report_settings['max_organic_results'] > ORGANIC_PAGE_SIZE
+    
+    def _depth_kwargs(self) -> Dict[str, Any]:
+        """``search_depth`` arguments for the configured depth and client domain."""
+        client_domain = self.report_settings['client_domain']
+        return {
+            'depth': self.report_settings['max_organic_results'],
+            'stop_domains': [client_domain] if client_domain else [],
+            'page_concurrency': self.report_settings['page_concurrency']
+        }
+    
+    def _safe_process_result(self, search_result: Dict[str, Any], keyword: str,
+                             group_name: str) -> Dict[str, Any]:
+        """Process a response, turning unexpected failures into an error result."""
+        try:
+            return self._process_result(search_result, keyword, group_name)
+        except Exception as e:
+            return self._error_result(e, keyword, group_name)
+    
+    def _process_result(self, search_result: Dict[str, Any], keyword: str, group_name: str) -> Dict[str, Any]:
+        """Process a raw search response for one keyword."""
+        processed_data = self.data_processor.process_search_results(
+            search_result, keyword, group_name
+        )
+        
+        self.logger.info(f"Successfully processed: {keyword}")
+        return processed_data
+    
+    def _error_result(self, error: Exception, keyword: str, group_name: str) -> Dict[str, Any]:
+        """Build the placeholder result recorded for a failed keyword."""
+        error_result = self.data_processor._create_empty_result(keyword, group_name)
+        
+        if isinstance(error, SearchScraperError):
+            self.logger.error(f"Search failed for '{keyword}': {error}")
+            error_result['error_message'] = str(error)
+        else:
+            self.logger.error(f"Unexpected error processing '{keyword}': {error}")
+            error_result['error_message'] = f"Unexpected error: {error}"
+        
+        return error_result
 
+    def _dump_run_metrics(self, run_metrics: MetricsRegistry, started_at: float) -> None:
+        """Write this run's metrics as JSON if a metrics directory is configured."""
+        settings = self.config_manager.get_metrics_settings()
+        if not settings['dump_enabled']:
+            return
+        
+        timestamp = datetime.fromtimestamp(started_at).strftime("%Y%m%d_%H%M%S")
+        path = Path(settings['dump_dir']) / f"{self.config_manager.get_output_prefix()}_metrics_{timestamp}.json"
+        try:
+            run_metrics.dump_json(str(path), extra={
+                'business_name': self.config_manager.get_business_name(),
+                'location': self.config_manager.get_location_string(),
+                'started_at': datetime.fromtimestamp(started_at).isoformat(),
+                'duration_seconds': time.time() - started_at
+            })
+            self.logger.info(f"Run metrics written to {path}")
+        except OSError as e:
+            self.logger.warning(f"Failed to write run metrics: {e}")
+    
     def _log_summary_stats(self, summary: Dict[str, Any]) -> None:
         """Log summary statistics."""
         self.logger.info("=== ANALYSIS SUMMARY ===")
@@ -0,0 +1,262 @@
+"""
+Metrics for LocalRankLens
+
+Lightweight timers, counters and histograms for the analysis pipeline.
+Observations are fanned out to pluggable sinks: the process-wide in-memory
+registry (exported as Prometheus text by the web API), plus any sinks scoped
+to a single run, such as the per-run JSON dump.
+"""
+
+import json
+import time
+import bisect
+import logging
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Iterator
+
+# Histogram bucket upper bounds in seconds, from cache hits to slow PDFs
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+class MetricsSink:
+    """Interface for metric destinations."""
+
+    def increment(self, name: str, amount: float = 1, labels: Optional[Dict[str, Any]] = None) -> None:
+        """Add ``amount`` to a counter."""
+        raise NotImplementedError
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        """Record one histogram observation (seconds for timers)."""
+        raise NotImplementedError
+
+
+class MetricsRegistry(MetricsSink):
+    """Thread-safe in-memory counters and histograms."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Initialize the registry.
+
+        Args:
+            buckets: Histogram bucket upper bounds
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name: str, amount: float = 1, labels: Optional[Dict[str, Any]] = None) -> None:
+        key = _label_key(labels or {})
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, labels: Optional[Dict[str, Any]] = None) -> None:
+        key = _label_key(labels or {})
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = {
+                    'count': 0, 'sum': 0.0, 'min': value, 'max': value,
+                    'buckets': [0] * len(self.buckets)
+                }
+            histogram['count'] += 1
+            histogram['sum'] += value
+            histogram['min'] = min(histogram['min'], value)
+            histogram['max'] = max(histogram['max'], value)
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                histogram['buckets'][index] += 1
+
+    def reset(self) -> None:
+        """Drop every recorded series."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a JSON-serializable copy of every series.
+
+        Returns:
+            Dictionary with ``counters`` and ``histograms``, each mapping a
+            metric name to a list of series with their labels
+        """
+        with self._lock:
+            counters = {
+                name: [{'labels': dict(key), 'value': value} for key, value in series.items()]
+                for name, series in self._counters.items()
+            }
+            histograms = {}
+            for name, series in self._histograms.items():
+                histograms[name] = []
+                for key, histogram in series.items():
+                    histograms[name].append({
+                        'labels': dict(key),
+                        'count': histogram['count'],
+                        'sum': histogram['sum'],
+                        'mean': histogram['sum'] / histogram['count'],
+                        'min': histogram['min'],
+                        'max': histogram['max'],
+                        'buckets': dict(zip((str(b) for b in self.buckets), histogram['buckets']))
+                    })
+        return {'counters': counters, 'histograms': histograms}
+
+    def dump_json(self, path: str, extra: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Write a snapshot to a JSON file.
+
+        Args:
+            path: Destination file
+            extra: Additional top-level fields (e.g. run metadata)
+
+        Returns:
+            Path of the written file
+        """
+        data = dict(extra or {})
+        data.update(self.snapshot())
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        return str(path)
+
+    def render_prometheus(self, namespace: str = "localranklens") -> str:
+        """Render every series in the Prometheus text exposition format."""
+        def fmt_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = key + extra
+            if not pairs:
+                return ''
+            escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+                       for _, value in pairs)
+            return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                metric = f"{namespace}_{name}"
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in series.items():
+                    lines.append(f"{metric}{fmt_labels(key)} {value}")
+
+            for name, series in sorted(self._histograms.items()):
+                metric = f"{namespace}_{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(self.buckets, histogram['buckets']):
+                        cumulative += count
+                        lines.append(f"{metric}_bucket{fmt_labels(key, (('le', str(bound)),))} {cumulative}")
+                    lines.append(f"{metric}_bucket{fmt_labels(key, (('le', '+Inf'),))} {histogram['count']}")
+                    lines.append(f"{metric}_sum{fmt_labels(key)} {histogram['sum']}")
+                    lines.append(f"{metric}_count{fmt_labels(key)} {histogram['count']}")
+
+        return '\n'.join(lines) + '\n'
+
+
+class Metrics:
+    """
+    Dispatches observations to global sinks and to run-scoped sinks.
+
+    Run-scoped sinks follow the current ``contextvars`` context, so
+    concurrent analyses in one process each see only their own metrics as
+    long as worker threads run inside a copy of the caller's context.
+    """
+
+    def __init__(self, sinks: Optional[List[MetricsSink]] = None):
+        self.sinks = list(sinks or [])
+        self._run_sinks: contextvars.ContextVar = contextvars.ContextVar('metrics_run_sinks', default=())
+        self.logger = logging.getLogger(__name__)
+
+    def add_sink(self, sink: MetricsSink) -> None:
+        """Send every future observation to ``sink``."""
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink: MetricsSink) -> None:
+        """Stop sending observations to ``sink``."""
+        if sink in self.sinks:
+            self.sinks.remove(sink)
+
+    def _targets(self) -> Iterator[MetricsSink]:
+        yield from self.sinks
+        yield from self._run_sinks.get()
+
+    def increment(self, name: str, amount: float = 1, **labels) -> None:
+        """Add ``amount`` to a counter on every sink."""
+        for sink in self._targets():
+            try:
+                sink.increment(name, amount, labels)
+            except Exception as e:
+                self.logger.debug(f"Metrics sink failed: {e}")
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record a histogram observation on every sink."""
+        for sink in self._targets():
+            try:
+                sink.observe(name, value, labels)
+            except Exception as e:
+                self.logger.debug(f"Metrics sink failed: {e}")
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """
+        Time a block as a histogram in seconds.
+
+        Failed blocks are recorded with ``status="error"`` so slow failures
+        don't disappear from the latency breakdown.
+        """
+        start = time.perf_counter()
+        status = 'ok'
+        try:
+            yield
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, status=status, **labels)
+
+    def timed(self, name: str, **labels):
+        """Decorator form of :meth:`timer`."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @contextmanager
+    def run_scope(self, sink: Optional[MetricsSink] = None):
+        """
+        Also record observations made in this context to a run-scoped sink.
+
+        Yields:
+            The run sink (a fresh :class:`MetricsRegistry` by default)
+        """
+        sink = sink or MetricsRegistry()
+        token = self._run_sinks.set(self._run_sinks.get() + (sink,))
+        try:
+            yield sink
+        finally:
+            self._run_sinks.reset(token)
+
+
+# Process-wide registry and dispatcher
+registry = MetricsRegistry()
+metrics = Metrics([registry])
+
+
+def get_registry() -> MetricsRegistry:
+    """Get the process-wide in-memory registry."""
+    return registry
@@ -0,0 +1,496 @@
+"""
+PDF Backends for LocalRankLens
+
+Pluggable engines that turn a report into a PDF file:
+
+- ``xhtml2pdf``: converts the rendered report HTML (optionally in the warm
+  worker pool from ``pdf_renderer``)
+- ``reportlab``: builds the same sections directly from the template data
+  dict with reportlab's platypus layout engine, skipping the HTML/CSS round
+  trip entirely
+"""
+
+import logging
+from xml.sax.saxutils import escape
+from typing import Dict, Any, Optional, List, Callable
+
+from pdf_renderer import PDFRenderPool, PDFRenderError, render_pdf
+from data_processor import MAX_MAPS_RESULTS, MAX_ORGANIC_RESULTS
+
+try:
+    import xhtml2pdf  # noqa: F401
+    XHTML2PDF_AVAILABLE = True
+except ImportError:
+    XHTML2PDF_AVAILABLE = False
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import (
+        KeepTogether, ListFlowable, ListItem, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+    )
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
+
+PRIMARY_COLOR = '#2563eb'
+HEADING_COLOR = '#1e40af'
+MUTED_COLOR = '#6b7280'
+# A4 width minus the 1in side margins, in points
+CONTENT_WIDTH = 595.27 - 2 * 72
+
+
+class PDFBackend:
+    """
+    Interface for PDF engines.
+
+    ``needs_html`` tells the ReportWriter whether to render the Jinja
+    template (with PDF styles) before calling ``render``.
+    """
+
+    name = "base"
+    needs_html = True
+    available = False
+    requirement = ""
+
+    def render(self, dest_path: str, template_data: Dict[str, Any],
+               html_content: Optional[str] = None) -> str:
+        """
+        Write the report PDF.
+
+        Args:
+            dest_path: File to write the PDF to
+            template_data: Data prepared by ``ReportWriter._prepare_template_data``
+            html_content: Rendered report HTML when ``needs_html`` is set
+
+        Returns:
+            Path of the written PDF
+
+        Raises:
+            PDFRenderError: If rendering fails
+        """
+        raise NotImplementedError
+
+
+class XHTML2PDFBackend(PDFBackend):
+    """Converts rendered report HTML with xhtml2pdf, inline or in a render pool."""
+
+    name = "xhtml2pdf"
+    needs_html = True
+    available = XHTML2PDF_AVAILABLE
+    requirement = "xhtml2pdf"
+
+    def __init__(self, pdf_pool: Optional[PDFRenderPool] = None):
+        """
+        Initialize the backend.
+
+        Args:
+            pdf_pool: Render pool for PDFs; renders inline when omitted
+        """
+        self.pdf_pool = pdf_pool
+
+    def render(self, dest_path: str, template_data: Dict[str, Any],
+               html_content: Optional[str] = None) -> str:
+        if html_content is None:
+            raise PDFRenderError("xhtml2pdf backend requires rendered HTML")
+
+        if self.pdf_pool is not None:
+            # Render in a warm worker process so the GIL stays free for searches
+            return self.pdf_pool.render(html_content, dest_path)
+        return render_pdf(html_content, dest_path)
+
+
+class ReportLabBackend(PDFBackend):
+    """Builds the report directly from template data with reportlab platypus."""
+
+    name = "reportlab"
+    needs_html = False
+    available = REPORTLAB_AVAILABLE
+    requirement = "reportlab"
+
+    def __init__(self):
+        """Initialize the backend and its paragraph styles."""
+        self.logger = logging.getLogger(__name__)
+        self.styles = self._build_styles() if REPORTLAB_AVAILABLE else {}
+
+    def render(self, dest_path: str, template_data: Dict[str, Any],
+               html_content: Optional[str] = None) -> str:
+        if not REPORTLAB_AVAILABLE:
+            raise PDFRenderError("reportlab is not installed")
+
+        story = self.build_story(template_data)
+        doc = SimpleDocTemplate(
+            dest_path,
+            pagesize=A4,
+            leftMargin=inch, rightMargin=inch, topMargin=inch, bottomMargin=inch,
+            title=f"LocalRankLens Report - {template_data.get('business_name', '')}",
+            author="LocalRankLens"
+        )
+        try:
+            doc.build(story)
+        except Exception as e:
+            raise PDFRenderError(f"PDF generation failed with errors: {e}")
+        return dest_path
+
+    def build_story(self, data: Dict[str, Any]) -> list:
+        """Build the flowables for every report section."""
+        insights = data.get('competitive_insights') or {}
+        story = []
+        story += self._header_section(data)
+        story += self._summary_section(data)
+        if insights.get('competitive_analysis'):
+            story += self._competitive_section(insights['competitive_analysis'])
+        if insights.get('seo_recommendations'):
+            story += self._seo_section(insights['seo_recommendations'])
+        if insights.get('gmb_recommendations'):
+            story += self._gmb_section(insights['gmb_recommendations'])
+        if insights.get('business_insights'):
+            story += self._business_section(insights['business_insights'])
+        for group_name, group_data in (data.get('results_by_group') or {}).items():
+            story += self._group_section(group_name, group_data, data.get('max_maps_results', MAX_MAPS_RESULTS),
+                                         data.get('max_organic_results', MAX_ORGANIC_RESULTS))
+        story += self._footer_section(data)
+        return story
+
+    # Styles and building blocks
+
+    def _build_styles(self) -> Dict[str, ParagraphStyle]:
+        """Paragraph styles mirroring the PDF CSS of the HTML template."""
+        base = getSampleStyleSheet()
+        body = ParagraphStyle('LRLBody', parent=base['BodyText'], fontName='Helvetica',
+                              fontSize=10, leading=14, textColor=colors.HexColor('#333333'))
+        return {
+            'title': ParagraphStyle('LRLTitle', parent=base['Title'], fontSize=22,
+                                    textColor=colors.white, alignment=TA_CENTER),
+            'subtitle': ParagraphStyle('LRLSubtitle', parent=body, fontSize=11,
+                                       textColor=colors.white, alignment=TA_CENTER),
+            'section': ParagraphStyle('LRLSection', parent=base['Heading1'], fontSize=16,
+                                      textColor=colors.HexColor(HEADING_COLOR),
+                                      spaceBefore=14, spaceAfter=8),
+            'heading': ParagraphStyle('LRLHeading', parent=base['Heading3'], fontSize=12,
+                                      textColor=colors.HexColor(HEADING_COLOR),
+                                      spaceBefore=8, spaceAfter=4),
+            'keyword': ParagraphStyle('LRLKeyword', parent=base['Heading4'], fontSize=11,
+                                      spaceBefore=8, spaceAfter=4),
+            'body': body,
+            'item_title': ParagraphStyle('LRLItemTitle', parent=body, fontName='Helvetica-Bold'),
+            'meta': ParagraphStyle('LRLMeta', parent=body, fontSize=9, leading=12,
+                                   textColor=colors.HexColor(MUTED_COLOR)),
+            'stat_number': ParagraphStyle('LRLStatNumber', parent=body, fontName='Helvetica-Bold',
+                                          fontSize=16, leading=20, alignment=TA_CENTER,
+                                          textColor=colors.HexColor(PRIMARY_COLOR)),
+            'stat_label': ParagraphStyle('LRLStatLabel', parent=body, fontSize=8, leading=10,
+                                         alignment=TA_CENTER, textColor=colors.HexColor(MUTED_COLOR)),
+        }
+
+    def _para(self, text: Any, style: str = 'body') -> 'Paragraph':
+        """Paragraph with the text escaped for reportlab's markup parser."""
+        return Paragraph(escape(str(text)), self.styles[style])
+
+    def _markup(self, markup: str, style: str = 'body') -> 'Paragraph':
+        """Paragraph from trusted markup (values must already be escaped)."""
+        return Paragraph(markup, self.styles[style])
+
+    def _bullets(self, items: List[Any]) -> list:
+        """Bulleted list, or nothing for an empty list."""
+        if not items:
+            return []
+        return [ListFlowable(
+            [ListItem(self._para(item), leftIndent=12) for item in items],
+            bulletType='bullet', start='•', leftIndent=12
+        )]
+
+    def _stat_grid(self, stats: List[tuple]) -> 'Table':
+        """Row of stat cards: (value, label) pairs."""
+        cells = [[self._para(value, 'stat_number'), self._para(label, 'stat_label')]
+                 for value, label in stats]
+        table = Table([cells], colWidths=[CONTENT_WIDTH / len(cells)] * len(cells))
+        table.setStyle(TableStyle([
+            ('BOX', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+            ('INNERGRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#e5e7eb')),
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f8fafc')),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+        ]))
+        return table
+
+    def _card(self, flowables: list, accent: str = PRIMARY_COLOR) -> 'Table':
+        """Shaded block with a coloured left border, like the template's result cards."""
+        table = Table([[flowables]], colWidths=[CONTENT_WIDTH])
+        table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#f9f9f9')),
+            ('LINEBEFORE', (0, 0), (0, -1), 3, colors.HexColor(accent)),
+            ('LEFTPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ]))
+        return table
+
+    @staticmethod
+    def _join(parts: List[Optional[str]]) -> str:
+        """Join the non-empty detail fragments with separators."""
+        return ' | '.join(part for part in parts if part)
+
+    # Sections
+
+    def _header_section(self, data: Dict[str, Any]) -> list:
+        banner = Table([[self._para('LocalRankLens Report', 'title')],
+                        [self._para(f"Local Search Competitive Intelligence for {data.get('business_name', '')}",
+                                    'subtitle')]],
+                       colWidths=[CONTENT_WIDTH])
+        banner.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor(PRIMARY_COLOR)),
+            ('TOPPADDING', (0, 0), (-1, -1), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 12),
+        ]))
+
+        meta = Table([
+            [self._para('Business', 'meta'), self._para('Location', 'meta'),
+             self._para('Report Date', 'meta'), self._para('Keywords Analyzed', 'meta')],
+            [self._para(data.get('business_name', ''), 'item_title'), self._para(data.get('location', ''), 'item_title'),
+             self._para(data.get('report_date', ''), 'item_title'), self._para(data.get('total_keywords', 0), 'item_title')]
+        ], colWidths=[CONTENT_WIDTH / 4] * 4)
+        meta.setStyle(TableStyle([('VALIGN', (0, 0), (-1, -1), 'TOP')]))
+        return [banner, Spacer(1, 12), meta, Spacer(1, 6)]
+
+    def _summary_section(self, data: Dict[str, Any]) -> list:
+        summary = data.get('summary') or {}
+        business = escape(str(data.get('business_name', '')))
+        location = escape(str(data.get('location', '')))
+        keywords = escape(str(data.get('total_keywords', 0)))
+        successful = summary.get('successful_searches', 0)
+
+        return [
+            self._para('Executive Summary', 'section'),
+            self._markup(
+                f"This report analyzes local search visibility for <b>{business}</b> across {keywords} "
+                f"strategic keywords in {location}. The analysis covers Google Maps listings, Local "
+                f"Services Ads, and organic search results to provide comprehensive competitive intelligence."
+            ),
+            Spacer(1, 8),
+            self._stat_grid([
+                (successful, 'Successful Searches'),
+                (data.get('total_maps_listings', 0), 'Maps Listings Found'),
+                (data.get('total_local_services', 0), 'Local Services Ads'),
+                (data.get('total_organic_results', 0), 'Organic Results'),
+            ]),
+            self._para('Data Sources & Methodology', 'heading'),
+            *self._bullets([
+                'Search Engine: Google Search via SerpAPI (real-time data)',
+                f"Location: {data.get('location', '')} - localized search results",
+                f"Data Points Collected: Google Maps/Local Pack listings "
+                f"(top {data.get('max_maps_results', MAX_MAPS_RESULTS)}), Local Services Ads (Google Guaranteed), "
+                f"organic search results (top {data.get('max_organic_results', MAX_ORGANIC_RESULTS)}), paid search ads",
+                f"Analysis Date: {data.get('report_date', '')}",
+                f"Keywords Processed: {successful} of {data.get('total_keywords', 0)} successfully analyzed",
+            ]),
+            self._para('Note: This competitive intelligence is based on public search results and provides '
+                       'insights into your market landscape for strategic planning.', 'meta'),
+        ]
+
+    def _competitive_section(self, analysis: Dict[str, Any]) -> list:
+        market = analysis.get('market_analysis') or {}
+        story = [
+            self._para('Competitive Landscape Analysis', 'section'),
+            self._stat_grid([
+                (analysis.get('total_maps_competitors', 0), 'Maps Competitors'),
+                (analysis.get('total_organic_competitors', 0), 'Organic Competitors'),
+                (f"{market.get('opportunity_score', 0)}%", 'Market Opportunity'),
+            ]),
+            self._para('Top Maps Competitors', 'heading'),
+        ]
+        for competitor in (analysis.get('top_maps_competitors') or [])[:3]:
+            story.append(self._card([
+                self._para(competitor.get('name', ''), 'item_title'),
+                self._para(f"{competitor.get('avg_rating')} rating | {competitor.get('total_reviews')} reviews | "
+                           f"Appears in {competitor.get('appearances')} searches", 'meta'),
+                self._para(f"Phone: {competitor.get('phone')}", 'meta'),
+            ]))
+
+        story.append(self._para('Top Organic Competitors', 'heading'))
+        for competitor in (analysis.get('top_organic_competitors') or [])[:3]:
+            story.append(self._card([
+                self._para(competitor.get('domain', ''), 'item_title'),
+                self._para(f"Appears in {competitor.get('appearances')} searches | "
+                           f"Avg Position: {competitor.get('avg_position', 0):.1f}", 'meta'),
+            ]))
+
+        story += [
+            self._para('Market Analysis', 'heading'),
+            self._markup(f"<b>Competition Level:</b> {escape(str(market.get('market_saturation', '')))}"),
+            self._markup(f"<b>Recommended Strategy:</b> {escape(str(market.get('recommended_strategy', '')))}"),
+        ]
+        return story
+
+    def _seo_section(self, seo: Dict[str, Any]) -> list:
+        story = [
+            self._para('SEO Action Plan & Recommendations', 'section'),
+            self._para('Immediate SEO Fixes (7-Day Action Plan)', 'heading'),
+        ]
+        for fix in seo.get('immediate_fixes') or []:
+            card = [
+                self._markup(f"[{escape(str(fix.get('priority', '')))}] {escape(str(fix.get('task', '')))}",
+                             'item_title'),
+                self._para(fix.get('description', '')),
+            ]
+            if fix.get('example'):
+                card.append(self._para(f"Example: {fix['example']}", 'meta'))
+            card.append(self._para(f"Time needed: {fix.get('timeframe', '')}", 'meta'))
+            story.append(KeepTogether(self._card(card)))
+
+        content = seo.get('content_optimization') or {}
+        headers = content.get('header_structure') or {}
+        story += [
+            self._para('Title Tag Suggestions', 'heading'),
+            *self._bullets(seo.get('title_tag_suggestions') or []),
+            self._para('Meta Description Suggestions', 'heading'),
+            *self._bullets(seo.get('meta_description_suggestions') or []),
+            self._para('Content Optimization', 'heading'),
+            self._markup(f"<b>H1:</b> {escape(str(headers.get('h1', '')))}"),
+            *self._bullets(headers.get('h2_suggestions') or []),
+            self._para('Geo-Targeted Keywords to Include:', 'item_title'),
+            *self._bullets(content.get('geo_targeted_keywords') or []),
+            self._para('Technical SEO Recommendations', 'heading'),
+        ]
+        for rec in seo.get('technical_seo') or []:
+            story.append(self._card([
+                self._para(rec.get('category', ''), 'item_title'),
+                self._para(rec.get('recommendation', '')),
+                self._para(f"Impact: {rec.get('impact', '')} | Effort: {rec.get('effort', '')}", 'meta'),
+            ]))
+        return story
+
+    def _gmb_section(self, gmb: Dict[str, Any]) -> list:
+        benchmarks = gmb.get('competitive_benchmarks') or {}
+        story = [
+            self._para('Google My Business Strategy', 'section'),
+            self._para('Competitive Benchmarks', 'heading'),
+            self._stat_grid([
+                (benchmarks.get('average_rating', ''), 'Avg Competitor Rating'),
+                (benchmarks.get('average_reviews', ''), 'Avg Competitor Reviews'),
+                (benchmarks.get('top_rated_competitor', ''), 'Top Competitor Rating'),
+            ]),
+            self._para('Posting Strategy', 'heading'),
+        ]
+        for post in gmb.get('posting_strategy') or []:
+            story.append(self._card([
+                self._para(f"{post.get('type', '')} ({post.get('frequency', '')})", 'item_title'),
+                self._para(post.get('example', '')),
+                self._para(f"Call to Action: {post.get('cta', '')}", 'meta'),
+            ]))
+        story += [
+            self._para('Photo Strategy', 'heading'),
+            *self._bullets(gmb.get('photo_strategy') or []),
+            self._para('Review Strategy', 'heading'),
+            *self._bullets(gmb.get('review_strategy') or []),
+        ]
+        return story
+
+    def _business_section(self, business: Dict[str, Any]) -> list:
+        overview = business.get('market_overview') or {}
+        layman = business.get('layman_explanation') or {}
+        story = [
+            self._para('Business Development Insights', 'section'),
+            self._para('Market Overview', 'heading'),
+            self._markup(f"<b>Competition Level:</b> {escape(str(overview.get('competition_level', '')))}"),
+            self._markup(f"<b>Market Opportunity:</b> {escape(str(overview.get('market_opportunity', '')))}"),
+            self._para('Key Findings:', 'item_title'),
+            *self._bullets(overview.get('key_findings') or []),
+            self._para("Why You're Not Showing Up (In Plain English)", 'heading'),
+            *self._bullets(layman.get('why_not_showing_up') or []),
+            self._para("What's Getting Fixed", 'heading'),
+            *self._bullets(layman.get('whats_getting_fixed') or []),
+            self._para('Your Next Steps', 'heading'),
+        ]
+        for step in business.get('next_steps') or []:
+            story.append(self._card([
+                self._para(f"Priority {step.get('priority', '')}", 'meta'),
+                self._para(step.get('action', ''), 'item_title'),
+                self._para(step.get('description', '')),
+                self._para(f"Timeline: {step.get('timeline', '')} | Impact: {step.get('impact', '')}", 'meta'),
+            ], accent='#10b981'))
+        return story
+
+    def _group_section(self, group_name: str, group_data: Dict[str, Any], max_maps_results: int,
+                       max_organic_results: int) -> list:
+        story = [self._para(f"{str(group_name).title()} Keywords ({group_data.get('keyword_count', 0)} keywords)",
+                            'section')]
+
+        maps_title = f'Google Maps Listings (Top {max_maps_results})'
+        organic_title = f'Organic Search Results (Top {max_organic_results})'
+        for result in group_data.get('results') or []:
+            if result.get('error'):
+                continue
+            story.append(self._para(f"\"{result.get('keyword', '')}\"", 'keyword'))
+
+            story += self._result_list(maps_title, result.get('maps_listings'), lambda listing: [
+                f"{listing.get('rating')} ({listing.get('reviews')} reviews)" if listing.get('rating') else None,
+                f"Phone: {listing['phone']}" if listing.get('phone') else None,
+                listing.get('address'),
+            ])
+            story += self._result_list('Local Services Ads', result.get('local_services_ads'), lambda ad: [
+                f"{ad.get('rating')} ({ad.get('reviews')} reviews)" if ad.get('rating') else None,
+                f"Phone: {ad['phone']}" if ad.get('phone') else None,
+                f"{ad['years_in_business']} years" if ad.get('years_in_business') else None,
+            ], accent='#10b981')
+            story += self._result_list(organic_title, result.get('organic_results'), lambda organic: [
+                f"{organic.get('domain')} | Position: {organic.get('position')}",
+            ], snippet=True, accent='#f59e0b')
+
+            if not (result.get('maps_listings') or result.get('local_services_ads') or result.get('organic_results')):
+                story.append(self._para('No results found for this keyword', 'meta'))
+        return story
+
+    def _result_list(self, title: str, items: Optional[list], details: Callable[[dict], List[Optional[str]]],
+                     snippet: bool = False, accent: str = PRIMARY_COLOR) -> list:
+        """One results block (maps, local services or organic) for a keyword."""
+        if not items:
+            return []
+        story = [self._para(title, 'heading')]
+        for item in items:
+            card = [self._para(item.get('title', ''), 'item_title'),
+                    self._para(self._join(details(item)), 'meta')]
+            if snippet and item.get('snippet'):
+                card.append(self._para(item['snippet']))
+            story.append(self._card(card, accent=accent))
+        return story
+
+    def _footer_section(self, data: Dict[str, Any]) -> list:
+        return [
+            Spacer(1, 18),
+            self._para(f"Report generated by LocalRankLens on {data.get('report_date', '')}", 'meta'),
+            self._para('This report provides competitive intelligence for digital marketing strategy '
+                       'and client presentations.', 'meta'),
+        ]
+
+
+PDF_BACKENDS = {
+    XHTML2PDFBackend.name: XHTML2PDFBackend,
+    ReportLabBackend.name: ReportLabBackend,
+}
+
+
+def create_pdf_backend(name: str = "xhtml2pdf", pdf_pool: Optional[PDFRenderPool] = None) -> PDFBackend:
+    """
+    Create a PDF backend by name.
+
+    Args:
+        name: Engine name (``xhtml2pdf`` or ``reportlab``)
+        pdf_pool: Render pool used by the xhtml2pdf engine
+
+    Returns:
+        PDF backend
+
+    Raises:
+        ValueError: If the engine is unknown
+    """
+    if name not in PDF_BACKENDS:
+        raise ValueError(f"Unknown PDF engine '{name}' (choose from {', '.join(PDF_BACKENDS)})")
+    if name == XHTML2PDFBackend.name:
+        return XHTML2PDFBackend(pdf_pool)
+    return PDF_BACKENDS[name]()
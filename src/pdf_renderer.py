@@ -0,0 +1,154 @@
+"""
+PDF Render Pool for LocalRankLens
+
+Process pool that converts report HTML to PDF with xhtml2pdf outside the
+calling process. xhtml2pdf is CPU-bound and holds the GIL, so rendering in
+warm worker processes lets PDFs scale across cores while searches keep
+running in the main process.
+"""
+
+import os
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+
+
+class PDFRenderError(Exception):
+    """Custom exception for PDF rendering errors."""
+    pass
+
+
+class PDFRenderQueueFull(PDFRenderError):
+    """Raised when the render queue stays full for longer than the caller allows."""
+    pass
+
+
+def _warm_worker() -> None:
+    """Import xhtml2pdf (and its reportlab fonts) once per worker process."""
+    from xhtml2pdf import pisa
+    from io import BytesIO
+    pisa.CreatePDF("<html><body><p>warm-up</p></body></html>", dest=BytesIO())
+
+
+def render_pdf(html_content: str, dest_path: str) -> str:
+    """
+    Render HTML to a PDF file.
+
+    Runs in a worker process; also usable inline.
+
+    Returns:
+        Path of the written PDF
+
+    Raises:
+        PDFRenderError: If xhtml2pdf reports errors
+    """
+    from xhtml2pdf import pisa
+
+    with open(dest_path, "wb") as result_file:
+        pisa_status = pisa.CreatePDF(html_content, dest=result_file)
+
+    if pisa_status.err:
+        raise PDFRenderError(f"PDF generation failed with errors: {pisa_status.err}")
+    return dest_path
+
+
+class PDFRenderPool:
+    """
+    Fixed pool of warm xhtml2pdf worker processes.
+
+    At most ``max_pending`` renders are queued or running at once; further
+    submissions block (backpressure) until a slot frees up.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 start_method: str = "spawn"):
+        """
+        Initialize the render pool.
+
+        Args:
+            workers: Worker processes (defaults to the CPU count)
+            max_pending: Maximum renders queued or running (defaults to
+                twice the worker count)
+            start_method: multiprocessing start method; ``spawn`` is safe to
+                use from threaded servers
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 2
+        self.logger = logging.getLogger(__name__)
+
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(start_method),
+            initializer=_warm_worker
+        )
+        # Workers start on demand; start them all now so the first reports
+        # don't pay for process startup and imports
+        for _ in range(self.workers):
+            self._executor.submit(int)
+        self.logger.info(f"PDF render pool started with {self.workers} workers")
+
+    def submit(self, html_content: str, dest_path: str, block: bool = True,
+               timeout: Optional[float] = None) -> Future:
+        """
+        Queue a render.
+
+        Args:
+            html_content: Complete report HTML (including PDF styles)
+            dest_path: File to write the PDF to
+            block: Wait for a free slot when the queue is full
+            timeout: Maximum seconds to wait for a slot
+
+        Returns:
+            Future resolving to ``dest_path``
+
+        Raises:
+            PDFRenderQueueFull: If no slot became free in time
+        """
+        if not self._slots.acquire(block, timeout):
+            raise PDFRenderQueueFull(f"PDF render queue is full ({self.max_pending} pending)")
+
+        try:
+            future = self._executor.submit(render_pdf, html_content, dest_path)
+        except Exception:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def render(self, html_content: str, dest_path: str, timeout: Optional[float] = None) -> str:
+        """Render and wait for the result."""
+        return self.submit(html_content, dest_path).result(timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes."""
+        self._executor.shutdown(wait=wait)
+
+
+# Process-wide pool shared by every ReportWriter
+_shared_pool: Optional[PDFRenderPool] = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_pdf_render_pool(workers: Optional[int] = None,
+                        max_pending: Optional[int] = None) -> PDFRenderPool:
+    """Get the process-wide render pool, starting it on first use."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = PDFRenderPool(workers, max_pending)
+        return _shared_pool
+
+
+def pdf_pool_from_settings(performance_settings: dict) -> Optional[PDFRenderPool]:
+    """Get the shared render pool if xhtml2pdf ``pdf_workers`` are configured, else None."""
+    if not performance_settings.get('pdf_workers') or \
+            performance_settings.get('pdf_engine', 'xhtml2pdf') != 'xhtml2pdf':
+        return None
+    return get_pdf_render_pool(
+        performance_settings['pdf_workers'],
+        performance_settings.get('pdf_max_pending') or None
+    )
@@ -0,0 +1,238 @@
+"""
+Rate Limiters for LocalRankLens
+
+Token-bucket rate limiters shared by search scrapers. The in-process
+limiter coordinates threads and coroutines; the SQLite limiter keeps the
+bucket in a file so every worker process on the host draws from one budget.
+"""
+
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class RateLimiterError(Exception):
+    """Custom exception for rate limiter errors."""
+    pass
+
+
+class RateLimiter:
+    """
+    Interface for rate limiters.
+
+    Subclasses implement ``reserve``, which claims tokens immediately and
+    returns how long the caller must wait before using them. Claiming first
+    and sleeping afterwards keeps callers in FIFO order without holding a
+    lock while waiting.
+    """
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """
+        Reserve tokens from the budget.
+
+        Args:
+            tokens: Number of tokens (requests) to reserve
+
+        Returns:
+            Seconds to wait before the reservation may be used
+        """
+        raise NotImplementedError
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until the tokens are available. Returns the time waited."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        """Wait without blocking the event loop. Returns the time waited."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class UnlimitedRateLimiter(RateLimiter):
+    """Rate limiter that never waits."""
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        return 0.0
+
+
+class TokenBucketRateLimiter(RateLimiter):
+    """
+    In-process token bucket.
+
+    The bucket holds up to ``capacity`` tokens and refills at ``rate`` tokens
+    per second. Requests within the burst capacity go through immediately;
+    beyond it callers are spaced at the sustained rate.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Initialize the token bucket.
+
+        Args:
+            rate: Sustained rate in tokens (requests) per second
+            capacity: Burst capacity in tokens
+        """
+        if rate <= 0:
+            raise RateLimiterError("Rate must be positive")
+        if capacity < 1:
+            raise RateLimiterError("Capacity must be at least 1")
+
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= tokens
+
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class SQLiteTokenBucketRateLimiter(RateLimiter):
+    """
+    Token bucket stored in SQLite and shared by every process using the file.
+
+    Each reservation is a single ``BEGIN IMMEDIATE`` transaction, so
+    concurrent processes serialize on the bucket row and never overspend.
+    """
+
+    def __init__(self, path: str, rate: float, capacity: float = 1.0,
+                 bucket: str = "serpapi"):
+        """
+        Initialize the shared token bucket.
+
+        Args:
+            path: SQLite database file shared by all processes
+            rate: Sustained rate in tokens (requests) per second
+            capacity: Burst capacity in tokens
+            bucket: Name of the budget, so one file can hold several
+        """
+        if rate <= 0:
+            raise RateLimiterError("Rate must be positive")
+        if capacity < 1:
+            raise RateLimiterError("Capacity must be at least 1")
+
+        self.path = Path(path)
+        self.rate = rate
+        self.capacity = capacity
+        self.bucket = bucket
+        self.logger = logging.getLogger(__name__)
+        self._local = threading.local()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            self._connect().execute("""
+                CREATE TABLE IF NOT EXISTS token_buckets (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+        except sqlite3.Error as e:
+            raise RateLimiterError(f"Failed to initialize rate limiter at {self.path}: {e}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Wall-clock time, since monotonic clocks are per process
+                now = time.time()
+                row = conn.execute(
+                    "SELECT tokens, updated_at FROM token_buckets WHERE name = ?",
+                    (self.bucket,)
+                ).fetchone()
+
+                if row is None:
+                    available = self.capacity
+                else:
+                    elapsed = max(0.0, now - row[1])
+                    available = min(self.capacity, row[0] + elapsed * self.rate)
+
+                available -= tokens
+                conn.execute(
+                    "INSERT OR REPLACE INTO token_buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                    (self.bucket, available, now)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        except sqlite3.Error as e:
+            raise RateLimiterError(f"Rate limiter reservation failed: {e}")
+
+        if available >= 0:
+            return 0.0
+        return -available / self.rate
+
+    async def acquire_async(self, tokens: float = 1.0) -> float:
+        # The reservation is blocking SQLite work, so keep it off the event loop
+        delay = await asyncio.to_thread(self.reserve, tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+_shared_limiters: Dict[tuple, RateLimiter] = {}
+_shared_limiters_lock = threading.Lock()
+
+
+def create_rate_limiter(rate_limit_delay: float, burst: float = 1.0,
+                        shared_path: Optional[str] = None,
+                        bucket: str = "serpapi") -> RateLimiter:
+    """
+    Create (or reuse) the rate limiter for a request budget.
+
+    In-process limiters are shared per (bucket, rate, burst) so that every
+    scraper in the process draws from the same budget. With ``shared_path``
+    the budget is also shared with other processes through SQLite.
+
+    Args:
+        rate_limit_delay: Sustained spacing between requests in seconds
+        burst: Number of requests allowed back to back
+        shared_path: Optional SQLite file for a cross-process budget
+        bucket: Name of the budget
+
+    Returns:
+        Rate limiter instance
+    """
+    if rate_limit_delay <= 0:
+        return UnlimitedRateLimiter()
+
+    key = (bucket, rate_limit_delay, burst, shared_path)
+    with _shared_limiters_lock:
+        limiter = _shared_limiters.get(key)
+        if limiter is None:
+            rate = 1.0 / rate_limit_delay
+            if shared_path:
+                limiter = SQLiteTokenBucketRateLimiter(shared_path, rate, burst, bucket)
+            else:
+                limiter = TokenBucketRateLimiter(rate, burst)
+            _shared_limiters[key] = limiter
+        return limiter
@@ -0,0 +1,214 @@
+"""
+Compact Records for LocalRankLens
+
+Slotted, read-only record types for the entries DataProcessor extracts from
+SerpAPI responses:
+- MapsListing, LocalServiceAd, OrganicResult, PaidAd and KnowledgeGraph
+
+Each record stores its fields in ``__slots__`` instead of a per-entry dict,
+interns business names and domains (which repeat across keywords) and shares
+one empty value for every missing field. Records are also read-only
+``Mapping`` views over those fields, so code and templates written against
+the old dicts (``listing['title']``, ``listing.get('rating')``,
+``listing.title``) keep working; ``as_dict()`` builds a plain dict when one
+is needed, e.g. for JSON.
+"""
+
+import sys
+from collections.abc import Mapping
+from typing import Dict, Any, Iterator, Tuple
+
+
+class _EmptyMap(Mapping):
+    """Immutable empty mapping that pickles as the shared ``EMPTY_MAP``."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(())
+
+    def __len__(self) -> int:
+        return 0
+
+    def __repr__(self) -> str:
+        return '{}'
+
+    def __reduce__(self) -> str:
+        return 'EMPTY_MAP'
+
+
+# Shared stand-ins for missing dict/list fields; as_dict() replaces them with fresh copies
+EMPTY_MAP = _EmptyMap()
+EMPTY_LIST = ()
+
+
+def _intern(value: Any) -> Any:
+    """Intern strings that repeat across many results."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class SerpRecord(Mapping):
+    """
+    Base class for read-only, slotted SERP records.
+
+    Subclasses list their fields as ``(key, default)`` pairs in ``FIELDS``,
+    in the key order of the dicts they replace. ``ALIASES`` maps extra view
+    keys to a stored field, and ``INTERNED`` names the fields to intern.
+    """
+
+    __slots__ = ()
+    FIELDS: Tuple[Tuple[str, Any], ...] = ()
+    ALIASES: Dict[str, str] = {}
+    INTERNED: Tuple[str, ...] = ()
+    KEYS: Tuple[str, ...] = ()
+    _ATTRIBUTES: Dict[str, str] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.KEYS = tuple(cls._view_keys())
+        # View key -> attribute holding its value
+        cls._ATTRIBUTES = {key: cls.ALIASES.get(key, key) for key in cls.KEYS}
+
+    @classmethod
+    def _view_keys(cls) -> Iterator[str]:
+        return (key for key, _ in cls.FIELDS)
+
+    def __init__(self, **values: Any):
+        for key, default in self.FIELDS:
+            value = values.get(key, default)
+            object.__setattr__(self, key, _intern(value) if key in self.INTERNED else value)
+
+    @classmethod
+    def from_serp(cls, entry: Dict[str, Any], **overrides: Any) -> 'SerpRecord':
+        """Build a record from one SerpAPI entry, reading only the record's fields."""
+        values = {key: entry.get(key, default) for key, default in cls.FIELDS}
+        values.update(overrides)
+        return cls(**values)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} records are read-only")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} records are read-only")
+
+    def __reduce__(self):
+        return (_rebuild, (type(self), tuple(getattr(self, key) for key, _ in self.FIELDS)))
+
+    def __getitem__(self, key: str) -> Any:
+        attribute = self._ATTRIBUTES.get(key)
+        if attribute is None:
+            raise KeyError(key)
+        return getattr(self, attribute)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # Mapping.get goes through __getitem__ and an exception; this is the hot path
+        attribute = self._ATTRIBUTES.get(key)
+        return default if attribute is None else getattr(self, attribute)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._ATTRIBUTES
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{key}={getattr(self, key)!r}" for key, _ in self.FIELDS)
+        return f"{type(self).__name__}({fields})"
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Plain dict copy of the record, as DataProcessor used to build it."""
+        return {key: _thaw(self[key]) for key in self.KEYS}
+
+
+def _rebuild(cls, values: Tuple[Any, ...]) -> SerpRecord:
+    return cls(**{key: value for (key, _), value in zip(cls.FIELDS, values)})
+
+
+def _thaw(value: Any) -> Any:
+    if value is EMPTY_MAP:
+        return {}
+    if value is EMPTY_LIST:
+        return []
+    return value
+
+
+def json_default(value: Any) -> Any:
+    """``json.dumps`` hook that serializes records as plain dicts."""
+    if isinstance(value, SerpRecord):
+        return value.as_dict()
+    if isinstance(value, Mapping):
+        return dict(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class MapsListing(SerpRecord):
+    """One Google Maps (local pack) listing."""
+
+    __slots__ = ('position', 'title', 'rating', 'reviews', 'type', 'address', 'phone', 'website',
+                 'hours', 'service_options', 'gps_coordinates', 'place_id', 'thumbnail')
+    FIELDS = (('position', 0), ('title', ''), ('rating', 0), ('reviews', 0), ('type', ''),
+              ('address', ''), ('phone', ''), ('website', ''), ('hours', ''),
+              ('service_options', EMPTY_MAP), ('gps_coordinates', EMPTY_MAP), ('place_id', ''),
+              ('thumbnail', ''))
+    ALIASES = {'business_name': 'title'}
+    INTERNED = ('title', 'place_id')
+
+    @classmethod
+    def _view_keys(cls) -> Iterator[str]:
+        # business_name mirrors title and sits right after it
+        for key, _ in cls.FIELDS:
+            yield key
+            if key == 'title':
+                yield 'business_name'
+
+    @property
+    def business_name(self) -> str:
+        return self.title
+
+
+class LocalServiceAd(SerpRecord):
+    """One Local Services Ad."""
+
+    __slots__ = ('position', 'title', 'phone', 'website', 'rating', 'reviews', 'years_in_business',
+                 'license_info', 'thumbnail', 'service_areas')
+    FIELDS = (('position', 0), ('title', ''), ('phone', ''), ('website', ''), ('rating', 0),
+              ('reviews', 0), ('years_in_business', ''), ('license_info', ''), ('thumbnail', ''),
+              ('service_areas', EMPTY_LIST))
+    INTERNED = ('title',)
+
+
+class OrganicResult(SerpRecord):
+    """One organic search result."""
+
+    __slots__ = ('position', 'title', 'link', 'domain', 'snippet', 'displayed_link', 'favicon',
+                 'sitelinks', 'rich_snippet', 'about_this_result')
+    FIELDS = (('position', 0), ('title', ''), ('link', ''), ('domain', ''), ('snippet', ''),
+              ('displayed_link', ''), ('favicon', ''), ('sitelinks', EMPTY_LIST),
+              ('rich_snippet', EMPTY_MAP), ('about_this_result', EMPTY_MAP))
+    INTERNED = ('domain',)
+
+
+class PaidAd(SerpRecord):
+    """One paid search ad."""
+
+    __slots__ = ('position', 'title', 'link', 'domain', 'displayed_link', 'snippet', 'extensions',
+                 'tracking_link')
+    FIELDS = (('position', 0), ('title', ''), ('link', ''), ('domain', ''), ('displayed_link', ''),
+              ('snippet', ''), ('extensions', EMPTY_LIST), ('tracking_link', ''))
+    INTERNED = ('domain',)
+
+
+class KnowledgeGraph(SerpRecord):
+    """The knowledge graph panel, when the response has one."""
+
+    __slots__ = ('title', 'type', 'description', 'website', 'phone', 'address', 'hours', 'rating',
+                 'reviews', 'thumbnail')
+    FIELDS = (('title', ''), ('type', ''), ('description', ''), ('website', ''), ('phone', ''),
+              ('address', ''), ('hours', EMPTY_MAP), ('rating', 0), ('reviews', 0), ('thumbnail', ''))
+    INTERNED = ('title',)
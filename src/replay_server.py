@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+SerpAPI Record/Replay for LocalRankLens
+
+Records real SerpAPI responses to a fixture directory and serves them back
+from a local HTTP server that mimics the SerpAPI search endpoint, with
+configurable latency, error rate and 429 injection. Point a scraper at it
+with ``SearchScraper(base_url=...)`` or the SERPAPI_BASE_URL environment
+variable to run and benchmark the full pipeline offline.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse, parse_qsl
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from response_cache import normalize_params, request_fingerprint
+
+
+class FixtureStore:
+    """Directory of recorded responses, one JSON file per request fingerprint."""
+
+    def __init__(self, fixture_dir: str):
+        """
+        Initialize the fixture store.
+
+        Args:
+            fixture_dir: Directory holding ``<fingerprint>.json`` fixtures
+        """
+        self.fixture_dir = Path(fixture_dir)
+        self.logger = logging.getLogger(__name__)
+
+    def path_for(self, params: Dict[str, Any]) -> Path:
+        """Get the fixture path for a set of request parameters."""
+        return self.fixture_dir / f"{request_fingerprint(params)}.json"
+
+    def save(self, params: Dict[str, Any], response: Dict[str, Any]) -> Path:
+        """
+        Record a response atomically.
+
+        Args:
+            params: Request parameters (the API key is not stored)
+            response: Parsed SerpAPI response
+
+        Returns:
+            Path of the written fixture
+        """
+        self.fixture_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path_for(params)
+        fixture = {'params': normalize_params(params), 'response': response}
+
+        fd, tmp_path = tempfile.mkstemp(dir=str(self.fixture_dir), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(fixture, f)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        self.logger.debug(f"Recorded fixture {path.name} for {params.get('q', '')!r}")
+        return path
+
+    def load(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Load the recorded response for a request, or None if missing."""
+        path = self.path_for(params)
+        if not path.exists():
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)['response']
+
+    def count(self) -> int:
+        """Number of recorded fixtures."""
+        if not self.fixture_dir.exists():
+            return 0
+        return len(list(self.fixture_dir.glob('*.json')))
+
+
+class ReplayServer:
+    """
+    Local stand-in for the SerpAPI search endpoint.
+
+    Requests are matched to fixtures by the same fingerprint the response
+    cache uses. Unmatched requests get the fallback response (e.g.
+    ``debug_raw_response.json``) or, in strict mode, a 404.
+    """
+
+    def __init__(self, fixture_dir: Optional[str] = None, host: str = "127.0.0.1",
+                 port: int = 0, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 fallback_path: Optional[str] = None, strict: bool = False,
+                 seed: Optional[int] = None):
+        """
+        Initialize the replay server.
+
+        Args:
+            fixture_dir: Directory of recorded fixtures
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            latency: Fixed delay added to every response, in seconds
+            jitter: Extra random delay of up to this many seconds
+            error_rate: Fraction of requests answered with HTTP 500
+            rate_limit_rate: Fraction of requests answered with HTTP 429
+            fallback_path: Response served when no fixture matches
+            strict: Answer unmatched requests with 404 instead of the fallback
+            seed: Random seed for reproducible fault injection
+        """
+        self.store = FixtureStore(fixture_dir) if fixture_dir else None
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.strict = strict
+        self.random = random.Random(seed)
+        self.logger = logging.getLogger(__name__)
+
+        self.fallback = None
+        if fallback_path:
+            with open(fallback_path, 'r', encoding='utf-8') as f:
+                self.fallback = json.load(f)
+
+        self.stats = {'requests': 0, 'fixture_hits': 0, 'fallbacks': 0,
+                      'misses': 0, 'errors_injected': 0, 'rate_limits_injected': 0}
+        self._stats_lock = threading.Lock()
+
+        self.httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        """Search endpoint URL to pass as ``SearchScraper(base_url=...)``."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/search"
+
+    def start(self) -> "ReplayServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        self.logger.info(f"Replay server listening on {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        """Stop serving and release the port."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def respond(self, params: Dict[str, str]):
+        """
+        Decide the response for a request.
+
+        Returns:
+            Tuple of (status, headers, body dict)
+        """
+        self._count('requests')
+
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+        roll = self.random.random()
+        if roll < self.rate_limit_rate:
+            self._count('rate_limits_injected')
+            return 429, {'Retry-After': '1'}, {'error': 'Too many requests (injected)'}
+        if roll < self.rate_limit_rate + self.error_rate:
+            self._count('errors_injected')
+            return 500, {}, {'error': 'Internal server error (injected)'}
+
+        response = self.store.load(params) if self.store else None
+        if response is not None:
+            self._count('fixture_hits')
+            return 200, {}, response
+
+        if self.strict:
+            self._count('misses')
+            return 404, {}, {'error': f"No fixture recorded for {params.get('q', '')!r}"}
+
+        self._count('fallbacks')
+        if self.fallback is not None:
+            return 200, {}, self.fallback
+        return 200, {}, {'search_metadata': {'status': 'Success', 'query': params.get('q', '')}}
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = dict(parse_qsl(urlparse(self.path).query))
+                status, headers, body = server.respond(params)
+                payload = json.dumps(body).encode('utf-8')
+
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                server.logger.debug(format % args)
+
+        return Handler
+
+
+def main() -> int:
+    """Run the replay server from the command line."""
+    parser = argparse.ArgumentParser(description="Serve recorded SerpAPI responses locally")
+    parser.add_argument('--fixtures', default='fixtures', help='Fixture directory')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Random extra seconds per response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of HTTP 500 responses')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of HTTP 429 responses')
+    parser.add_argument('--fallback', help='Response served when no fixture matches')
+    parser.add_argument('--strict', action='store_true', help='404 on unmatched requests')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    server = ReplayServer(
+        fixture_dir=args.fixtures, host=args.host, port=args.port,
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, fallback_path=args.fallback,
+        strict=args.strict, seed=args.seed
+    )
+    print(f"Serving {server.store.count()} fixtures at {server.base_url}")
+    print(f"Set SERPAPI_BASE_URL={server.base_url} to use it")
+
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"Replay stats: {server.stats}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,16 +7,17 @@ timestamped filenames and organized data presentation.
 
 import os
 import logging
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
-from jinja2 import Environment, FileSystemLoader, Template
+from typing import Dict, Any, Optional, List, Tuple, Union
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, Template
 
-try:
-    from xhtml2pdf import pisa
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
+from metrics import metrics
+from pdf_renderer import PDFRenderPool, PDFRenderError
+from pdf_backends import PDFBackend, create_pdf_backend
+from competitor_index import CompetitorIndex
+from data_processor import MAX_MAPS_RESULTS, MAX_ORGANIC_RESULTS
 
 
 class ReportWriterError(Exception):
@@ -24,37 +25,112 @@ class ReportWriterError(Exception):
     pass
 
 
+# Process-wide Jinja environments keyed by (template dir, bytecode cache dir)
+_template_environments: Dict[Tuple[str, Optional[str]], Environment] = {}
+_template_environments_lock = threading.Lock()
+
+
+def get_template_environment(template_dir: str = "templates",
+                             bytecode_cache_dir: Optional[str] = None) -> Environment:
+    """
+    Get the shared Jinja environment for a template directory.
+
+    The environment is built once per process, so compiled templates stay in
+    memory across reports. With ``bytecode_cache_dir`` compiled bytecode is
+    also persisted, so new worker processes skip parsing and compiling.
+
+    Args:
+        template_dir: Directory containing Jinja2 templates
+        bytecode_cache_dir: Directory for Jinja's FileSystemBytecodeCache
+
+    Returns:
+        Shared Jinja environment
+    """
+    key = (str(Path(template_dir).resolve()), bytecode_cache_dir or None)
+    with _template_environments_lock:
+        env = _template_environments.get(key)
+        if env is None:
+            bytecode_cache = None
+            if bytecode_cache_dir:
+                Path(bytecode_cache_dir).mkdir(parents=True, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+            env = Environment(
+                loader=FileSystemLoader(key[0]),
+                autoescape=True,
+                bytecode_cache=bytecode_cache
+            )
+            _template_environments[key] = env
+        return env
+
+
+def precompile_templates(template_dir: str = "templates",
+                         bytecode_cache_dir: Optional[str] = None,
+                         names: Optional[List[str]] = None) -> int:
+    """
+    Compile templates ahead of the first report (e.g. at worker startup).
+
+    Args:
+        template_dir: Directory containing Jinja2 templates
+        bytecode_cache_dir: Directory for Jinja's FileSystemBytecodeCache
+        names: Templates to compile (defaults to every ``.html`` template)
+
+    Returns:
+        Number of templates compiled
+    """
+    env = get_template_environment(template_dir, bytecode_cache_dir)
+    names = names or env.list_templates(extensions=['html'])
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
 class ReportWriter:
     """Generates professional HTML reports from processed search data."""
     
-    def __init__(self, template_dir: str = "templates", output_dir: str = "output"):
+    def __init__(self, template_dir: str = "templates", output_dir: str = "output",
+                 bytecode_cache_dir: Optional[str] = None,
+                 pdf_pool: Optional[PDFRenderPool] = None,
+                 pdf_backend: Union[str, PDFBackend] = "xhtml2pdf"):
         """
         Initialize the report writer.
         
+        Construction is cheap: the Jinja environment and its compiled
+        templates are shared by every writer in the process.
+        
         Args:
             template_dir: Directory containing Jinja2 templates
             output_dir: Directory for generated reports
+            bytecode_cache_dir: Directory for persisted template bytecode
+            pdf_pool: Render pool for xhtml2pdf PDFs; renders inline when omitted
+            pdf_backend: PDF engine name ('xhtml2pdf' or 'reportlab') or instance
         """
         self.template_dir = Path(template_dir)
         self.output_dir = Path(output_dir)
+        self.pdf_pool = pdf_pool
         self.logger = logging.getLogger(__name__)
         
+        if isinstance(pdf_backend, str):
+            try:
+                pdf_backend = create_pdf_backend(pdf_backend, pdf_pool)
+            except ValueError as e:
+                raise ReportWriterError(str(e))
+        self.pdf_backend = pdf_backend
+        
         # Ensure output directory exists
         self.output_dir.mkdir(exist_ok=True)
         
         # Set up Jinja2 environment
         if self.template_dir.exists():
-            self.jinja_env = Environment(
-                loader=FileSystemLoader(str(self.template_dir)),
-                autoescape=True
-            )
+            self.jinja_env = get_template_environment(str(self.template_dir), bytecode_cache_dir)
         else:
             self.logger.warning(f"Template directory {self.template_dir} not found")
             self.jinja_env = None
     
     def generate_report(self, aggregated_data: Dict[str, Any],
                        business_name: str, location: str,
-                       output_prefix: str, format: str = "html") -> str:
+                       output_prefix: str, format: str = "html",
+                       max_maps_results: int = MAX_MAPS_RESULTS,
+                       max_organic_results: int = MAX_ORGANIC_RESULTS) -> str:
         """
         Generate a complete HTML or PDF report from aggregated search data.
 
@@ -64,6 +140,8 @@ class ReportWriter:
             location: Location string (e.g., "Seattle, WA")
             output_prefix: Prefix for the output filename
             format: Output format ("html" or "pdf")
+            max_maps_results: Maps listings extracted per keyword (for headings)
+            max_organic_results: Organic results extracted per keyword (for headings)
 
         Returns:
             Path to the generated report file
@@ -74,16 +152,16 @@ class ReportWriter:
         try:
             # Prepare template data
             template_data = self._prepare_template_data(
-                aggregated_data, business_name, location
+                aggregated_data, business_name, location,
+                max_maps_results=max_maps_results, max_organic_results=max_organic_results
             )
 
+            if format.lower() == "pdf":
+                return self._generate_pdf_report(template_data, output_prefix)
+
             # Generate HTML content
             html_content = self._render_template(template_data)
-
-            if format.lower() == "pdf":
-                return self._generate_pdf_report(html_content, output_prefix)
-            else:
-                return self._generate_html_report(html_content, output_prefix)
+            return self._generate_html_report(html_content, output_prefix)
 
         except Exception as e:
             error_msg = f"Failed to generate report: {e}"
@@ -95,35 +173,58 @@ class ReportWriter:
         filename = self._generate_filename(output_prefix, "html")
         report_path = self.output_dir / filename
 
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        try:
+            with open(report_path, 'w', encoding='utf-8') as f:
+                f.write(html_content)
+        except BaseException:
+            self._discard_reserved(report_path)
+            raise
 
         self.logger.info(f"HTML report generated successfully: {report_path}")
         return str(report_path)
 
-    def _generate_pdf_report(self, html_content: str, output_prefix: str) -> str:
-        """Generate PDF report file."""
-        if not PDF_AVAILABLE:
-            raise ReportWriterError("PDF generation not available. Install xhtml2pdf: pip install xhtml2pdf")
+    @metrics.timed('pdf_generation_seconds')
+    def _generate_pdf_report(self, template_data: Dict[str, Any], output_prefix: str,
+                             html_content: Optional[str] = None) -> str:
+        """
+        Generate PDF report file with the configured PDF backend.
+
+        HTML engines get the rendered template (``html_content`` when already
+        rendered) with PDF styles added; direct engines build the document
+        from ``template_data`` alone.
+        """
+        backend = self.pdf_backend
+        if not backend.available:
+            raise ReportWriterError(
+                f"PDF generation not available. Install {backend.requirement}: pip install {backend.requirement}"
+            )
 
         filename = self._generate_filename(output_prefix, "pdf")
         report_path = self.output_dir / filename
 
-        # Add CSS for better PDF formatting
-        pdf_html = self._add_pdf_styles(html_content)
-
-        # Generate PDF using xhtml2pdf
-        with open(report_path, "wb") as result_file:
-            pisa_status = pisa.CreatePDF(pdf_html, dest=result_file)
-
-        if pisa_status.err:
-            raise ReportWriterError(f"PDF generation failed with errors: {pisa_status.err}")
-
-        self.logger.info(f"PDF report generated successfully: {report_path}")
+        try:
+            pdf_html = None
+            if backend.needs_html:
+                if html_content is None:
+                    html_content = self._render_template(template_data)
+                # Add CSS for better PDF formatting
+                pdf_html = self._add_pdf_styles(html_content)
+
+            backend.render(str(report_path), template_data, pdf_html)
+        except BaseException as e:
+            # Never leave the reserved (empty or partial) file behind
+            self._discard_reserved(report_path)
+            if isinstance(e, PDFRenderError):
+                raise ReportWriterError(str(e))
+            raise
+
+        self.logger.info(f"PDF report generated successfully ({backend.name}): {report_path}")
         return str(report_path)
     
     def _prepare_template_data(self, aggregated_data: Dict[str, Any], 
-                              business_name: str, location: str) -> Dict[str, Any]:
+                              business_name: str, location: str,
+                              max_maps_results: int = MAX_MAPS_RESULTS,
+                              max_organic_results: int = MAX_ORGANIC_RESULTS) -> Dict[str, Any]:
         """Prepare data for template rendering."""
         summary = aggregated_data.get('summary', {})
         by_group = aggregated_data.get('by_keyword_group', {})
@@ -152,11 +253,14 @@ class ReportWriter:
             'total_local_services': total_local_services,
             'total_organic_results': total_organic_results,
             'results_by_group': by_group,
+            'max_maps_results': max_maps_results,
+            'max_organic_results': max_organic_results,
             'competitive_insights': self._generate_insights(aggregated_data)
         }
         
         return template_data
     
+    @metrics.timed('render_template_seconds')
     def _render_template(self, template_data: Dict[str, Any]) -> str:
         """Render the HTML template with data."""
         if not self.jinja_env:
@@ -246,16 +350,16 @@ class ReportWriter:
         
         return html
     
+    @metrics.timed('generate_insights_seconds')
     def _generate_insights(self, aggregated_data: Dict[str, Any]) -> Dict[str, Any]:
         """Generate comprehensive competitive insights and actionable recommendations."""
-        by_group = aggregated_data.get('by_keyword_group', {})
-        all_results = aggregated_data.get('all_results', [])
+        index = self._competitor_index(aggregated_data)
 
         # Generate different types of insights
-        competitive_analysis = self._analyze_competitive_landscape(by_group, all_results)
-        seo_recommendations = self._generate_seo_recommendations(by_group, all_results)
-        gmb_recommendations = self._generate_gmb_recommendations(by_group, all_results)
-        business_insights = self._generate_business_insights(by_group, all_results)
+        competitive_analysis = self._analyze_competitive_landscape(index)
+        seo_recommendations = self._generate_seo_recommendations(index)
+        gmb_recommendations = self._generate_gmb_recommendations(index)
+        business_insights = self._generate_business_insights(index)
 
         return {
             'competitive_analysis': competitive_analysis,
@@ -264,112 +368,50 @@ class ReportWriter:
             'business_insights': business_insights
         }
 
-    def _analyze_competitive_landscape(self, by_group: Dict[str, Any], all_results: list) -> Dict[str, Any]:
-        """Analyze the competitive landscape and identify key competitors."""
-        # Collect all competitors from Maps and Organic results
-        maps_competitors = {}
-        organic_competitors = {}
-
-        for result in all_results:
-            if result.get('error'):
-                continue
-
-            # Analyze Maps listings
-            for maps_listing in result.get('maps_listings', []):
-                name = maps_listing.get('title', '')
-                if name:
-                    if name not in maps_competitors:
-                        maps_competitors[name] = {
-                            'name': name,
-                            'appearances': 0,
-                            'avg_rating': 0,
-                            'total_reviews': 0,
-                            'phone': maps_listing.get('phone', ''),
-                            'keywords': []
-                        }
-                    maps_competitors[name]['appearances'] += 1
-                    maps_competitors[name]['keywords'].append(result.get('keyword', ''))
-                    if maps_listing.get('rating'):
-                        maps_competitors[name]['avg_rating'] = maps_listing.get('rating', 0)
-                        maps_competitors[name]['total_reviews'] = maps_listing.get('reviews', 0)
-
-            # Analyze Organic results
-            for organic in result.get('organic_results', []):
-                domain = organic.get('domain', '')
-                if domain:
-                    if domain not in organic_competitors:
-                        organic_competitors[domain] = {
-                            'domain': domain,
-                            'appearances': 0,
-                            'keywords': [],
-                            'avg_position': 0,
-                            'positions': []
-                        }
-                    organic_competitors[domain]['appearances'] += 1
-                    organic_competitors[domain]['keywords'].append(result.get('keyword', ''))
-                    organic_competitors[domain]['positions'].append(organic.get('position', 0))
-
-        # Calculate average positions
-        for competitor in organic_competitors.values():
-            if competitor['positions']:
-                competitor['avg_position'] = sum(competitor['positions']) / len(competitor['positions'])
-
-        # Sort competitors by appearances
-        top_maps_competitors = sorted(
-            maps_competitors.values(),
-            key=lambda x: x['appearances'],
-            reverse=True
-        )[:5]
-
-        top_organic_competitors = sorted(
-            organic_competitors.values(),
-            key=lambda x: x['appearances'],
-            reverse=True
-        )[:5]
+    def _competitor_index(self, aggregated_data: Dict[str, Any]) -> CompetitorIndex:
+        """
+        Competitor index for the aggregated results.
+        
+        Uses the index built while aggregating; data built without one (e.g.
+        loaded from an older dump) is indexed here in one pass.
+        """
+        index = aggregated_data.get('competitor_index')
+        if index is not None:
+            return index
+        
+        if 'all_results' in aggregated_data:
+            return CompetitorIndex.from_results(aggregated_data['all_results'])
+        return CompetitorIndex.from_results(
+            result
+            for group_data in aggregated_data.get('by_keyword_group', {}).values()
+            for result in group_data.get('results', [])
+        )
 
+    def _analyze_competitive_landscape(self, index: CompetitorIndex) -> Dict[str, Any]:
+        """Analyze the competitive landscape and identify key competitors."""
         return {
-            'total_maps_competitors': len(maps_competitors),
-            'total_organic_competitors': len(organic_competitors),
-            'top_maps_competitors': top_maps_competitors,
-            'top_organic_competitors': top_organic_competitors,
-            'market_analysis': self._generate_market_analysis(maps_competitors, organic_competitors)
+            'total_maps_competitors': len(index.maps_competitors),
+            'total_organic_competitors': len(index.organic_competitors),
+            'top_maps_competitors': index.top_maps_competitors(5),
+            'top_organic_competitors': index.top_organic_competitors(5),
+            'market_analysis': self._generate_market_analysis(index.maps_competitors, index.organic_competitors)
         }
 
-    def _generate_seo_recommendations(self, by_group: Dict[str, Any], all_results: list) -> Dict[str, Any]:
+    def _generate_seo_recommendations(self, index: CompetitorIndex) -> Dict[str, Any]:
         """Generate specific SEO action items based on competitive analysis."""
-        # Extract location from first result
+        # Infer the location from the keywords
         location = ""
-        business_name = ""
-        if all_results:
-            # Try to extract location from search metadata or infer from keywords
-            for result in all_results:
-                keyword = result.get('keyword', '')
-                if 'Spokane' in keyword:
-                    location = "Spokane, WA"
-                    break
-                elif 'Seattle' in keyword:
-                    location = "Seattle, WA"
-                    break
-
-        # Analyze competitor titles and meta descriptions
-        competitor_titles = []
-        competitor_domains = []
-        common_keywords = []
-
-        for result in all_results:
-            if result.get('error'):
-                continue
-
-            keyword = result.get('keyword', '')
-            common_keywords.append(keyword)
-
-            for organic in result.get('organic_results', []):
-                title = organic.get('title', '')
-                domain = organic.get('domain', '')
-                if title:
-                    competitor_titles.append(title)
-                if domain:
-                    competitor_domains.append(domain)
+        for keyword in index.keywords:
+            if 'Spokane' in keyword:
+                location = "Spokane, WA"
+                break
+            elif 'Seattle' in keyword:
+                location = "Seattle, WA"
+                break
+
+        # Competitor titles and keywords of the successful searches
+        competitor_titles = index.organic_titles
+        common_keywords = index.successful_keywords
 
         # Generate specific recommendations
         recommendations = {
@@ -536,32 +578,21 @@ class ReportWriter:
             }
         ]
 
-    def _generate_gmb_recommendations(self, by_group: Dict[str, Any], all_results: list) -> Dict[str, Any]:
+    def _generate_gmb_recommendations(self, index: CompetitorIndex) -> Dict[str, Any]:
         """Generate Google My Business optimization recommendations."""
         # Analyze competitor GMB profiles
-        competitor_ratings = []
-        competitor_review_counts = []
-
-        for result in all_results:
-            for maps_listing in result.get('maps_listings', []):
-                rating = maps_listing.get('rating')
-                reviews = maps_listing.get('reviews')
-                if rating:
-                    competitor_ratings.append(rating)
-                if reviews:
-                    competitor_review_counts.append(reviews)
-
-        avg_competitor_rating = sum(competitor_ratings) / len(competitor_ratings) if competitor_ratings else 0
-        avg_competitor_reviews = sum(competitor_review_counts) / len(competitor_review_counts) if competitor_review_counts else 0
+        ratings = index.rating_stats()
+        avg_competitor_rating = ratings['average']
+        avg_competitor_reviews = index.review_stats()['average']
 
-        location = self._extract_location_from_results(all_results)
-        primary_service = self._extract_primary_service([r.get('keyword', '') for r in all_results])
+        location = self._extract_location(index.keywords)
+        primary_service = self._extract_primary_service(index.keywords)
 
         return {
             'competitive_benchmarks': {
                 'average_rating': round(avg_competitor_rating, 1),
                 'average_reviews': int(avg_competitor_reviews),
-                'top_rated_competitor': max(competitor_ratings) if competitor_ratings else 0
+                'top_rated_competitor': ratings['max']
             },
             'posting_strategy': [
                 {
@@ -597,31 +628,18 @@ class ReportWriter:
             ]
         }
 
-    def _generate_business_insights(self, by_group: Dict[str, Any], all_results: list) -> Dict[str, Any]:
+    def _generate_business_insights(self, index: CompetitorIndex) -> Dict[str, Any]:
         """Generate business development insights in layman terms."""
-        location = self._extract_location_from_results(all_results)
-        primary_service = self._extract_primary_service([r.get('keyword', '') for r in all_results])
-
-        # Count total competitors
-        total_maps_competitors = len(set(
-            listing.get('title', '')
-            for result in all_results
-            for listing in result.get('maps_listings', [])
-            if listing.get('title')
-        ))
-
-        total_organic_competitors = len(set(
-            organic.get('domain', '')
-            for result in all_results
-            for organic in result.get('organic_results', [])
-            if organic.get('domain')
-        ))
+        location = self._extract_location(index.keywords)
+        primary_service = self._extract_primary_service(index.keywords)
 
         return {
             'market_overview': {
-                'competition_level': self._assess_competition_level(total_maps_competitors, total_organic_competitors),
-                'market_opportunity': self._assess_market_opportunity(all_results),
-                'key_findings': self._generate_key_findings(all_results, location, primary_service)
+                'competition_level': self._assess_competition_level(
+                    len(index.maps_competitors), len(index.organic_competitors)
+                ),
+                'market_opportunity': self._assess_market_opportunity(index.successful_searches),
+                'key_findings': self._generate_key_findings(index, location, primary_service)
             },
             'layman_explanation': {
                 'why_not_showing_up': [
@@ -662,10 +680,9 @@ class ReportWriter:
             ]
         }
 
-    def _extract_location_from_results(self, all_results: list) -> str:
-        """Extract location from search results."""
-        for result in all_results:
-            keyword = result.get('keyword', '')
+    def _extract_location(self, keywords: list) -> str:
+        """Extract the city from the searched keywords."""
+        for keyword in keywords:
             if 'Spokane' in keyword:
                 return 'Spokane'
             elif 'Seattle' in keyword:
@@ -684,9 +701,8 @@ class ReportWriter:
         else:
             return 'LOW - Limited competition, good opportunity for market entry'
 
-    def _assess_market_opportunity(self, all_results: list) -> str:
-        """Assess market opportunity based on search results."""
-        total_searches = len([r for r in all_results if not r.get('error')])
+    def _assess_market_opportunity(self, total_searches: int) -> str:
+        """Assess market opportunity based on the number of successful searches."""
         if total_searches > 10:
             return 'STRONG - High search volume indicates strong market demand'
         elif total_searches > 5:
@@ -694,27 +710,25 @@ class ReportWriter:
         else:
             return 'LIMITED - Lower search volume, may need broader keyword strategy'
 
-    def _generate_key_findings(self, all_results: list, location: str, primary_service: str) -> list:
+    def _generate_key_findings(self, index: CompetitorIndex, location: str, primary_service: str) -> list:
         """Generate key findings from the analysis."""
         findings = []
 
         # Count successful vs failed searches
-        successful = len([r for r in all_results if not r.get('error')])
-        total = len(all_results)
+        successful = index.successful_searches
+        total = index.total_searches
 
         if successful < total:
             findings.append(f'{total - successful} keywords had no results - opportunity for first-mover advantage')
 
-        # Analyze Maps presence
-        maps_listings = [listing for result in all_results for listing in result.get('maps_listings', [])]
-        if maps_listings:
-            avg_rating = sum(l.get('rating', 0) for l in maps_listings if l.get('rating')) / len([l for l in maps_listings if l.get('rating')])
-            findings.append(f'Competitors average {avg_rating:.1f} stars - quality service is expected in this market')
+        # Analyze Maps presence; listings may all be unrated
+        ratings = index.rating_stats()
+        if ratings['count']:
+            findings.append(f'Competitors average {ratings["average"]:.1f} stars - quality service is expected in this market')
 
         # Analyze organic competition
-        organic_results = [org for result in all_results for org in result.get('organic_results', [])]
-        if organic_results:
-            findings.append(f'{len(organic_results)} organic competitors found - SEO investment is necessary')
+        if index.organic_result_count:
+            findings.append(f'{index.organic_result_count} organic competitors found - SEO investment is necessary')
 
         findings.append(f'Local search is active for {primary_service} services in {location}')
 
@@ -729,19 +743,34 @@ class ReportWriter:
         }
     
     def _generate_filename(self, prefix: str, format: str = "html") -> str:
-        """Generate timestamped filename."""
+        """
+        Generate and reserve a timestamped filename.
+
+        The file is created exclusively, so concurrent reports with the same
+        prefix in the same second never share a name.
+        """
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
-        # Check if file exists and add suffix if needed
-        base_filename = f"{prefix}_{timestamp}.{format}"
-        filename = base_filename
+        # Add a suffix if the name is taken
+        filename = f"{prefix}_{timestamp}.{format}"
         counter = 1
         
-        while (self.output_dir / filename).exists():
-            filename = f"{prefix}_{timestamp}_{counter:02d}.html"
-            counter += 1
-        
-        return filename
+        while True:
+            try:
+                with open(self.output_dir / filename, 'x'):
+                    return filename
+            except FileExistsError:
+                filename = f"{prefix}_{timestamp}_{counter:02d}.{format}"
+                counter += 1
+    
+    def _discard_reserved(self, report_path: Path) -> None:
+        """Remove a reserved report file after a failed render."""
+        try:
+            report_path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.logger.warning(f"Failed to remove incomplete report {report_path}: {e}")
     
     def generate_summary_report(self, aggregated_data: Dict[str, Any], 
                                business_name: str, location: str) -> Dict[str, Any]:
@@ -759,21 +788,8 @@ class ReportWriter:
         summary = aggregated_data.get('summary', {})
         by_group = aggregated_data.get('by_keyword_group', {})
         
-        # Calculate competitive metrics
-        total_competitors = set()
-        top_domains = {}
-        
-        for group_data in by_group.values():
-            for result in group_data.get('results', []):
-                if result.get('error'):
-                    continue
-                
-                # Collect competitor domains from organic results
-                for organic in result.get('organic_results', []):
-                    domain = organic.get('domain', '')
-                    if domain:
-                        total_competitors.add(domain)
-                        top_domains[domain] = top_domains.get(domain, 0) + 1
+        # Competitor domains from organic results
+        top_domains = self._competitor_index(aggregated_data).domain_counts()
         
         # Sort domains by frequency
         top_domains_sorted = sorted(
@@ -788,7 +804,7 @@ class ReportWriter:
             'analysis_date': datetime.now().isoformat(),
             'total_keywords': summary.get('total_keywords', 0),
             'successful_searches': summary.get('successful_searches', 0),
-            'total_competitors': len(total_competitors),
+            'total_competitors': len(top_domains),
             'top_competing_domains': top_domains_sorted,
             'keyword_groups': {
                 name: {
@@ -0,0 +1,347 @@
+"""
+Bulk Reprocessing for LocalRankLens
+
+Rebuilds a business's stored history from the raw response archive after
+DataProcessor's extraction rules change, without re-querying SerpAPI.
+
+Archived responses are handed to a process pool in chunks of archive
+offsets. Each worker maps the archive itself, decompresses and processes
+its chunk and serializes the history rows, so only offsets travel to the
+workers and only finished rows travel back. The parent writes one
+transaction per day of history (``HistoryStore.replace_observations``),
+replacing what was stored for the same keywords and days.
+
+Responses are processed at the configured result depth. Deeper results
+pages (``max_organic_results`` beyond 10) are archived as separate records;
+each first page is combined with the pages archived after it for the same
+search, stopping where ``SearchScraper.search_depth`` stopped paging.
+
+Usage:
+    python run_reprocess.py --config config.json --workers 8
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+# Add src directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent))
+
+from config_manager import ConfigManager
+from data_processor import DataProcessor, MAX_MAPS_RESULTS, MAX_ORGANIC_RESULTS
+from history_store import HistoryStore, prepare_observation
+from response_archive import ResponseArchive
+from search_scraper import page_starts, paging_done, merge_pages
+
+
+DEFAULT_CHUNK_SIZE = 200
+
+# Per-worker-process state, set by _init_worker
+_worker_archive: Optional[ResponseArchive] = None
+_worker_processor: Optional[DataProcessor] = None
+_worker_stop_domains: List[str] = []
+
+
+def _init_worker(archive_path: str, max_maps_results: int = MAX_MAPS_RESULTS,
+                 max_organic_results: int = MAX_ORGANIC_RESULTS,
+                 stop_domains: Optional[List[str]] = None) -> None:
+    """Open the archive and a processor once per worker process."""
+    global _worker_archive, _worker_processor, _worker_stop_domains
+    _worker_archive = ResponseArchive(archive_path)
+    _worker_stop_domains = list(stop_domains or [])
+    _worker_processor = DataProcessor(max_maps_results=max_maps_results,
+                                      max_organic_results=max_organic_results)
+    # Per-keyword processing logs would flood the console
+    logging.getLogger('data_processor').setLevel(logging.WARNING)
+
+
+def _start(record: Dict[str, Any]) -> int:
+    return int(record['params'].get('start') or 0)
+
+
+def _depth_response(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    A first page combined with the deeper pages archived after it for the same search.
+
+    Later pages are taken from the same day, up to the next first page of
+    the query, and only as far as live paging would have used them.
+    """
+    starts = page_starts(_worker_processor.max_organic_results)[1:]
+    pages = [record['response']]
+    if not starts or paging_done(pages, _worker_stop_domains):
+        return record['response']
+
+    siblings: Dict[int, Dict[str, Any]] = {}
+    day_end = datetime.strptime(_day(record['timestamp']), '%Y-%m-%d') + timedelta(days=1)
+    for entry in _worker_archive.entries(record['query'], record['location'], since=record['timestamp'],
+                                         until=day_end.timestamp() - 1e-6):
+        if entry['offset'] <= record['offset'] or entry['engine'] != 'google':
+            continue
+        sibling = _worker_archive.read(entry['offset'])
+        start = _start(sibling)
+        if start == 0:
+            break
+        siblings.setdefault(start, sibling['response'])
+
+    for start in starts:
+        if start not in siblings:
+            break
+        pages.append(siblings[start])
+        if paging_done(pages, _worker_stop_domains):
+            break
+    return merge_pages(pages)
+
+
+def _process_chunk(tasks: List[Tuple[int, str]]) -> List[Tuple[float, Dict[str, Any]]]:
+    """Process one chunk of ``(offset, keyword_group)`` tasks into prepared observations."""
+    observations = []
+    for offset, keyword_group in tasks:
+        record = _worker_archive.read(offset)
+        # Deeper pages are merged into their first page's observation
+        if _start(record) > 0:
+            continue
+        result = _worker_processor.process_search_results(_depth_response(record), record['query'],
+                                                          keyword_group)
+        observations.append((record['timestamp'], prepare_observation(result)))
+    return observations
+
+
+def _day(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d')
+
+
+class Reprocessor:
+    """Reprocesses archived responses into the history store with a process pool."""
+
+    def __init__(self, archive_path: str, history_store: HistoryStore, workers: Optional[int] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE, max_pending: Optional[int] = None,
+                 start_method: str = "spawn", max_maps_results: int = MAX_MAPS_RESULTS,
+                 max_organic_results: int = MAX_ORGANIC_RESULTS, stop_domains: Optional[List[str]] = None):
+        """
+        Initialize the reprocessor.
+
+        Args:
+            archive_path: Response archive written by the scrapers
+            history_store: History store to rebuild
+            workers: Worker processes (defaults to the CPU count); 0 processes
+                in this process
+            chunk_size: Archived responses per task sent to a worker
+            max_pending: Chunks queued or running at once (defaults to
+                twice the worker count)
+            start_method: multiprocessing start method; ``spawn`` is safe to
+                use from threaded processes
+            max_maps_results: Maps listings extracted per response
+            max_organic_results: Organic results extracted per response;
+                beyond 10, deeper archived pages are merged in
+            stop_domains: Domains that ended live paging early (the
+                client's domain), so merging stops at the same page
+        """
+        self.archive_path = archive_path
+        self.history_store = history_store
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.chunk_size = max(1, chunk_size)
+        self.max_pending = max_pending or max(1, self.workers) * 2
+        self.start_method = start_method
+        self.worker_args = (archive_path, max_maps_results, max_organic_results, list(stop_domains or []))
+        self.logger = logging.getLogger(__name__)
+
+    def plan(self, location: str, keyword_groups: Dict[str, str], since: Optional[float] = None,
+             until: Optional[float] = None) -> List[Tuple[int, str, float]]:
+        """
+        Archived Google searches to reprocess, oldest first.
+
+        Args:
+            location: Location string the searches were made for
+            keyword_groups: Keywords to reprocess, mapped to their group
+            since: First timestamp (epoch seconds), inclusive
+            until: Last timestamp (epoch seconds), inclusive
+
+        Returns:
+            ``(offset, keyword_group, timestamp)`` tasks
+        """
+        archive = ResponseArchive(self.archive_path)
+        try:
+            entries = archive.entries(location=location, since=since, until=until)
+        finally:
+            archive.close()
+        tasks = [(entry['offset'], keyword_groups[entry['query']], entry['timestamp']) for entry in entries
+                 if entry['engine'] == 'google' and entry['query'] in keyword_groups]
+        tasks.sort(key=lambda task: (task[2], task[0]))
+        return tasks
+
+    def run(self, business: str, location: str, keyword_groups: Dict[str, str],
+            since: Optional[float] = None, until: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Reprocess every matching archived response and replace the stored results.
+
+        Args:
+            business: Business name the history is stored under
+            location: Location string (as passed to the scraper)
+            keyword_groups: Keywords to reprocess, mapped to their group
+            since: First timestamp (epoch seconds), inclusive
+            until: Last timestamp (epoch seconds), inclusive
+
+        Returns:
+            Stats: ``responses`` (first pages processed), ``replaced``,
+            ``days``, ``workers``, ``seconds``, ``write_seconds`` (time spent
+            in history transactions, which run one at a time) and
+            ``responses_per_second``
+        """
+        started = time.perf_counter()
+        tasks = self.plan(location, keyword_groups, since, until)
+        chunks = [[(offset, group) for offset, group, _ in tasks[start:start + self.chunk_size]]
+                  for start in range(0, len(tasks), self.chunk_size)]
+        self.logger.info(f"Reprocessing {len(tasks)} archived responses for {business} "
+                         f"in {len(chunks)} chunks with {self.workers} workers")
+
+        stats = {'responses': 0, 'replaced': 0, 'days': 0, 'write_seconds': 0.0}
+        day: Optional[str] = None
+        pending_day: List[Tuple[float, Dict[str, Any]]] = []
+
+        def flush() -> None:
+            if pending_day:
+                write_started = time.perf_counter()
+                stats['replaced'] += self.history_store.replace_observations(business, location, pending_day)
+                stats['write_seconds'] += time.perf_counter() - write_started
+                stats['days'] += 1
+                pending_day.clear()
+
+        # Tasks are sorted by time, so each day is complete once the next one starts
+        done = 0
+        for chunk, observations in zip(chunks, self._iter_chunks(chunks)):
+            for observed_at, observation in observations:
+                observed_day = _day(observed_at)
+                if observed_day != day:
+                    flush()
+                    day = observed_day
+                pending_day.append((observed_at, observation))
+            stats['responses'] += len(observations)
+            done += len(chunk)
+            self._report_progress(done, len(tasks), started)
+        flush()
+
+        stats['workers'] = self.workers
+        stats['seconds'] = time.perf_counter() - started
+        stats['responses_per_second'] = stats['responses'] / stats['seconds'] if stats['seconds'] else 0.0
+        self.logger.info(
+            f"Reprocessed {stats['responses']} responses ({stats['days']} days, {stats['replaced']} stored "
+            f"results replaced) in {stats['seconds']:.1f}s: {stats['responses_per_second']:.0f} responses/sec, "
+            f"{stats['write_seconds']:.1f}s writing history"
+        )
+        return stats
+
+    def _iter_chunks(self, chunks: List[List[Tuple[int, str]]]):
+        """Yield each chunk's observations in chunk order, keeping ``max_pending`` chunks in flight."""
+        if self.workers == 0:
+            _init_worker(*self.worker_args)
+            for chunk in chunks:
+                yield _process_chunk(chunk)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers,
+                                 mp_context=multiprocessing.get_context(self.start_method),
+                                 initializer=_init_worker, initargs=self.worker_args) as executor:
+            in_flight = deque()
+            remaining = iter(chunks)
+            for chunk in remaining:
+                in_flight.append(executor.submit(_process_chunk, chunk))
+                if len(in_flight) >= self.max_pending:
+                    break
+            while in_flight:
+                observations = in_flight.popleft().result()
+                next_chunk = next(remaining, None)
+                if next_chunk is not None:
+                    in_flight.append(executor.submit(_process_chunk, next_chunk))
+                yield observations
+
+    def _report_progress(self, done: int, total: int, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        if done == total or done % (self.chunk_size * 10) == 0:
+            rate = done / elapsed if elapsed else 0.0
+            self.logger.info(f"Reprocessed {done}/{total} responses ({rate:.0f} responses/sec)")
+
+
+def _timestamp(date: Optional[str], end_of_day: bool = False) -> Optional[float]:
+    """Epoch seconds at the start (or end) of a ``YYYY-MM-DD`` date."""
+    if not date:
+        return None
+    start = datetime.strptime(date, '%Y-%m-%d')
+    return (start + timedelta(days=1)).timestamp() - 1e-6 if end_of_day else start.timestamp()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point for bulk reprocessing."""
+    parser = argparse.ArgumentParser(description="Rebuild a business's history from archived SerpAPI responses")
+    parser.add_argument('--config', default='config.json', help='Client configuration file')
+    parser.add_argument('--archive', default=os.getenv('SERPAPI_ARCHIVE'), help='Response archive (SERPAPI_ARCHIVE)')
+    parser.add_argument('--history', default=os.getenv('HISTORY_DB'), help='History database (HISTORY_DB)')
+    parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count; 0 runs in-process)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Responses per worker task')
+    parser.add_argument('--since', help='First date to reprocess (YYYY-MM-DD)')
+    parser.add_argument('--until', help='Last date to reprocess (YYYY-MM-DD)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper(), logging.INFO),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    logging.getLogger('data_processor').setLevel(logging.WARNING)
+
+    if not args.archive or not Path(args.archive).exists():
+        print("Reprocessing needs an existing response archive (--archive or SERPAPI_ARCHIVE)")
+        return 1
+    if not args.history:
+        print("Reprocessing needs a history database (--history or HISTORY_DB)")
+        return 1
+
+    try:
+        config_manager = ConfigManager(config_path=args.config)
+        business = config_manager.get_business_name()
+        location = config_manager.get_location_string()
+
+        store = HistoryStore(args.history)
+        try:
+            # Keywords dropped from the config keep the group they were stored with
+            keyword_groups = store.keyword_groups(business, location)
+            for group, keywords in config_manager.get_keywords().items():
+                keyword_groups.update((keyword, group) for keyword in keywords)
+
+            report_settings = config_manager.get_report_settings()
+            reprocessor = Reprocessor(args.archive, store, workers=args.workers, chunk_size=args.chunk_size,
+                                      max_maps_results=report_settings['max_maps_results'],
+                                      max_organic_results=report_settings['max_organic_results'],
+                                      stop_domains=[report_settings['client_domain']]
+                                      if report_settings['client_domain'] else [])
+            stats = reprocessor.run(business, location, keyword_groups,
+                                    since=_timestamp(args.since), until=_timestamp(args.until, end_of_day=True))
+        finally:
+            store.close()
+    except KeyboardInterrupt:
+        print("\nReprocessing cancelled by user")
+        return 1
+    except Exception as e:
+        print(f"\nReprocessing failed: {e}")
+        return 1
+
+    print("\n" + "="*60)
+    print("LocalRankLens Reprocessing Complete!")
+    print("="*60)
+    print(f"Responses: {stats['responses']} over {stats['days']} days ({stats['replaced']} stored results replaced)")
+    print(f"Workers: {stats['workers']}")
+    print(f"Duration: {stats['seconds']:.1f}s ({stats['responses_per_second']:.0f} responses/sec)")
+    print(f"History writes: {stats['write_seconds']:.1f}s")
+    print("="*60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
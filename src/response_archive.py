@@ -0,0 +1,387 @@
+"""
+Response Archive for LocalRankLens
+
+Append-only archive of raw SerpAPI responses, so history can be reprocessed
+when extraction rules change without re-querying SerpAPI. Records are
+appended to one data file, each compressed on its own (zstd when the
+``zstandard`` package is installed, gzip otherwise), and an SQLite offset
+index next to it is keyed by (query, location, timestamp).
+
+Records are read through ``mmap``: iterating a year of archived responses
+decompresses one record at a time and never loads the data file into
+memory.
+
+Data file layout::
+
+    b'LRLA' + format version (1 byte)
+    record*:  header (magic, codec, metadata length, payload length, CRC32)
+              metadata (JSON: query, location, timestamp, engine, params)
+              payload (compressed JSON response)
+
+Every record carries its own metadata, so the index can be rebuilt from the
+data file alone with ``rebuild_index()``.
+"""
+
+import os
+import gzip
+import json
+import mmap
+import time
+import zlib
+import struct
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+from response_cache import normalize_params
+
+
+FILE_MAGIC = b'LRLA'
+FORMAT_VERSION = 1
+RECORD_MAGIC = b'LR'
+
+# magic, codec, metadata length, payload length, CRC32 of the payload
+RECORD_HEADER = struct.Struct('<2sBIII')
+
+CODEC_GZIP = 1
+CODEC_ZSTD = 2
+CODEC_NAMES = {CODEC_GZIP: 'gzip', CODEC_ZSTD: 'zstd'}
+
+
+class ResponseArchiveError(Exception):
+    """Custom exception for response archive errors."""
+    pass
+
+
+def _compress(data: bytes, codec: int, level: Optional[int]) -> bytes:
+    if codec == CODEC_ZSTD:
+        return zstandard.ZstdCompressor(level=level or 3).compress(data)
+    return gzip.compress(data, compresslevel=level or 6)
+
+
+def _decompress(data: bytes, codec: int) -> bytes:
+    if codec == CODEC_ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise ResponseArchiveError("Archive record is zstd-compressed. Install zstandard: pip install zstandard")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == CODEC_GZIP:
+        return gzip.decompress(data)
+    raise ResponseArchiveError(f"Unknown archive record codec {codec}")
+
+
+class ResponseArchive:
+    """
+    Append-only, compressed archive of raw SerpAPI responses.
+
+    Safe to share between threads and between processes appending to the
+    same file: each append writes the record and its index row inside one
+    SQLite write transaction, which serializes writers.
+    """
+
+    def __init__(self, path: str = "archive/responses.lra", codec: Optional[str] = None,
+                 level: Optional[int] = None):
+        """
+        Initialize the response archive, creating it if needed.
+
+        Args:
+            path: Archive data file; the index is stored next to it as
+                ``<path>.idx``
+            codec: ``'zstd'`` or ``'gzip'`` for new records; defaults to zstd
+                when installed
+            level: Compression level (codec default when omitted)
+        """
+        if codec is None:
+            codec = 'zstd' if ZSTD_AVAILABLE else 'gzip'
+        if codec not in ('zstd', 'gzip'):
+            raise ResponseArchiveError(f"Unknown archive codec '{codec}' (choose zstd or gzip)")
+        if codec == 'zstd' and not ZSTD_AVAILABLE:
+            raise ResponseArchiveError("zstd compression not available. Install zstandard: pip install zstandard")
+
+        self.path = Path(path)
+        self.index_path = Path(f"{path}.idx")
+        self.codec = CODEC_ZSTD if codec == 'zstd' else CODEC_GZIP
+        self.level = level
+        self.logger = logging.getLogger(__name__)
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._map_lock = threading.Lock()
+        self._map: Optional[mmap.mmap] = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._initialize_file()
+        self._initialize_schema()
+
+    def _initialize_file(self) -> None:
+        """Write the file header to a new archive, or check an existing one."""
+        try:
+            with open(self.path, 'ab+') as f:
+                f.seek(0)
+                header = f.read(len(FILE_MAGIC) + 1)
+                if not header:
+                    f.write(FILE_MAGIC + bytes([FORMAT_VERSION]))
+                elif header[:len(FILE_MAGIC)] != FILE_MAGIC or len(header) < len(FILE_MAGIC) + 1:
+                    raise ResponseArchiveError(f"{self.path} is not a response archive")
+                elif header[-1] > FORMAT_VERSION:
+                    raise ResponseArchiveError(f"{self.path} uses archive format {header[-1]}, "
+                                               f"newer than supported ({FORMAT_VERSION})")
+        except OSError as e:
+            raise ResponseArchiveError(f"Failed to open response archive {self.path}: {e}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's index connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.index_path), timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _initialize_schema(self) -> None:
+        """Create the index table if needed."""
+        try:
+            conn = self._connect()
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS records (
+                    offset INTEGER PRIMARY KEY,
+                    length INTEGER NOT NULL,
+                    query TEXT NOT NULL,
+                    location TEXT NOT NULL,
+                    timestamp REAL NOT NULL,
+                    engine TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE INDEX IF NOT EXISTS idx_records_qlt
+                ON records (query, location, timestamp)
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_records_timestamp ON records (timestamp)")
+        except sqlite3.Error as e:
+            raise ResponseArchiveError(f"Failed to initialize archive index at {self.index_path}: {e}")
+
+    def append(self, params: Dict[str, Any], response: Dict[str, Any],
+               timestamp: Optional[float] = None) -> int:
+        """
+        Append one raw response.
+
+        Args:
+            params: Request parameters (the API key is never stored)
+            response: Parsed SerpAPI response
+            timestamp: Epoch seconds the response was fetched (defaults to now)
+
+        Returns:
+            Offset of the record in the data file
+        """
+        timestamp = timestamp if timestamp is not None else time.time()
+        normalized = normalize_params(params)
+        query, location = normalized.get('q', ''), normalized.get('location', '')
+        engine = normalized.get('engine', 'google')
+
+        metadata = json.dumps({'query': query, 'location': location, 'timestamp': timestamp,
+                               'engine': engine, 'params': normalized},
+                              separators=(',', ':')).encode('utf-8')
+        payload = _compress(json.dumps(response, separators=(',', ':')).encode('utf-8'),
+                            self.codec, self.level)
+        record = (RECORD_HEADER.pack(RECORD_MAGIC, self.codec, len(metadata), len(payload),
+                                     zlib.crc32(payload))
+                  + metadata + payload)
+
+        conn = self._connect()
+        with self._write_lock:
+            # The index write lock also serializes appends from other processes
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                with open(self.path, 'ab') as f:
+                    offset = f.seek(0, os.SEEK_END)
+                    f.write(record)
+                conn.execute(
+                    "INSERT INTO records (offset, length, query, location, timestamp, engine) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (offset, len(record), query, location, timestamp, engine)
+                )
+                conn.execute("COMMIT")
+            except Exception as e:
+                conn.execute("ROLLBACK")
+                raise ResponseArchiveError(f"Failed to append to response archive {self.path}: {e}")
+        return offset
+
+    def entries(self, query: Optional[str] = None, location: Optional[str] = None,
+                since: Optional[float] = None, until: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Index entries matching the filters, in file order.
+
+        Args:
+            query: Only this search query
+            location: Only this location
+            since: First timestamp (epoch seconds), inclusive
+            until: Last timestamp (epoch seconds), inclusive
+
+        Returns:
+            Rows of ``offset``, ``length``, ``query``, ``location``,
+            ``timestamp`` and ``engine``
+        """
+        sql = "SELECT offset, length, query, location, timestamp, engine FROM records WHERE 1 = 1"
+        params: List[Any] = []
+        for column, value in (('query', query), ('location', location)):
+            if value is not None:
+                sql += f" AND {column} = ?"
+                params.append(value)
+        if since is not None:
+            sql += " AND timestamp >= ?"
+            params.append(since)
+        if until is not None:
+            sql += " AND timestamp <= ?"
+            params.append(until)
+        sql += " ORDER BY offset"
+        return [dict(row) for row in self._connect().execute(sql, params)]
+
+    def latest(self, query: str, location: str) -> Optional[Dict[str, Any]]:
+        """Most recently archived record for a query and location, or None."""
+        row = self._connect().execute(
+            "SELECT offset FROM records WHERE query = ? AND location = ? ORDER BY timestamp DESC LIMIT 1",
+            (query, location)
+        ).fetchone()
+        return self.read(row['offset']) if row else None
+
+    def read(self, offset: int) -> Dict[str, Any]:
+        """
+        Read one record.
+
+        Returns:
+            Dict of ``offset``, ``query``, ``location``, ``timestamp``,
+            ``engine``, ``params`` and ``response``
+        """
+        record, _ = self._decode(self._mapped(), offset)
+        return record
+
+    def iter_records(self, query: Optional[str] = None, location: Optional[str] = None,
+                     since: Optional[float] = None, until: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Stream matching records in file order, decompressing one at a time."""
+        buffer = self._mapped()
+        for entry in self.entries(query, location, since, until):
+            if entry['offset'] + entry['length'] > len(buffer):
+                buffer = self._mapped()
+            record, _ = self._decode(buffer, entry['offset'])
+            yield record
+
+    def scan(self) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every record by walking the data file, without the index.
+
+        Stops with a warning at a truncated or corrupt record (e.g. from a
+        crash mid-append).
+        """
+        buffer = self._mapped()
+        offset = len(FILE_MAGIC) + 1
+        while offset < len(buffer):
+            try:
+                record, offset = self._decode(buffer, offset)
+            except ResponseArchiveError as e:
+                self.logger.warning(f"Stopped reading {self.path} at offset {offset}: {e}")
+                return
+            yield record
+
+    def rebuild_index(self) -> int:
+        """Recreate the offset index from the data file; returns the number of records."""
+        rows = []
+        buffer = self._mapped()
+        for record in self.scan():
+            end = self._record_end(buffer, record['offset'])
+            rows.append((record['offset'], end - record['offset'], record['query'], record['location'],
+                         record['timestamp'], record['engine']))
+
+        conn = self._connect()
+        with self._write_lock:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM records")
+                conn.executemany(
+                    "INSERT INTO records (offset, length, query, location, timestamp, engine) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        self.logger.info(f"Rebuilt index of {self.path} with {len(rows)} records")
+        return len(rows)
+
+    def count(self) -> int:
+        """Number of indexed records."""
+        return self._connect().execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Record count, data file size and codec for new records."""
+        return {
+            'records': self.count(),
+            'bytes': self.path.stat().st_size,
+            'codec': CODEC_NAMES[self.codec]
+        }
+
+    def close(self) -> None:
+        """Unmap the data file and close this thread's index connection."""
+        with self._map_lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _mapped(self) -> mmap.mmap:
+        """Read-only map of the data file, remapped when the file has grown."""
+        with self._map_lock:
+            size = self.path.stat().st_size
+            if self._map is None or len(self._map) < size:
+                # Readers may still hold the old map; it closes once unreferenced
+                with open(self.path, 'rb') as f:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._map
+
+    def _record_end(self, buffer: mmap.mmap, offset: int) -> int:
+        _, _, metadata_length, payload_length, _ = RECORD_HEADER.unpack_from(buffer, offset)
+        return offset + RECORD_HEADER.size + metadata_length + payload_length
+
+    def _decode(self, buffer: mmap.mmap, offset: int):
+        """Decode the record at ``offset``; returns it and the next record's offset."""
+        if offset + RECORD_HEADER.size > len(buffer):
+            raise ResponseArchiveError(f"Truncated record header at offset {offset}")
+        magic, codec, metadata_length, payload_length, checksum = RECORD_HEADER.unpack_from(buffer, offset)
+        if magic != RECORD_MAGIC:
+            raise ResponseArchiveError(f"No record at offset {offset}")
+
+        start = offset + RECORD_HEADER.size
+        end = start + metadata_length + payload_length
+        if end > len(buffer):
+            raise ResponseArchiveError(f"Truncated record at offset {offset}")
+
+        view = memoryview(buffer)
+        try:
+            metadata = json.loads(bytes(view[start:start + metadata_length]))
+            payload = view[start + metadata_length:end]
+            if zlib.crc32(payload) != checksum:
+                raise ResponseArchiveError(f"Checksum mismatch for record at offset {offset}")
+            response = json.loads(_decompress(payload, codec))
+        finally:
+            view.release()
+
+        metadata['offset'] = offset
+        metadata['response'] = response
+        return metadata, end
+
+
+def response_archive_from_path(path: Optional[str]) -> Optional[ResponseArchive]:
+    """Open the response archive at ``path`` if one is configured, else None."""
+    return ResponseArchive(path) if path else None
@@ -0,0 +1,258 @@
+"""
+Response Cache for LocalRankLens
+
+Persistent, content-addressed cache of SerpAPI responses stored in SQLite,
+so repeated queries across reports and worker processes don't spend API
+credits.
+"""
+
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+
+# Request parameters that never affect the response
+EXCLUDED_PARAMS = ('api_key',)
+
+# Default time-to-live per SerpAPI engine, in seconds
+DEFAULT_TTLS = {
+    'google': 24 * 3600,
+    'google_maps': 24 * 3600
+}
+
+
+class ResponseCacheError(Exception):
+    """Custom exception for response cache errors."""
+    pass
+
+
+def normalize_params(params: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Normalize request parameters for hashing.
+
+    Credentials are dropped and every value is converted to the string that
+    would be sent on the query string, so equivalent requests (e.g. ``num=10``
+    and ``num='10'``) map to the same key.
+
+    Args:
+        params: Request parameters
+
+    Returns:
+        Sorted dictionary of string parameters
+    """
+    normalized = {}
+    for key in sorted(params):
+        if key in EXCLUDED_PARAMS:
+            continue
+        value = params[key]
+        if value is None:
+            continue
+        normalized[key] = str(value)
+    return normalized
+
+
+def request_fingerprint(params: Dict[str, Any]) -> str:
+    """Return a stable SHA-256 key for a set of request parameters."""
+    canonical = json.dumps(normalize_params(params), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed SerpAPI response cache with per-engine TTL and LRU eviction.
+
+    Safe to share between threads and between processes pointing at the same
+    file: every write is a single transaction and the database runs in WAL
+    mode, so readers never see partial entries.
+    """
+
+    def __init__(self, path: str = "cache/serp_cache.sqlite3",
+                 ttls: Optional[Dict[str, float]] = None,
+                 default_ttl: float = 24 * 3600, max_entries: int = 10000):
+        """
+        Initialize the response cache.
+
+        Args:
+            path: SQLite database file
+            ttls: Time-to-live in seconds per engine (e.g. {'google_maps': 3600})
+            default_ttl: Time-to-live for engines not listed in ``ttls``
+            max_entries: Maximum cached responses before LRU eviction
+        """
+        self.path = Path(path)
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update(ttls or {})
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.logger = logging.getLogger(__name__)
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._stats_lock = threading.Lock()
+        self._local = threading.local()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._initialize_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _initialize_schema(self) -> None:
+        """Create the cache table and indexes if needed."""
+        try:
+            conn = self._connect()
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    engine TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    payload BLOB NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+        except sqlite3.Error as e:
+            raise ResponseCacheError(f"Failed to initialize cache at {self.path}: {e}")
+
+    def get_ttl(self, engine: str) -> float:
+        """Get the time-to-live in seconds for an engine."""
+        return self.ttls.get(engine, self.default_ttl)
+
+    def get(self, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Args:
+            params: Request parameters (the API key is ignored)
+
+        Returns:
+            Cached response, or None on a miss or expired entry
+        """
+        key = request_fingerprint(params)
+        engine = params.get('engine', 'google')
+        now = time.time()
+
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT created_at, payload FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None or now - row[0] > self.get_ttl(engine):
+                if row is not None:
+                    conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._count('misses')
+                return None
+
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            data = json.loads(zlib.decompress(row[1]))
+
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            self.logger.warning(f"Response cache read failed: {e}")
+            self._count('misses')
+            return None
+
+        self._count('hits')
+        self.logger.debug(f"Response cache hit for {params.get('q', '')!r} ({engine})")
+        return data
+
+    def set(self, params: Dict[str, Any], data: Dict[str, Any]) -> None:
+        """
+        Store a response, evicting least recently used entries when full.
+
+        Args:
+            params: Request parameters (the API key is ignored)
+            data: Parsed SerpAPI response
+        """
+        key = request_fingerprint(params)
+        engine = params.get('engine', 'google')
+        now = time.time()
+
+        try:
+            payload = zlib.compress(json.dumps(data, separators=(',', ':')).encode('utf-8'))
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, engine, created_at, last_access, payload) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, engine, now, now, payload)
+                )
+                evicted = self._evict(conn)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            self.logger.warning(f"Response cache write failed: {e}")
+            return
+
+        self._count('writes')
+        if evicted:
+            self._count('evictions', evicted)
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        """Delete least recently used entries above ``max_entries``."""
+        count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return 0
+
+        conn.execute(
+            "DELETE FROM responses WHERE key IN "
+            "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+            (excess,)
+        )
+        return excess
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        self._connect().execute("DELETE FROM responses")
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics for this process.
+
+        Returns:
+            Hit/miss/write/eviction counters, hit rate and current entry count
+        """
+        lookups = self.hits + self.misses
+        try:
+            entries = self._connect().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries
+        }
+
+    def close(self) -> None:
+        """Close this thread's database connection."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -4,48 +4,266 @@ Search Scraper for LocalRankLens
 Handles SerpAPI integration with error handling, rate limiting, and retry logic.
 """
 
-import time
 import logging
+import contextvars
 import requests
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, List, Optional
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from response_cache import ResponseCache, request_fingerprint
+from single_flight import SingleFlight
+from metrics import metrics
+from replay_server import FixtureStore
+from response_archive import ResponseArchiveError, response_archive_from_path
+from rate_limiter import RateLimiter, TokenBucketRateLimiter, UnlimitedRateLimiter
+from data_processor import ResponseProjection, extract_domain
+
+
+DEFAULT_BASE_URL = "https://serpapi.com/search"
+
+# HTTP statuses that are retried with backoff
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+# Extra cache key parameter marking projected responses (never sent to SerpAPI)
+PROJECTION_PARAM = '_projection'
+
+# Organic results per Google results page (SerpAPI's default ``num``)
+ORGANIC_PAGE_SIZE = 10
+
+# Error message prefixes per search kind
+_ERROR_LABELS = {
+    'search': {
+        'start': "Searching for",
+        'results': "search results",
+        'api': "SerpAPI error",
+        'http': "HTTP request failed for query",
+        'unexpected': "Unexpected error during search for"
+    },
+    'maps': {
+        'start': "Maps search for",
+        'results': "maps results",
+        'api': "SerpAPI Maps error",
+        'http': "Maps search failed for query",
+        'unexpected': "Unexpected error during maps search for"
+    }
+}
+
 
 class SearchScraperError(Exception):
     """Custom exception for search scraper errors."""
     pass
 
 
+class SerpResponse(dict):
+    """Parsed SerpAPI payload that also carries the raw response body, for debugging."""
+
+    __slots__ = ('raw_body',)
+
+    def __init__(self, data: Dict[str, Any], raw_body: bytes):
+        super().__init__(data)
+        self.raw_body = raw_body
+
+
+def default_rate_limiter(rate_limit_delay: float) -> RateLimiter:
+    """Create a private limiter allowing one request per ``rate_limit_delay`` seconds."""
+    if rate_limit_delay <= 0:
+        return UnlimitedRateLimiter()
+    return TokenBucketRateLimiter(rate=1.0 / rate_limit_delay, capacity=1)
+
+
+def build_search_params(api_key: str, query: str, location: str, **kwargs) -> Dict[str, Any]:
+    """
+    Build SerpAPI parameters for a regular Google search.
+    
+    Args:
+        api_key: SerpAPI key
+        query: Search query string
+        location: Location for the search
+        **kwargs: Additional parameters for SerpAPI
+        
+    Returns:
+        Request parameters dictionary
+    """
+    params = {
+        'api_key': api_key,
+        'engine': 'google',
+        'q': query,
+        'location': location,
+        'google_domain': 'google.com',
+        'gl': 'us',
+        'hl': 'en',
+        'num': kwargs.get('num_results', 10),
+        'start': kwargs.get('start', 0)
+    }
+    
+    # Add any additional parameters
+    params.update(kwargs)
+    return params
+
+
+def build_maps_params(api_key: str, query: str, location: str) -> Dict[str, Any]:
+    """Build SerpAPI parameters for a Google Maps search."""
+    return {
+        'api_key': api_key,
+        'engine': 'google_maps',
+        'q': query,
+        'location': location,
+        'type': 'search'
+    }
+
+
+def check_response_data(data: Dict[str, Any], kind: str = 'search') -> Dict[str, Any]:
+    """
+    Raise SearchScraperError if a parsed SerpAPI payload reports an error.
+    
+    Args:
+        data: Parsed SerpAPI response
+        kind: Search kind ('search' or 'maps'), used for the error message
+        
+    Returns:
+        The response data unchanged
+    """
+    if 'error' in data:
+        raise SearchScraperError(f"{_ERROR_LABELS[kind]['api']}: {data['error']}")
+    return data
+
+
+def attach_raw_body(data: Dict[str, Any], body: bytes) -> Dict[str, Any]:
+    """Return ``data`` carrying the raw response body it was parsed from."""
+    return SerpResponse(data, body) if isinstance(data, dict) else data
+
+
+def project_response(data: Dict[str, Any],
+                     projection: Optional[ResponseProjection]) -> Dict[str, Any]:
+    """Apply ``projection`` to a parsed payload, carrying over any raw body."""
+    if projection is None:
+        return data
+    projected = projection.apply(data)
+    raw_body = getattr(data, 'raw_body', None)
+    return projected if raw_body is None else SerpResponse(projected, raw_body)
+
+
+def response_cache_params(params: Dict[str, Any],
+                          projection: Optional[ResponseProjection]) -> Dict[str, Any]:
+    """
+    Parameters identifying a response in the cache and single-flight group.
+
+    Projected responses are keyed apart from full ones (and from other
+    projections), so switching modes never serves a payload of the wrong shape.
+    """
+    if projection is None:
+        return params
+    return dict(params, **{PROJECTION_PARAM: projection.key})
+
+
+def page_starts(depth: int) -> List[int]:
+    """``start`` offsets of the results pages covering the first ``depth`` organic results."""
+    return list(range(0, max(1, depth), ORGANIC_PAGE_SIZE))
+
+
+def has_next_page(response: Dict[str, Any]) -> bool:
+    """Whether SerpAPI reports a further results page after ``response``."""
+    pagination = response.get('serpapi_pagination')
+    return bool(response.get('organic_results')) and isinstance(pagination, dict) and bool(pagination.get('next'))
+
+
+def domains_found(organic_results: List[Dict[str, Any]], domains: Iterable[str]) -> bool:
+    """Whether every domain (or a subdomain of it) links from ``organic_results``."""
+    found = {extract_domain(entry.get('link', '')) for entry in organic_results if isinstance(entry, dict)}
+    return all(any(host == domain or host.endswith('.' + domain) for host in found) for domain in domains)
+
+
+def merge_pages(pages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combine consecutive results pages into one response.
+
+    Everything but the organic results comes from the first page; organic
+    results of later pages are appended with positions continuing from the
+    previous page.
+    """
+    merged = dict(pages[0])
+    organic_results = list(pages[0].get('organic_results') or [])
+    for page in pages[1:]:
+        for entry in page.get('organic_results') or []:
+            organic_results.append(dict(entry, position=len(organic_results) + 1)
+                                   if isinstance(entry, dict) else entry)
+    merged['organic_results'] = organic_results
+    return merged
+
+
+def paging_done(pages: List[Dict[str, Any]], stop_domains: Iterable[str]) -> bool:
+    """Whether fetching another page could not change a depth search's result."""
+    if not has_next_page(pages[-1]):
+        return True
+    stop_domains = list(stop_domains)
+    if not stop_domains:
+        return False
+    return domains_found([entry for page in pages for entry in page.get('organic_results') or []],
+                         stop_domains)
+
+
 class SearchScraper:
     """Handles search queries using SerpAPI with robust error handling."""
     
-    def __init__(self, api_key: str, rate_limit_delay: float = 1.0):
+    def __init__(self, api_key: str, rate_limit_delay: float = 1.0,
+                 pool_maxsize: int = 10, cache: Optional[ResponseCache] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 single_flight: Optional[SingleFlight] = None,
+                 base_url: Optional[str] = None, record_dir: Optional[str] = None,
+                 project_responses: bool = False, keep_raw_body: bool = False,
+                 archive_path: Optional[str] = None):
         """
         Initialize the search scraper.
         
         Args:
             api_key: SerpAPI key
-            rate_limit_delay: Delay between requests in seconds
+            rate_limit_delay: Delay between requests in seconds, used when no
+                ``rate_limiter`` is given
+            pool_maxsize: Maximum number of pooled connections, which should be
+                at least the number of threads sharing this scraper
+            cache: Optional persistent response cache
+            rate_limiter: Optional rate limiter, e.g. one shared by every
+                scraper in the process or host
+            single_flight: Optional single-flight group used to coalesce
+                identical concurrent requests, e.g. one shared process-wide
+            base_url: SerpAPI search endpoint, e.g. a local replay server
+            record_dir: Directory to record live responses to as fixtures
+            project_responses: Keep only the sections and fields DataProcessor
+                reads; fixtures are still recorded in full
+            keep_raw_body: Attach the raw response body to live responses as
+                ``raw_body`` bytes (debugging only; never cached)
+            archive_path: Response archive to append every live response to,
+                in full, for later reprocessing
         """
         self.api_key = api_key
         self.rate_limit_delay = rate_limit_delay
-        self.base_url = "https://serpapi.com/search"
+        self.rate_limiter = rate_limiter or default_rate_limiter(rate_limit_delay)
+        self.cache = cache
+        self.single_flight = single_flight or SingleFlight()
+        self.base_url = base_url or DEFAULT_BASE_URL
+        self.recorder = FixtureStore(record_dir) if record_dir else None
+        self.projection = ResponseProjection() if project_responses else None
+        self.keep_raw_body = keep_raw_body
+        self.archive = response_archive_from_path(archive_path)
         self.logger = logging.getLogger(__name__)
         
         # Set up session with retry strategy
         self.session = requests.Session()
         retry_strategy = Retry(
             total=3,
-            status_forcelist=[429, 500, 502, 503, 504],
+            status_forcelist=RETRY_STATUSES,
             allowed_methods=["HEAD", "GET", "OPTIONS"],
             backoff_factor=1
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=pool_maxsize,
+            pool_maxsize=pool_maxsize
+        )
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
-        
-        self.last_request_time = 0
 
     def _format_location(self, city: str, state: str) -> str:
         """
@@ -81,13 +299,16 @@ class SearchScraper:
         # Format as "City, State, United States"
         return f"{city}, {state_full}, United States"
 
-    def search(self, query: str, location: str, **kwargs) -> Dict[str, Any]:
+    def search(self, query: str, location: str, bypass_cache: bool = False,
+               refresh_cache: bool = False, **kwargs) -> Dict[str, Any]:
         """
         Perform a search query using SerpAPI.
         
         Args:
             query: Search query string
             location: Location for the search (e.g., "Seattle, WA")
+            bypass_cache: Neither read nor write the response cache
+            refresh_cache: Skip the cached response and store a fresh one
             **kwargs: Additional parameters for SerpAPI
             
         Returns:
@@ -96,63 +317,83 @@ class SearchScraper:
         Raises:
             SearchScraperError: If the search fails
         """
-        # Rate limiting
-        self._enforce_rate_limit()
-        
-        # Prepare search parameters
-        params = {
-            'api_key': self.api_key,
-            'engine': 'google',
-            'q': query,
-            'location': location,
-            'google_domain': 'google.com',
-            'gl': 'us',
-            'hl': 'en',
-            'num': kwargs.get('num_results', 10),
-            'start': kwargs.get('start', 0)
-        }
+        params = build_search_params(self.api_key, query, location, **kwargs)
+        return self._cached_request(params, query, location, 'search',
+                                    bypass_cache, refresh_cache)
+    
+    def search_depth(self, query: str, location: str, depth: int,
+                     stop_domains: Iterable[str] = (), page_concurrency: int = 1,
+                     bypass_cache: bool = False, refresh_cache: bool = False) -> Dict[str, Any]:
+        """
+        Search deep enough to cover the first ``depth`` organic results.
         
-        # Add any additional parameters
-        params.update(kwargs)
+        The first page is the same request as ``search`` makes. Further
+        pages (``start`` = 10, 20, ...) are fetched ``page_concurrency`` at a
+        time, and only while they can still change the result: paging stops
+        at the last page SerpAPI reports, and once every ``stop_domains``
+        entry (e.g. the client's domain) is among the organic results. Pages
+        of a batch after the stopping page are discarded, so the result does
+        not depend on ``page_concurrency``; a ``page_concurrency`` of 1 never
+        requests a page that is not used.
         
-        try:
-            self.logger.info(f"Searching for '{query}' in '{location}'")
-            response = self.session.get(self.base_url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Check for SerpAPI errors
-            if 'error' in data:
-                error_msg = data['error']
-                self.logger.error(f"SerpAPI error: {error_msg}")
-                raise SearchScraperError(f"SerpAPI error: {error_msg}")
+        Args:
+            query: Search query string
+            location: Location for the search
+            depth: Organic results wanted
+            stop_domains: Domains whose appearance ends paging early
+            page_concurrency: Pages requested at once after the first
+            bypass_cache: Neither read nor write the response cache
+            refresh_cache: Skip the cached response and store a fresh one
             
-            self.logger.info(f"Successfully retrieved search results for '{query}'")
-            return data
+        Returns:
+            First-page response with the organic results of every page
+            fetched, positioned continuously
             
-        except requests.exceptions.RequestException as e:
-            error_msg = f"HTTP request failed for query '{query}': {e}"
-            self.logger.error(error_msg)
-            raise SearchScraperError(error_msg)
+        Raises:
+            SearchScraperError: If the first page fails; a later page that
+                fails ends paging with the pages fetched so far
+        """
+        pages = [self.search(query, location, bypass_cache=bypass_cache, refresh_cache=refresh_cache)]
+        remaining = page_starts(depth)[1:]
+        if not remaining or paging_done(pages, stop_domains):
+            metrics.increment('search_pages_total')
+            return pages[0]
         
-        except ValueError as e:
-            error_msg = f"Failed to parse JSON response for query '{query}': {e}"
-            self.logger.error(error_msg)
-            raise SearchScraperError(error_msg)
+        batch_size = max(1, page_concurrency)
         
-        except Exception as e:
-            error_msg = f"Unexpected error during search for '{query}': {e}"
-            self.logger.error(error_msg)
-            raise SearchScraperError(error_msg)
+        def fetch_page(start: int) -> Dict[str, Any]:
+            return self.search(query, location, bypass_cache=bypass_cache,
+                               refresh_cache=refresh_cache, start=start)
+        
+        with ThreadPoolExecutor(max_workers=batch_size, thread_name_prefix="lrl-page") as executor:
+            while remaining and not paging_done(pages, stop_domains):
+                batch, remaining = remaining[:batch_size], remaining[batch_size:]
+                futures = [executor.submit(contextvars.copy_context().run, fetch_page, start)
+                           for start in batch]
+                for start, future in zip(batch, futures):
+                    try:
+                        pages.append(future.result())
+                    except SearchScraperError as e:
+                        self.logger.warning(f"Stopped paging '{query}' at start={start}: {e}")
+                        remaining = []
+                        break
+                    if paging_done(pages, stop_domains):
+                        break
+        
+        metrics.increment('search_pages_total', len(pages))
+        self.logger.info(f"Fetched {len(pages)} results pages for '{query}'")
+        return merge_pages(pages)
     
-    def search_local(self, query: str, location: str) -> Dict[str, Any]:
+    def search_local(self, query: str, location: str, bypass_cache: bool = False,
+                     refresh_cache: bool = False) -> Dict[str, Any]:
         """
         Perform a local search optimized for local business results.
         
         Args:
             query: Search query string
             location: Location for the search
+            bypass_cache: Neither read nor write the response cache
+            refresh_cache: Skip the cached response and store a fresh one
             
         Returns:
             SerpAPI response with local results
@@ -160,54 +401,139 @@ class SearchScraper:
         return self.search(
             query=query,
             location=location,
+            bypass_cache=bypass_cache,
+            refresh_cache=refresh_cache,
             tbm='lcl',  # Local search
             num_results=20  # Get more results for local searches
         )
     
-    def search_maps(self, query: str, location: str) -> Dict[str, Any]:
+    def search_maps(self, query: str, location: str, bypass_cache: bool = False,
+                    refresh_cache: bool = False) -> Dict[str, Any]:
         """
         Perform a Google Maps search.
         
         Args:
             query: Search query string
             location: Location for the search
+            bypass_cache: Neither read nor write the response cache
+            refresh_cache: Skip the cached response and store a fresh one
             
         Returns:
             SerpAPI response with maps results
         """
-        params = {
-            'api_key': self.api_key,
-            'engine': 'google_maps',
-            'q': query,
-            'location': location,
-            'type': 'search'
-        }
+        params = build_maps_params(self.api_key, query, location)
+        return self._cached_request(params, query, location, 'maps',
+                                    bypass_cache, refresh_cache)
+    
+    def _cached_request(self, params: Dict[str, Any], query: str, location: str,
+                        kind: str, bypass_cache: bool = False,
+                        refresh_cache: bool = False) -> Dict[str, Any]:
+        """
+        Serve a request from the response cache, falling back to SerpAPI.
+        
+        Concurrent identical requests are coalesced: one caller performs the
+        lookup and request while the others wait for and share its result.
+        Only callers with the same cache mode share, so a ``refresh_cache``
+        or ``bypass_cache`` caller never receives a cached payload.
+        """
+        with metrics.timer('search_seconds', kind=kind):
+            return self.single_flight.do(
+                (request_fingerprint(response_cache_params(params, self.projection)),
+                 bypass_cache, refresh_cache),
+                lambda: self._fetch(params, query, location, kind, bypass_cache, refresh_cache)
+            )
+    
+    def _fetch(self, params: Dict[str, Any], query: str, location: str, kind: str,
+               bypass_cache: bool, refresh_cache: bool) -> Dict[str, Any]:
+        """Look up the response cache and request from SerpAPI on a miss."""
+        use_cache = self.cache is not None and not bypass_cache
+        cache_params = response_cache_params(params, self.projection)
+        
+        if use_cache and not refresh_cache:
+            cached = self.cache.get(cache_params)
+            metrics.increment('cache_lookups_total', kind=kind,
+                              result='miss' if cached is None else 'hit')
+            if cached is not None:
+                self.logger.info(f"Using cached results for '{query}' in '{location}'")
+                return cached
+        
+        data = self._request(params, query, location, kind=kind)
+        
+        if self.recorder is not None:
+            self.recorder.save(params, data)
+        
+        if self.archive is not None:
+            self._archive(params, data)
+        
+        data = project_response(data, self.projection)
+        
+        if use_cache:
+            self.cache.set(cache_params, data)
+        
+        return data
+    
+    def _archive(self, params: Dict[str, Any], data: Dict[str, Any]) -> None:
+        """Append a live response to the archive; a failure never fails the search."""
+        try:
+            self.archive.append(params, data)
+        except ResponseArchiveError as e:
+            self.logger.warning(f"Failed to archive response for '{params.get('q', '')}': {e}")
+    
+    def _request(self, params: Dict[str, Any], query: str, location: str,
+                 kind: str = 'search') -> Dict[str, Any]:
+        """
+        Send a rate-limited request to SerpAPI and return the parsed payload.
+        
+        Args:
+            params: Full request parameters, including the API key
+            query: Search query string (for logging and errors)
+            location: Location for the search (for logging)
+            kind: Search kind ('search' or 'maps')
+            
+        Returns:
+            SerpAPI response as dictionary
+            
+        Raises:
+            SearchScraperError: If the request fails or SerpAPI reports an error
+        """
+        labels = _ERROR_LABELS[kind]
         
         # Rate limiting
         self._enforce_rate_limit()
         
         try:
-            self.logger.info(f"Maps search for '{query}' in '{location}'")
-            response = self.session.get(self.base_url, params=params, timeout=30)
-            response.raise_for_status()
+            self.logger.info(f"{labels['start']} '{query}' in '{location}'")
+            with metrics.timer('serpapi_request_seconds', kind=kind):
+                response = self.session.get(self.base_url, params=params, timeout=30)
+                response.raise_for_status()
             
-            data = response.json()
+            with metrics.timer('json_parse_seconds', kind=kind):
+                data = response.json()
+            if self.keep_raw_body:
+                data = attach_raw_body(data, response.content)
             
-            if 'error' in data:
-                error_msg = data['error']
-                self.logger.error(f"SerpAPI Maps error: {error_msg}")
-                raise SearchScraperError(f"SerpAPI Maps error: {error_msg}")
+            # Check for SerpAPI errors
+            check_response_data(data, kind)
             
-            self.logger.info(f"Successfully retrieved maps results for '{query}'")
+            self.logger.info(f"Successfully retrieved {labels['results']} for '{query}'")
             return data
             
+        except SearchScraperError as e:
+            self.logger.error(str(e))
+            raise
+        
         except requests.exceptions.RequestException as e:
-            error_msg = f"Maps search failed for query '{query}': {e}"
+            error_msg = f"{labels['http']} '{query}': {e}"
+            self.logger.error(error_msg)
+            raise SearchScraperError(error_msg)
+        
+        except ValueError as e:
+            error_msg = f"Failed to parse JSON response for query '{query}': {e}"
             self.logger.error(error_msg)
             raise SearchScraperError(error_msg)
         
         except Exception as e:
-            error_msg = f"Unexpected error during maps search for '{query}': {e}"
+            error_msg = f"{labels['unexpected']} '{query}': {e}"
             self.logger.error(error_msg)
             raise SearchScraperError(error_msg)
     
@@ -260,16 +586,20 @@ class SearchScraper:
         return results
     
     def _enforce_rate_limit(self) -> None:
-        """Enforce rate limiting between requests."""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        
-        if time_since_last_request < self.rate_limit_delay:
-            sleep_time = self.rate_limit_delay - time_since_last_request
-            self.logger.debug(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
-            time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
+        """
+        Enforce rate limiting between requests.
+
+        Thread-safe: the rate limiter reserves a token for each caller before
+        it sleeps, so threads sharing one limiter stay within a single budget.
+        """
+        sleep_time = self.rate_limiter.acquire()
+        metrics.observe('rate_limit_wait_seconds', sleep_time)
+        if sleep_time > 0:
+            self.logger.debug(f"Rate limiting: slept for {sleep_time:.2f} seconds")
+    
+    def get_requests_saved(self) -> int:
+        """Number of requests avoided by coalescing identical in-flight requests."""
+        return self.single_flight.requests_saved
     
     def validate_api_key(self) -> bool:
         """
@@ -0,0 +1,127 @@
+"""
+Single-Flight Request Coalescing for LocalRankLens
+
+Concurrent callers asking for the same key share one in-flight call instead
+of each issuing an identical (paid) SerpAPI request.
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    """State of one in-flight call shared by its leader and followers."""
+
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Thread-based single-flight group.
+
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is running wait and receive the same result object, or
+    the same exception. Results are shared, so callers must not mutate them.
+    """
+
+    def __init__(self):
+        """Initialize an empty single-flight group."""
+        self.requests_saved = 0
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run ``fn`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Identity of the call (e.g. a request fingerprint)
+            fn: Zero-argument function performing the call
+
+        Returns:
+            The leader's result
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.requests_saved += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    asyncio single-flight group for coroutines on one event loop.
+
+    Followers await the leader's task, so cancelling one follower does not
+    cancel the shared request.
+    """
+
+    def __init__(self):
+        """Initialize an empty single-flight group."""
+        self.requests_saved = 0
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Await ``fn()`` once for all concurrent callers with the same key.
+
+        Args:
+            key: Identity of the call (e.g. a request fingerprint)
+            fn: Zero-argument coroutine function performing the call
+
+        Returns:
+            The leader's result
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            self.requests_saved += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently running."""
+        return len(self._calls)
+
+
+_shared_single_flight = SingleFlight()
+
+
+def get_shared_single_flight() -> SingleFlight:
+    """Get the process-wide single-flight group shared by all scrapers."""
+    return _shared_single_flight
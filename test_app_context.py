@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Application context tests for LocalRankLens
+
+Runs analyses from in-memory configs through one long-lived context backed
+by the local replay server, without making actual API calls.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from app_context import AppContext
+from config_manager import ConfigurationError
+from replay_server import ReplayServer
+
+
+def _config(business_name):
+    return {
+        'business_name': business_name,
+        'location': {'city': 'Spokane', 'state': 'WA'},
+        'keywords': {'core': ['sprinkler repair', 'irrigation repair']},
+        'output_prefix': business_name.lower().replace(' ', '-')
+    }
+
+
+def test_context_reuses_components_and_validation():
+    """Analyses share the scraper and validate the API key once."""
+    env = {'SERPAPI_KEY': 'test-key', 'RATE_LIMIT_DELAY': '0', 'SERP_CACHE_PATH': '',
+           'TEMPLATE_CACHE_DIR': '', 'METRICS_DIR': ''}
+    saved = {name: os.environ.get(name) for name in list(env) + ['SERPAPI_BASE_URL', 'OUTPUT_DIR']}
+
+    with tempfile.TemporaryDirectory() as output_dir, \
+            ReplayServer(fallback_path='debug_raw_response.json') as server:
+        os.environ.update(env, SERPAPI_BASE_URL=server.base_url, OUTPUT_DIR=output_dir)
+        try:
+            context = AppContext(env_path='missing.env', revalidate_interval=3600)
+            first = context.create_analysis(_config('First Business'), report_format='html')
+            second = context.create_analysis(_config('Second Business'), report_format='html')
+
+            reports = [first.run_analysis(), second.run_analysis()]
+
+            assert all(report.startswith(output_dir) for report in reports)
+            assert first.search_scraper is second.search_scraper is context.search_scraper
+            assert first.report_writer is second.report_writer
+            # One validation request plus two keywords per analysis
+            assert server.stats['requests'] == 1 + 2 * 2
+
+            # Revalidation does not hold up report writer lookups
+            def validate_api_key():
+                lookup = threading.Thread(target=context.get_report_writer, args=(output_dir,))
+                lookup.start()
+                lookup.join(timeout=5)
+                return not lookup.is_alive()
+
+            context._validated_at = None
+            context.search_scraper.validate_api_key = validate_api_key
+            context.ensure_api_key()
+
+            try:
+                context.create_analysis({'business_name': 'No keywords'})
+                raise AssertionError("Expected a ConfigurationError")
+            except ConfigurationError:
+                pass
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+    print(f"✓ Two analyses on one context: {server.stats['requests']} requests")
+
+
+def main():
+    """Run all application context tests."""
+    tests = [
+        test_context_reuses_components_and_validation
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Batch runner tests for LocalRankLens
+
+Runs several client configs through one shared context backed by the local
+replay server, without making actual API calls.
+"""
+
+import os
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from app_context import AppContext
+from batch_runner import BatchRunner, load_batch_configs
+from replay_server import ReplayServer
+
+
+def _config(business_name, city, keywords):
+    return {
+        'business_name': business_name,
+        'location': {'city': city, 'state': 'WA'},
+        'keywords': {'core': keywords},
+        'output_prefix': business_name.lower().replace(' ', '-')
+    }
+
+
+def test_batch_deduplicates_searches_and_writes_manifest():
+    """Shared query/location pairs are searched once; every client gets a report and timing."""
+    env = {'SERPAPI_KEY': 'test-key', 'RATE_LIMIT_DELAY': '0', 'SERP_CACHE_PATH': '',
+           'TEMPLATE_CACHE_DIR': '', 'METRICS_DIR': ''}
+    saved = {name: os.environ.get(name) for name in list(env) + ['SERPAPI_BASE_URL', 'OUTPUT_DIR']}
+
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            ReplayServer(fallback_path='debug_raw_response.json') as server:
+        os.environ.update(env, SERPAPI_BASE_URL=server.base_url, OUTPUT_DIR=tmp_dir)
+        try:
+            clients_dir = Path(tmp_dir) / 'clients'
+            clients_dir.mkdir()
+            configs = {
+                'alpha': _config('Alpha Irrigation', 'Spokane', ['sprinkler repair', 'irrigation repair']),
+                'beta': _config('Beta Sprinklers', 'Spokane', ['sprinkler repair', 'lawn sprinklers']),
+                'gamma': _config('Gamma Lawns', 'Tacoma', ['sprinkler repair']),
+                'broken': {'business_name': 'No keywords'}
+            }
+            for name, config in configs.items():
+                (clients_dir / f"{name}.json").write_text(json.dumps(config))
+
+            clients, settings = load_batch_configs(str(clients_dir))
+            assert [client['name'] for client in clients] == ['alpha', 'beta', 'broken', 'gamma']
+
+            context = AppContext(env_path='missing.env', settings=settings)
+            manifest_path = str(Path(tmp_dir) / 'batch.json')
+            manifest = BatchRunner(context, max_concurrency=3, render_workers=2,
+                                   report_format='html').run(clients, manifest_path)
+            context.close()
+
+            # 5 keyword tasks, 4 unique (keyword, location) pairs, plus one key validation
+            assert manifest['keyword_tasks'] == 5
+            assert manifest['unique_searches'] == 4
+            assert server.stats['requests'] == 1 + 4
+
+            by_name = {entry['name']: entry for entry in manifest['clients']}
+            assert by_name['broken']['status'] == 'failed'
+            for name in ('alpha', 'beta', 'gamma'):
+                entry = by_name[name]
+                assert entry['status'] == 'completed', entry
+                assert Path(entry['report_path']).exists()
+                assert entry['render_seconds'] is not None and entry['total_seconds'] >= entry['searches_seconds']
+            assert 'Alpha Irrigation' in Path(by_name['alpha']['report_path']).read_text(encoding='utf-8')
+
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                assert json.load(f)['clients_completed'] == 3
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+    print(f"✓ Batch of 4 clients: {manifest['unique_searches']} searches for {manifest['keyword_tasks']} tasks")
+
+
+def main():
+    """Run all batch runner tests."""
+    tests = [
+        test_batch_deduplicates_searches_and_writes_manifest
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Columnar store tests for LocalRankLens
+
+Checks the columnar group-by aggregations against the row-wise aggregator
+and competitor index, with NumPy when it is installed and without.
+"""
+
+import sys
+
+# Add src to path
+sys.path.insert(0, 'src')
+sys.path.insert(0, '.')
+
+from columnar import ColumnarResults, NUMPY_AVAILABLE
+from data_processor import DataProcessor
+from config_manager import ConfigManager
+from benchmarks.synthetic import SyntheticSerpGenerator
+
+
+def _results(count=150):
+    generator = SyntheticSerpGenerator(seed=5)
+    processor = DataProcessor()
+    results = [processor.process_search_results(response, keyword, group)
+               for keyword, group, response in generator.responses(count)]
+    results.append(processor._create_empty_result('failed keyword', 'core'))
+    return results
+
+
+def test_columnar_matches_row_aggregation():
+    """Group stats, rankings and rating averages match aggregate_results and CompetitorIndex."""
+    results = _results()
+    aggregated = DataProcessor().aggregate_results(results)
+    index = aggregated['competitor_index']
+    expected_groups = {
+        group: {key: value for key, value in stats.items() if key != 'results'}
+        for group, stats in aggregated['by_keyword_group'].items()
+    }
+
+    modes = [False, True] if NUMPY_AVAILABLE else [False]
+    for use_numpy in modes:
+        store = ColumnarResults.from_results(results, use_numpy=use_numpy)
+        assert store.group_stats() == expected_groups
+
+        organic = store.competitor_rankings('organic_results', 5)
+        assert [(row['competitor'], row['appearances']) for row in organic] == \
+            [(row['domain'], row['appearances']) for row in index.top_organic_competitors(5)]
+        for row, expected in zip(organic, index.top_organic_competitors(5)):
+            assert abs(row['avg_position'] - expected['avg_position']) < 1e-9
+
+        maps = store.competitor_rankings('maps_listings')
+        assert [(row['competitor'], row['appearances']) for row in maps] == \
+            [(row['name'], row['appearances']) for row in index.top_maps_competitors(None)]
+
+        ratings, expected_ratings = store.rating_stats(), index.rating_stats()
+        assert ratings['count'] == expected_ratings['count'] and ratings['max'] == expected_ratings['max']
+        assert abs(ratings['average'] - expected_ratings['average']) < 1e-9
+        assert store.review_stats() == index.review_stats()
+
+    print(f"✓ {len(store)} columnar rows aggregate like the row-wise path "
+          f"({'NumPy and array' if NUMPY_AVAILABLE else 'array'} columns)")
+
+
+def test_columnar_aggregation_setting():
+    """The opt-in setting routes aggregation through the store with the same report data."""
+    results = _results()
+    row_wise = DataProcessor().aggregate_results(results)
+    columnar = DataProcessor().aggregate_results(results, columnar=True)
+    assert columnar['competitor_index'].columnar is not None
+    assert columnar['summary'] == row_wise['summary']
+    assert columnar['by_keyword_group'] == row_wise['by_keyword_group']
+
+    index, expected = columnar['competitor_index'], row_wise['competitor_index']
+    assert index.top_maps_competitors(5) == expected.top_maps_competitors(5)
+    assert index.top_organic_competitors(None) == expected.top_organic_competitors(None)
+    assert index.review_stats() == expected.review_stats()
+    ratings, expected_ratings = index.rating_stats(), expected.rating_stats()
+    assert ratings['count'] == expected_ratings['count'] and ratings['max'] == expected_ratings['max']
+    assert abs(ratings['average'] - expected_ratings['average']) < 1e-9
+
+    for value, enabled in (('true', True), ('0', False), (False, False)):
+        config = {'performance_settings': {'columnar_aggregation': value}}
+        settings = ConfigManager(config=config, load_env=False, validate=False).get_performance_settings()
+        assert settings['columnar_aggregation'] is enabled
+    print("✓ columnar_aggregation produces the same report data")
+
+
+def test_empty_store():
+    """An empty store aggregates to empty results."""
+    store = ColumnarResults()
+    assert len(store) == 0
+    assert store.group_stats() == {}
+    assert store.competitor_rankings() == []
+    assert store.rating_stats() == {'count': 0, 'average': 0, 'max': 0}
+    print("✓ Empty columnar store")
+
+
+def main():
+    """Run all columnar store tests."""
+    tests = [
+        test_columnar_matches_row_aggregation,
+        test_columnar_aggregation_setting,
+        test_empty_store
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Competitor index tests for LocalRankLens
+
+Checks the single-pass competitor index against the results it was built
+from and the report insights that read from it.
+"""
+
+import sys
+import json
+
+# Add src to path
+sys.path.insert(0, 'src')
+sys.path.insert(0, '.')
+
+from competitor_index import CompetitorIndex
+from data_processor import DataProcessor
+from report_writer import ReportWriter
+from records import json_default
+from benchmarks.synthetic import SyntheticSerpGenerator
+
+
+def _results(count=30):
+    generator = SyntheticSerpGenerator(seed=11, competitor_pool=12, domain_pool=25)
+    processor = DataProcessor()
+    results = [processor.process_search_results(response, keyword, group)
+               for keyword, group, response in generator.responses(count)]
+    results.append(processor._create_empty_result('failed keyword', 'core'))
+    return results
+
+
+def test_index_matches_results():
+    """Appearances, positions and keyword membership match a full scan."""
+    results = _results()
+    index = CompetitorIndex.from_results(results)
+
+    assert (index.total_searches, index.successful_searches) == (31, 30)
+    for domain, competitor in index.organic_competitors.items():
+        hits = [(result['keyword'], organic['position']) for result in results
+                for organic in result['organic_results'] if organic['domain'] == domain]
+        assert competitor['keywords'] == [keyword for keyword, _ in hits]
+        assert competitor['positions'] == [position for _, position in hits]
+        assert competitor['avg_position'] == sum(competitor['positions']) / len(hits)
+
+    titles = {listing['title'] for result in results for listing in result['maps_listings']}
+    assert set(index.maps_competitors) == titles
+    assert sum(c['appearances'] for c in index.maps_competitors.values()) == index.maps_listing_count
+    assert sum(index.domain_counts().values()) == index.organic_result_count
+    print(f"✓ Indexed {len(index.organic_competitors)} domains and {len(titles)} Maps competitors")
+
+
+def test_insights_from_index():
+    """Insights are the same with a stored or rebuilt index, and unrated listings don't fail."""
+    writer = ReportWriter(template_dir='templates', output_dir='output')
+    aggregated = DataProcessor().aggregate_results(_results())
+    reloaded = json.loads(json.dumps({k: v for k, v in aggregated.items() if k != 'competitor_index'},
+                                     default=json_default))
+    assert writer._generate_insights(reloaded) == writer._generate_insights(aggregated)
+
+    unrated = DataProcessor().aggregate_results([{
+        'keyword': 'sprinkler repair', 'keyword_group': 'core',
+        'maps_listings': [{'position': 1, 'title': 'No Reviews Yet', 'rating': 0, 'reviews': 0}],
+        'local_services_ads': [], 'organic_results': [], 'ads': []
+    }])
+    insights = writer._generate_insights(unrated)
+    findings = insights['business_insights']['market_overview']['key_findings']
+    assert not any('stars' in finding for finding in findings)
+    assert insights['gmb_recommendations']['competitive_benchmarks']['average_rating'] == 0
+    print("✓ Insights read from the competitor index")
+
+
+def main():
+    """Run all competitor index tests."""
+    tests = [
+        test_index_matches_results,
+        test_insights_from_index
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
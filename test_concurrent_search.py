@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Concurrency tests for LocalRankLens
+
+Exercises the bounded-concurrency search fan-out and the shared rate
+limiter without making actual API calls.
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import tempfile
+import threading
+import multiprocessing
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from search_scraper import SearchScraper, SearchScraperError
+from async_search_scraper import AsyncSearchScraper
+from rate_limiter import TokenBucketRateLimiter, SQLiteTokenBucketRateLimiter
+from data_processor import DataProcessor, ResultAggregator
+from localranklens import LocalRankLens
+from benchmarks.synthetic import SyntheticSerpGenerator
+
+
+class FakeScraper:
+    """Stand-in for SearchScraper that sleeps instead of calling SerpAPI."""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on or set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.queries = []
+
+    def search(self, query, location, **kwargs):
+        with self.lock:
+            self.queries.append(query)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(random.uniform(0.01, 0.05))
+            if query in self.fail_on:
+                raise SearchScraperError(f"boom: {query}")
+            return {
+                'search_metadata': {'query': query},
+                'organic_results': [
+                    {'position': 1, 'title': query, 'link': f'https://{query.replace(" ", "-")}.com'}
+                ]
+            }
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+class SyntheticScraper(FakeScraper):
+    """FakeScraper returning full synthetic SerpAPI responses."""
+
+    def __init__(self, fail_on=None):
+        super().__init__(fail_on)
+        self.generator = SyntheticSerpGenerator(seed=7, competitor_pool=8, domain_pool=15)
+
+    def search(self, query, location, **kwargs):
+        super().search(query, location, **kwargs)
+        with self.lock:
+            return self.generator.response(query)
+
+
+def _make_lrl(max_concurrency, scraper, config=None):
+    lrl = LocalRankLens('config.json', max_concurrency=max_concurrency, config=config)
+    lrl.search_scraper = scraper
+    lrl.data_processor = DataProcessor()
+    return lrl
+
+
+def _search_all(lrl, tasks, location):
+    """Search every task the way run_analysis does, folding results into an aggregator."""
+    aggregator = ResultAggregator()
+    for index, result in lrl._iter_searches(tasks, location):
+        aggregator.add_at(index, result)
+    assert aggregator.pending == 0
+    return aggregator.aggregated()['all_results']
+
+
+def test_concurrent_results_keep_task_order():
+    """Results come back in config order regardless of completion order."""
+    tasks = [(f'keyword {i}', 'core' if i % 2 else 'upsell') for i in range(12)]
+    scraper = FakeScraper(fail_on={'keyword 5'})
+    lrl = _make_lrl(4, scraper)
+
+    results = _search_all(lrl, tasks, 'Spokane, Washington, United States')
+
+    assert [(r['keyword'], r['keyword_group']) for r in results] == tasks
+    assert results[5].get('error') is True
+    assert 'boom' in results[5]['error_message']
+    assert 1 < scraper.max_in_flight <= 4
+    print(f"✓ {len(results)} results in order with max {scraper.max_in_flight} in flight")
+
+
+def test_sequential_matches_concurrent():
+    """Sequential and concurrent modes aggregate to the same data."""
+    tasks = [(f'keyword {i}', 'core') for i in range(6)]
+    sequential = _search_all(_make_lrl(1, FakeScraper()), tasks, 'Spokane')
+    concurrent = _search_all(_make_lrl(3, FakeScraper()), tasks, 'Spokane')
+
+    processor = DataProcessor()
+    assert processor.aggregate_results(sequential)['summary'] == \
+        processor.aggregate_results(concurrent)['summary']
+    assert sequential == concurrent
+    print("✓ Sequential and concurrent runs produce identical results")
+
+
+def test_duplicate_keywords_searched_once():
+    """A keyword repeated across groups costs one search per run_analysis."""
+    config = {
+        'business_name': 'Test Irrigation',
+        'location': {'city': 'Spokane', 'state': 'WA'},
+        'keywords': {'core': ['sprinkler repair', 'drip irrigation'], 'emergency': ['sprinkler repair']},
+        'output_prefix': 'test'
+    }
+    scraper = FakeScraper()
+    lrl = _make_lrl(2, scraper, config=config)
+    generated = {}
+
+    def generate_outputs(all_results, aggregated_data):
+        generated['results'] = all_results
+        return 'report.pdf'
+
+    # Keep the fakes and skip report rendering; everything in between is the shipped path
+    lrl.initialize_components = lambda: None
+    lrl._generate_outputs = generate_outputs
+    assert lrl.run_analysis() == 'report.pdf'
+
+    assert sorted(scraper.queries) == ['drip irrigation', 'sprinkler repair']
+    assert [(r['keyword'], r['keyword_group']) for r in generated['results']] == \
+        [('sprinkler repair', 'core'), ('drip irrigation', 'core'), ('sprinkler repair', 'emergency')]
+    print("✓ Duplicate keyword across groups searched once")
+
+
+def test_streamed_aggregation_matches_full_scan():
+    """Results folded in as they complete give the same aggregates as scanning them all."""
+    tasks = [(f'keyword {i}', 'core' if i < 8 else 'upsell') for i in range(12)] + [('keyword 2', 'upsell')]
+    lrl = _make_lrl(4, SyntheticScraper(fail_on={'keyword 5'}))
+
+    aggregator = ResultAggregator()
+    for index, result in lrl._iter_searches(tasks, 'Spokane'):
+        aggregator.add_at(index, result)
+    assert aggregator.pending == 0
+    streamed = aggregator.aggregated()
+
+    results = streamed['all_results']
+    assert [(r['keyword'], r['keyword_group']) for r in results] == tasks
+    rescanned = DataProcessor().aggregate_results(list(results))
+    assert streamed['summary'] == rescanned['summary']
+    assert streamed['by_keyword_group'] == rescanned['by_keyword_group']
+    assert streamed['summary'] == {'total_keywords': 13, 'successful_searches': 12, 'failed_searches': 1}
+    assert streamed['by_keyword_group']['upsell']['keyword_count'] == 5
+
+    domains = {}
+    for result in results:
+        for organic in result['organic_results']:
+            domains[organic['domain']] = domains.get(organic['domain'], 0) + 1
+    ratings = [listing['rating'] for result in results for listing in result['maps_listings']]
+    index = streamed['competitor_index']
+    assert index.domain_counts() == domains
+    assert index.rating_stats() == {'count': len(ratings), 'average': sum(ratings) / len(ratings),
+                                    'max': max(ratings)}
+    print(f"✓ Streamed {len(results)} results into {len(domains)} domain tallies")
+
+
+def test_rate_limit_shared_across_threads():
+    """Threads sharing one scraper are spaced by rate_limit_delay."""
+    scraper = SearchScraper('test-key', rate_limit_delay=0.05)
+    stamps = []
+    lock = threading.Lock()
+
+    def worker():
+        scraper._enforce_rate_limit()
+        with lock:
+            stamps.append(time.time())
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stamps.sort()
+    gaps = [b - a for a, b in zip(stamps, stamps[1:])]
+    assert min(gaps) >= 0.04, gaps
+    print(f"✓ Minimum gap between requests: {min(gaps):.3f}s")
+
+
+def test_token_bucket_burst_then_sustained_rate():
+    """Requests within the burst don't wait; later ones follow the rate."""
+    limiter = TokenBucketRateLimiter(rate=20, capacity=3)
+    waits = [limiter.reserve() for _ in range(5)]
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert 0.04 <= waits[3] <= 0.06 and 0.09 <= waits[4] <= 0.11, waits
+    print(f"✓ Token bucket waits: {[round(w, 3) for w in waits]}")
+
+
+def _reserve_from_shared_bucket(path, count, queue):
+    limiter = SQLiteTokenBucketRateLimiter(path, rate=10, capacity=2)
+    queue.put([limiter.reserve() for _ in range(count)])
+
+
+def test_sqlite_bucket_shared_across_processes():
+    """Processes drawing from one SQLite bucket share a single budget."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = str(Path(tmp_dir) / 'limits.sqlite3')
+        queue = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=_reserve_from_shared_bucket, args=(path, 3, queue))
+            for _ in range(2)
+        ]
+        for process in processes:
+            process.start()
+        waits = sorted(w for _ in processes for w in queue.get(timeout=30))
+        for process in processes:
+            process.join()
+
+    # Six reservations against a burst of 2 at 10/s: two free, then 0.1s apart
+    assert waits[:2] == [0.0, 0.0], waits
+    assert waits[-1] >= 0.35, waits
+    print(f"✓ Shared bucket waits: {[round(w, 2) for w in waits]}")
+
+
+class _SerpStubHandler(BaseHTTPRequestHandler):
+    """Answers like SerpAPI; queries containing 'bad' get an API error."""
+
+    def do_GET(self):
+        params = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+        if 'bad' in params.get('q', ''):
+            body = {'error': 'Invalid query'}
+        else:
+            body = {'search_metadata': {'query': params.get('q')}, 'engine': params.get('engine')}
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_async_batch_search():
+    """AsyncSearchScraper keeps query order and SearchScraperError semantics."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _SerpStubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    async def run():
+        async with AsyncSearchScraper('test-key', rate_limit_delay=0.01) as scraper:
+            scraper.base_url = f"http://127.0.0.1:{server.server_address[1]}/search"
+            results = await scraper.batch_search(['one', 'bad two', 'three'], 'Spokane')
+            maps = await scraper.search_maps('four', 'Spokane')
+            try:
+                await scraper.search('bad five', 'Spokane')
+                raised = False
+            except SearchScraperError:
+                raised = True
+            return results, maps, raised
+
+    try:
+        results, maps, raised = asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    assert list(results) == ['one', 'bad two', 'three']
+    assert results['one']['search_metadata']['query'] == 'one'
+    assert 'Invalid query' in results['bad two']['error']
+    assert maps['engine'] == 'google_maps'
+    assert raised
+    print("✓ Async batch search returned ordered results and API errors")
+
+
+def main():
+    """Run all concurrency tests."""
+    tests = [
+        test_concurrent_results_keep_task_order,
+        test_sequential_matches_concurrent,
+        test_duplicate_keywords_searched_once,
+        test_streamed_aggregation_matches_full_scan,
+        test_rate_limit_shared_across_threads,
+        test_token_bucket_burst_then_sustained_rate,
+        test_sqlite_bucket_shared_across_processes,
+        test_async_batch_search
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+History store tests for LocalRankLens
+
+Records runs on different days and checks rank history, movers, share of
+voice and that every query is served from an index.
+"""
+
+import os
+import sys
+import logging
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from app_context import AppContext
+from config_manager import ConfigManager
+from history_store import HistoryStore, HistoryStoreError, RESULT_TABLES
+from replay_server import ReplayServer
+
+BUSINESS = 'Test Irrigation'
+LOCATION = 'Spokane, WA'
+
+
+def _result(keyword, domains, places):
+    return {
+        'keyword': keyword,
+        'keyword_group': 'core',
+        'maps_listings': [{'position': i + 1, 'title': place.title(), 'place_id': place, 'rating': 4.5,
+                           'reviews': 10} for i, place in enumerate(places)],
+        'organic_results': [{'position': i + 1, 'title': domain, 'link': f"https://{domain}/",
+                             'domain': domain} for i, domain in enumerate(domains)],
+        'local_services_ads': [],
+        'ads': [{'position': 1, 'title': 'Ad', 'link': 'https://ads.example/', 'domain': 'ads.example'}]
+    }
+
+
+def _timestamp(date):
+    return datetime.strptime(date, '%Y-%m-%d').replace(hour=12).timestamp()
+
+
+def _store(tmp_dir):
+    store = HistoryStore(str(Path(tmp_dir) / 'history.sqlite3'))
+    store.record_run(BUSINESS, LOCATION, [
+        _result('sprinkler repair', ['a.com', 'b.com', 'c.com'], ['p1', 'p2']),
+        _result('irrigation repair', ['b.com', 'a.com'], ['p2']),
+    ], observed_at=_timestamp('2026-01-01'))
+    store.record_run(BUSINESS, LOCATION, [
+        _result('sprinkler repair', ['c.com', 'a.com', 'd.com'], ['p2', 'p1']),
+        _result('irrigation repair', ['b.com', 'a.com'], ['p2']),
+    ], observed_at=_timestamp('2026-01-08'))
+    # Another client's data must not leak into the queries
+    store.record_run('Other Business', LOCATION, [_result('sprinkler repair', ['z.com'], ['p9'])],
+                     observed_at=_timestamp('2026-01-08'))
+    return store
+
+
+def test_rank_history_movers_and_share_of_voice():
+    """Queries return per-day positions, position changes and result-slot shares."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = _store(tmp_dir)
+        assert store.count() == 5
+        assert store.count('organic_results') == 11
+
+        history = store.rank_history(BUSINESS, LOCATION, 'sprinkler repair', competitor='c.com')
+        assert history == [{'date': '2026-01-01', 'competitor': 'c.com', 'position': 3},
+                           {'date': '2026-01-08', 'competitor': 'c.com', 'position': 1}]
+        maps = store.rank_history(BUSINESS, LOCATION, 'sprinkler repair', kind='maps_listings',
+                                  since='2026-01-05')
+        assert [(row['competitor'], row['position']) for row in maps] == [('p2', 1), ('p1', 2)]
+
+        moves = store.movers(BUSINESS, LOCATION)
+        assert (moves['start_date'], moves['end_date']) == ('2026-01-01', '2026-01-08')
+        changes = {(row['keyword'], row['competitor']): (row['status'], row['change']) for row in moves['movers']}
+        assert changes == {
+            ('sprinkler repair', 'c.com'): ('up', 2),
+            ('sprinkler repair', 'a.com'): ('down', -1),
+            ('sprinkler repair', 'd.com'): ('new', None),
+            ('sprinkler repair', 'b.com'): ('dropped', None),
+        }
+        assert moves['movers'][0]['competitor'] == 'c.com'
+
+        share = store.share_of_voice(BUSINESS, LOCATION, limit=2)
+        assert [day['date'] for day in share] == ['2026-01-01', '2026-01-08']
+        assert share[0]['total'] == 5
+        assert share[0]['competitors'][0] == {'competitor': 'a.com', 'appearances': 2, 'share': 0.4}
+        assert len(share[1]['competitors']) == 2
+
+        try:
+            store.rank_history(BUSINESS, LOCATION, 'sprinkler repair', kind='knowledge_graph')
+            raise AssertionError("Expected a HistoryStoreError")
+        except HistoryStoreError:
+            pass
+        store.close()
+    print("✓ Rank history, movers and share of voice")
+
+
+def test_same_day_runs_count_latest_observation():
+    """A keyword searched twice in a day counts once, with its latest successful result."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = _store(tmp_dir)
+        # An incremental re-run later the same day re-searches one keyword only
+        store.record_run(BUSINESS, LOCATION, [_result('sprinkler repair', ['e.com', 'a.com'], ['p3'])],
+                         observed_at=_timestamp('2026-01-08') + 3600)
+        failed = dict(_result('irrigation repair', [], []), error=True)
+        store.record_run(BUSINESS, LOCATION, [failed], observed_at=_timestamp('2026-01-08') + 7200)
+
+        day = store.share_of_voice(BUSINESS, LOCATION, since='2026-01-08', limit=None)[0]
+        counts = {row['competitor']: row['appearances'] for row in day['competitors']}
+        assert day['total'] == 4
+        assert counts == {'a.com': 2, 'b.com': 1, 'e.com': 1}
+
+        history = store.rank_history(BUSINESS, LOCATION, 'sprinkler repair', since='2026-01-08')
+        assert [(row['competitor'], row['position']) for row in history] == [('e.com', 1), ('a.com', 2)]
+
+        moves = store.movers(BUSINESS, LOCATION)
+        changes = {(row['keyword'], row['competitor']): row['status'] for row in moves['movers']}
+        assert changes[('sprinkler repair', 'e.com')] == 'new'
+        assert ('sprinkler repair', 'c.com') in changes and changes[('sprinkler repair', 'c.com')] == 'dropped'
+        store.close()
+    print("✓ Same-day runs count each keyword's latest observation once")
+
+
+def test_queries_use_indexes():
+    """No query API scans a whole result table."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = _store(tmp_dir)
+        conn = store._connect()
+        statements = []
+        conn.set_trace_callback(statements.append)
+        for kind in RESULT_TABLES:
+            store.rank_history(BUSINESS, LOCATION, 'sprinkler repair', kind=kind)
+            store.rank_history(BUSINESS, LOCATION, 'sprinkler repair', competitor='a.com', kind=kind)
+            store.movers(BUSINESS, LOCATION, kind=kind)
+            store.share_of_voice(BUSINESS, LOCATION, kind=kind, since='2026-01-01')
+        conn.set_trace_callback(None)
+
+        selects = [sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]
+        assert len(selects) >= len(RESULT_TABLES) * 5
+        for sql in selects:
+            plan = ' '.join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+            assert 'COVERING INDEX' in plan, (sql, plan)
+        store.close()
+    print(f"✓ {len(selects)} history queries served from covering indexes")
+
+
+def test_incremental_run_searches_only_missing_keywords():
+    """Incremental runs reuse fresh stored results and search new or stale keywords only."""
+    env = {'SERPAPI_KEY': 'test-key', 'RATE_LIMIT_DELAY': '0', 'SERP_CACHE_PATH': '',
+           'TEMPLATE_CACHE_DIR': '', 'METRICS_DIR': '', 'HISTORY_INCREMENTAL': 'true'}
+    saved = {name: os.environ.get(name) for name in list(env) + ['SERPAPI_BASE_URL', 'OUTPUT_DIR', 'HISTORY_DB']}
+
+    def config(keywords, **extra):
+        return dict({'business_name': BUSINESS, 'location': {'city': 'Spokane', 'state': 'WA'},
+                     'keywords': {'core': keywords}, 'output_prefix': 'incremental'}, **extra)
+
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            ReplayServer(fallback_path='debug_raw_response.json') as server:
+        os.environ.update(env, SERPAPI_BASE_URL=server.base_url, OUTPUT_DIR=tmp_dir,
+                          HISTORY_DB=str(Path(tmp_dir) / 'history.sqlite3'))
+        try:
+            context = AppContext(env_path='missing.env')
+            context.create_analysis(config(['sprinkler repair', 'irrigation repair']), 'html').run_analysis()
+            assert server.stats['requests'] == 1 + 2
+
+            events = []
+            analysis = context.create_analysis(
+                config(['sprinkler repair', 'irrigation repair', 'sprinkler blowout']), 'html'
+            )
+            report_path = analysis.run_analysis(progress_callback=events.append)
+            assert server.stats['requests'] == 1 + 2 + 1
+            assert sum(1 for event in events if event.get('reused')) == 2
+            assert context.history_store.count() == 3
+            assert 'sprinkler blowout' in Path(report_path).read_text(encoding='utf-8')
+
+            # Everything is stale with a zero freshness window
+            analysis = context.create_analysis(
+                config(['sprinkler repair', 'sprinkler blowout'], history_settings={'max_age_hours': 0}), 'html'
+            )
+            messages = []
+            handler = logging.Handler(logging.INFO)
+            handler.emit = lambda record: messages.append(record.getMessage())
+            level = analysis.logger.level
+            analysis.logger.addHandler(handler)
+            analysis.logger.setLevel(logging.INFO)
+            try:
+                analysis.run_analysis()
+            finally:
+                analysis.logger.removeHandler(handler)
+                analysis.logger.setLevel(level)
+            assert server.stats['requests'] == 1 + 2 + 1 + 2
+            # The previous run searched only 'sprinkler blowout', yet 'irrigation repair' was dropped
+            assert any('1 stored keywords no longer configured' in message for message in messages)
+            assert context.history_store.count() == 5
+
+            # Results extracted at a lower depth than now configured are stale too
+            deeper = config(['sprinkler repair'], report_settings={'max_organic_results': 8})
+            context.create_analysis(deeper, 'html').run_analysis()
+            assert server.stats['requests'] == 1 + 2 + 1 + 2 + 1
+            context.create_analysis(deeper, 'html').run_analysis()
+            assert server.stats['requests'] == 1 + 2 + 1 + 2 + 1
+            context.close()
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+    print("✓ Incremental runs search only new or stale keywords")
+
+
+def test_incremental_setting_parses_strings():
+    """String flags in history settings are parsed like the environment variable."""
+    saved = os.environ.pop('HISTORY_INCREMENTAL', None)
+    try:
+        for value, expected in (('false', False), ('0', False), ('no', False), ('true', True), ('1', True),
+                                (True, True), (False, False)):
+            config = {'history_settings': {'path': 'history.sqlite3', 'incremental': value}}
+            settings = ConfigManager(config=config, load_env=False, validate=False).get_history_settings()
+            assert settings['incremental'] is expected, value
+    finally:
+        if saved is not None:
+            os.environ['HISTORY_INCREMENTAL'] = saved
+    print("✓ Incremental setting parses string flags")
+
+
+def main():
+    """Run all history store tests."""
+    tests = [
+        test_rank_history_movers_and_share_of_voice,
+        test_same_day_runs_count_latest_observation,
+        test_queries_use_indexes,
+        test_incremental_run_searches_only_missing_keywords,
+        test_incremental_setting_parses_strings
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Job queue tests for LocalRankLens
+
+Tests the SQLite-backed job store, the background worker pool and the
+analysis progress callback without making actual API calls.
+"""
+
+import sys
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from job_queue import JobStore, JobQueue, COMPLETED, FAILED, QUEUED, RUNNING
+from data_processor import DataProcessor
+from localranklens import LocalRankLens
+
+
+class FakeScraper:
+    """Stand-in for SearchScraper returning one organic result per query."""
+
+    def search(self, query, location, **kwargs):
+        return {'organic_results': [{'position': 1, 'title': query, 'link': 'https://example.com'}]}
+
+
+def _store(tmp_dir):
+    return JobStore(str(Path(tmp_dir) / 'jobs.sqlite3'))
+
+
+def test_jobs_are_claimed_once():
+    """Concurrent workers never claim the same job twice."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = _store(tmp_dir)
+        job_ids = {store.create({'n': i}) for i in range(20)}
+        claimed = []
+        lock = threading.Lock()
+
+        def worker():
+            while True:
+                job = store.claim_next()
+                if job is None:
+                    return
+                with lock:
+                    claimed.append(job['id'])
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(claimed) == sorted(job_ids)
+        assert store.count(QUEUED) == 0
+        print(f"✓ {len(claimed)} jobs claimed exactly once by 4 workers")
+
+
+def test_worker_pool_runs_jobs_with_progress():
+    """Jobs run in the background, log progress events and record failures."""
+    def runner(job_id, payload, progress):
+        if payload.get('fail'):
+            raise RuntimeError('boom')
+        progress({'type': 'started', 'total': payload['keywords']})
+        for done in range(1, payload['keywords'] + 1):
+            progress({'type': 'keyword', 'done': done, 'total': payload['keywords']})
+        # Terminal events from the runner are ignored; the queue adds its own
+        progress({'type': 'completed', 'report_path': 'ignored'})
+        return f"output/{job_id}.pdf"
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        queue = JobQueue(_store(tmp_dir), runner, workers=2, poll_interval=0.05).start()
+        try:
+            ok_id = queue.submit({'keywords': 7})
+            failed_id = queue.submit({'fail': True})
+            ok = queue.wait(ok_id, timeout=5)
+            failed = queue.wait(failed_id, timeout=5)
+        finally:
+            queue.stop()
+
+        assert ok['status'] == COMPLETED and ok['report_path'] == f"output/{ok_id}.pdf"
+        assert (ok['progress_done'], ok['progress_total']) == (7, 7)
+        assert failed['status'] == FAILED and failed['error'] == 'boom'
+
+        events = [event for _, event in queue.store.get_events(ok_id)]
+        assert [event['type'] for event in events] == ['started'] + ['keyword'] * 7 + ['completed']
+        assert events[-1]['report_path'] == ok['report_path']
+        assert queue.store.get_events(ok_id, after=8) == [(9, events[-1])]
+        assert queue.store.get_events(failed_id)[-1][1] == {'type': 'failed', 'error': 'boom'}
+        print(f"✓ Job completed with progress {ok['progress_done']}/{ok['progress_total']}")
+
+
+class FlakyStore(JobStore):
+    """JobStore whose first completion write fails, and whose second job's completion always fails."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.complete_calls = 0
+
+    def complete(self, job_id, report_path):
+        self.complete_calls += 1
+        if self.complete_calls == 1:
+            raise sqlite3.OperationalError('database is locked')
+        if self.get(job_id)['payload'].get('broken'):
+            raise RuntimeError('unexpected')
+        super().complete(job_id, report_path)
+
+
+def test_worker_survives_store_errors():
+    """Locked-database errors when finishing a job are retried, and no error stops the worker."""
+    def runner(job_id, payload, progress):
+        return f"output/{job_id}.pdf"
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = FlakyStore(str(Path(tmp_dir) / 'jobs.sqlite3'))
+        queue = JobQueue(store, runner, workers=1, poll_interval=0.01).start()
+        try:
+            retried = queue.wait(queue.submit({}), timeout=5)
+            broken_id = queue.submit({'broken': True})
+            after = queue.wait(queue.submit({}), timeout=5)
+        finally:
+            queue.stop()
+
+        assert retried['status'] == COMPLETED
+        assert store.get_events(retried['id'])[-1][1]['type'] == 'completed'
+        # The unexpected error left its job running, but the worker went on to the next one
+        assert store.get(broken_id)['status'] == RUNNING
+        assert after['status'] == COMPLETED
+        print("✓ Workers retry finishing jobs and survive unexpected errors")
+
+
+def test_run_progress_callback():
+    """run_analysis progress events count every keyword/group task."""
+    lrl = LocalRankLens('config.json', max_concurrency=3)
+    lrl.search_scraper = FakeScraper()
+    lrl.data_processor = DataProcessor()
+    events = []
+    lrl.progress_callback = events.append
+
+    tasks = [(f'keyword {i}', 'core') for i in range(5)] + [('keyword 0', 'upsell')]
+    lrl._start_progress(len(tasks))
+    list(lrl._iter_searches(tasks, 'Spokane, Washington, United States'))
+
+    assert events[0] == {'type': 'started', 'total': 6}
+    keyword_events = [e for e in events if e['type'] == 'keyword']
+    assert sorted(e['done'] for e in keyword_events) == list(range(1, 7))
+    assert all(e['total'] == 6 and e['success'] for e in keyword_events)
+    assert keyword_events[0]['competitors']['organic_results'][0]['domain'] == 'example.com'
+
+    # Processing failures are flagged with 'error' and no error message
+    lrl._report_keyword_progress([lrl.data_processor._create_empty_result('broken keyword', 'core')])
+    assert events[-1]['keyword'] == 'broken keyword' and events[-1]['success'] is False
+    print(f"✓ {len(keyword_events)} keyword progress events")
+
+
+def main():
+    """Run all job queue tests."""
+    tests = [
+        test_jobs_are_claimed_once,
+        test_worker_pool_runs_jobs_with_progress,
+        test_worker_survives_store_errors,
+        test_run_progress_callback
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Metrics tests for LocalRankLens
+
+Tests the in-memory registry, Prometheus export, run-scoped sinks and the
+pipeline instrumentation without making actual API calls.
+"""
+
+import sys
+import json
+import tempfile
+import threading
+import contextvars
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from metrics import Metrics, MetricsRegistry
+from search_scraper import SearchScraper
+from data_processor import DataProcessor
+import metrics as metrics_module
+from serp_fakes import FakeSession
+
+
+def test_registry_and_prometheus_export():
+    """Counters and histograms are recorded and exported."""
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    metrics = Metrics([registry])
+
+    metrics.increment('cache_lookups_total', result='hit')
+    metrics.increment('cache_lookups_total', result='hit')
+    metrics.observe('search_seconds', 0.05, kind='search')
+    metrics.observe('search_seconds', 0.5, kind='search')
+    metrics.observe('search_seconds', 5.0, kind='search')
+
+    snapshot = registry.snapshot()
+    assert snapshot['counters']['cache_lookups_total'][0]['value'] == 2
+    histogram = snapshot['histograms']['search_seconds'][0]
+    assert histogram['count'] == 3 and histogram['max'] == 5.0
+    assert histogram['buckets'] == {'0.1': 1, '1.0': 1}
+
+    text = registry.render_prometheus()
+    assert 'localranklens_cache_lookups_total{result="hit"} 2' in text
+    assert 'localranklens_search_seconds_bucket{kind="search",le="1.0"} 2' in text
+    assert 'localranklens_search_seconds_bucket{kind="search",le="+Inf"} 3' in text
+    assert 'localranklens_search_seconds_count{kind="search"} 3' in text
+    print("✓ Registry snapshot and Prometheus export are consistent")
+
+
+def test_run_scope_isolated_between_threads():
+    """Run-scoped sinks only see observations from their own context."""
+    metrics = Metrics([MetricsRegistry()])
+    runs = {}
+
+    def run(name, count):
+        with metrics.run_scope() as run_metrics:
+            # Observations from a worker thread started in a copied context
+            ctx = contextvars.copy_context()
+            worker = threading.Thread(target=ctx.run, args=(metrics.increment, 'units', count))
+            worker.start()
+            worker.join()
+            runs[name] = run_metrics.snapshot()['counters']['units'][0]['value']
+
+    threads = [threading.Thread(target=run, args=(name, n)) for name, n in (('a', 2), ('b', 5))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert runs == {'a': 2, 'b': 5}
+    assert metrics.sinks[0].snapshot()['counters']['units'][0]['value'] == 7
+    print(f"✓ Run-scoped metrics stay separate: {runs}")
+
+
+def test_pipeline_instrumentation():
+    """Searches, rate limiting and processing are timed; run dumps are JSON."""
+    with metrics_module.metrics.run_scope() as run_metrics:
+        scraper = SearchScraper('test-key', rate_limit_delay=0)
+        scraper.session = FakeSession(lambda params: {'search_metadata': {'query': params['q']},
+                                                      'organic_results': []})
+        response = scraper.search('sprinkler repair', 'Spokane')
+        DataProcessor().process_search_results(response, 'sprinkler repair', 'core')
+
+    histograms = run_metrics.snapshot()['histograms']
+    for name in ('search_seconds', 'serpapi_request_seconds', 'json_parse_seconds',
+                 'rate_limit_wait_seconds', 'process_search_results_seconds'):
+        assert histograms[name][0]['count'] == 1, name
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = run_metrics.dump_json(str(Path(tmp_dir) / 'run.json'), extra={'business_name': 'Test'})
+        with open(path) as f:
+            dumped = json.load(f)
+    assert dumped['business_name'] == 'Test'
+    assert 'search_seconds' in dumped['histograms']
+    print(f"✓ Instrumented stages: {sorted(histograms)}")
+
+
+def main():
+    """Run all metrics tests."""
+    tests = [
+        test_registry_and_prometheus_export,
+        test_run_scope_isolated_between_threads,
+        test_pipeline_instrumentation
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
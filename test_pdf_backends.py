@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+PDF backend tests for LocalRankLens
+
+Builds reports with the direct reportlab engine and checks engine
+selection on the report writer and in the performance settings.
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from reportlab.platypus import Paragraph
+from config_manager import ConfigManager, ConfigurationError
+from pdf_backends import ReportLabBackend, XHTML2PDFBackend
+from report_writer import ReportWriter, ReportWriterError
+
+
+def _story_text(flowables) -> str:
+    """Text of every paragraph in a story, including tables and lists."""
+    parts = []
+    for flowable in flowables:
+        if isinstance(flowable, Paragraph):
+            parts.append(flowable.text)
+        elif isinstance(flowable, (list, tuple)):
+            parts.append(_story_text(flowable))
+        elif hasattr(flowable, '_cellvalues'):
+            parts.extend(_story_text(row) for row in flowable._cellvalues)
+        elif hasattr(flowable, '_flowables'):
+            parts.append(_story_text(flowable._flowables))
+        elif hasattr(flowable, '_content'):
+            parts.append(_story_text(flowable._content))
+    return '\n'.join(parts)
+
+
+def test_reportlab_builds_report_sections():
+    """The reportlab engine writes a PDF with every section, straight from template data."""
+    with open('debug_aggregated_data.json', 'r', encoding='utf-8') as f:
+        aggregated = json.load(f)
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        writer = ReportWriter(template_dir="templates", output_dir=output_dir, pdf_backend='reportlab')
+        assert isinstance(writer.pdf_backend, ReportLabBackend)
+
+        report_path = writer.generate_report(aggregated, 'Smith & Sons <Irrigation>', 'Spokane, WA',
+                                             'reportlab-test', format='pdf')
+        assert report_path.endswith('.pdf')
+        assert Path(report_path).read_bytes().startswith(b'%PDF')
+
+        template_data = writer._prepare_template_data(aggregated, 'Smith & Sons', 'Spokane, WA',
+                                                      max_maps_results=4, max_organic_results=20)
+        text = _story_text(writer.pdf_backend.build_story(template_data))
+        html = writer._render_template(template_data)
+
+    # Paragraph text is reportlab markup, so '&' appears escaped
+    for section in ('Executive Summary', 'Competitive Landscape Analysis', 'SEO Action Plan &amp; Recommendations',
+                    'Google My Business Strategy', 'Business Development Insights'):
+        assert section in text, section
+    for group_name, group_data in aggregated['by_keyword_group'].items():
+        assert f"{group_name.title()} Keywords ({group_data['keyword_count']} keywords)" in text
+        for result in group_data['results']:
+            for listing in result.get('maps_listings', []):
+                assert listing['title'].replace('&', '&amp;') in text
+    # Headings show the configured result depth
+    for rendered in (text, html):
+        assert 'Google Maps Listings (Top 4)' in rendered and 'Organic Search Results (Top 20)' in rendered
+        assert 'top 4)' in rendered and 'top 20)' in rendered
+        assert 'top 3)' not in rendered and 'top 5)' not in rendered
+    print("✓ reportlab report contains every section")
+
+
+def test_engine_selection():
+    """Engines are chosen by name; unknown names are rejected."""
+    with tempfile.TemporaryDirectory() as output_dir:
+        assert isinstance(ReportWriter(output_dir=output_dir).pdf_backend, XHTML2PDFBackend)
+        try:
+            ReportWriter(output_dir=output_dir, pdf_backend='wkhtmltopdf')
+            raise AssertionError("Expected a ReportWriterError")
+        except ReportWriterError:
+            pass
+
+    settings = ConfigManager(config={'performance_settings': {'pdf_engine': 'reportlab'}},
+                             load_env=False, validate=False).get_performance_settings()
+    assert settings['pdf_engine'] == 'reportlab'
+    try:
+        ConfigManager(config={'performance_settings': {'pdf_engine': 'weasyprint'}},
+                      load_env=False, validate=False).get_performance_settings()
+        raise AssertionError("Expected a ConfigurationError")
+    except ConfigurationError:
+        pass
+    print("✓ PDF engine selection and validation")
+
+
+def main():
+    """Run all PDF backend tests."""
+    tests = [
+        test_reportlab_builds_report_sections,
+        test_engine_selection
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+PDF render pool tests for LocalRankLens
+
+Renders small documents in worker processes and checks backpressure and
+report filename reservation.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from pdf_renderer import PDFRenderPool, PDFRenderQueueFull
+from report_writer import ReportWriter
+
+HTML = "<html><body><h1>Report</h1><p>Competitor table</p></body></html>"
+
+
+def test_pool_renders_with_backpressure():
+    """Renders run in worker processes; a full queue rejects non-blocking submits."""
+    pool = PDFRenderPool(workers=1, max_pending=1)
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            first = str(Path(tmp_dir) / 'first.pdf')
+            future = pool.submit(HTML, first)
+            try:
+                pool.submit(HTML, str(Path(tmp_dir) / 'second.pdf'), block=False)
+                raise AssertionError("Expected PDFRenderQueueFull")
+            except PDFRenderQueueFull:
+                pass
+
+            assert future.result(timeout=60) == first
+            assert Path(first).read_bytes().startswith(b'%PDF')
+
+            second = pool.render(HTML, str(Path(tmp_dir) / 'second.pdf'), timeout=60)
+            assert Path(second).read_bytes().startswith(b'%PDF')
+    finally:
+        pool.shutdown()
+    print("✓ Pool rendered PDFs and applied backpressure")
+
+
+def test_report_filenames_are_reserved():
+    """Reports with the same prefix in the same second get distinct names."""
+    with tempfile.TemporaryDirectory() as output_dir:
+        writer = ReportWriter(template_dir="templates", output_dir=output_dir)
+        names = [writer._generate_filename('acme', 'pdf') for _ in range(3)]
+
+    assert len(set(names)) == 3
+    assert all(name.endswith('.pdf') for name in names)
+    print(f"✓ Reserved distinct filenames: {names}")
+
+
+def test_failed_render_removes_reserved_file():
+    """A report that fails to render leaves no empty file in the output directory."""
+    class FailingBackend:
+        name = 'failing'
+        available = True
+        needs_html = False
+
+        def render(self, dest_path, template_data, html_content=None):
+            raise RuntimeError("render failed")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        writer = ReportWriter(template_dir="templates", output_dir=output_dir)
+        writer.pdf_backend = FailingBackend()
+        try:
+            writer._generate_pdf_report({}, 'acme')
+            raise AssertionError("Expected the render to fail")
+        except RuntimeError:
+            pass
+        assert list(Path(output_dir).iterdir()) == []
+    print("✓ Failed render removed its reserved file")
+
+
+def main():
+    """Run all PDF render pool tests."""
+    tests = [
+        test_pool_renders_with_backpressure,
+        test_report_filenames_are_reserved,
+        test_failed_render_removes_reserved_file
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Record type tests for LocalRankLens
+
+Checks that the slotted records DataProcessor returns read like the dicts
+they replace, stay read-only and survive pickling and JSON.
+"""
+
+import sys
+import json
+import pickle
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from data_processor import DataProcessor
+from records import MapsListing, OrganicResult, KnowledgeGraph, json_default
+
+
+def _processed():
+    with open('debug_raw_response.json', 'r', encoding='utf-8') as f:
+        response = json.load(f)
+    response['knowledge_graph'] = {'title': 'Test Irrigation', 'rating': 4.8}
+    return DataProcessor().process_search_results(response, 'sprinkler repair', 'core')
+
+
+def test_records_read_like_dicts():
+    """Records expose the old keys, in the old order, through item, get and attribute access."""
+    processed = _processed()
+    listing = processed['maps_listings'][0]
+    assert isinstance(listing, MapsListing)
+    assert list(listing)[:4] == ['position', 'title', 'business_name', 'rating']
+    assert listing['business_name'] == listing.title == listing.get('title')
+    assert listing.get('missing', 'default') == 'default' and 'missing' not in listing
+
+    organic = processed['organic_results'][0]
+    assert isinstance(organic, OrganicResult)
+    assert organic['domain'] and organic['domain'] in organic['link']
+    assert dict(organic) == organic.as_dict()
+
+    knowledge_graph = processed['knowledge_graph']
+    assert isinstance(knowledge_graph, KnowledgeGraph)
+    assert knowledge_graph.as_dict()['hours'] == {} and not knowledge_graph['hours']
+
+    try:
+        listing.title = 'Changed'
+        raise AssertionError("Expected records to be read-only")
+    except AttributeError:
+        pass
+    print(f"✓ {len(processed['maps_listings'])} listings and {len(processed['organic_results'])} "
+          f"organic results read like dicts")
+
+
+def test_records_share_strings_and_serialize():
+    """Repeated names are interned; records pickle and dump to JSON as plain dicts."""
+    first, second = _processed(), _processed()
+    assert first['organic_results'][0]['domain'] is second['organic_results'][0]['domain']
+    assert first['maps_listings'][0].title is second['maps_listings'][0].title
+    assert not hasattr(first['maps_listings'][0], '__dict__')
+
+    restored = pickle.loads(pickle.dumps(first))
+    assert restored == first
+    assert restored['knowledge_graph'].as_dict()['hours'] == {}
+
+    dumped = json.loads(json.dumps(first, default=json_default))
+    assert dumped['maps_listings'][0] == first['maps_listings'][0].as_dict()
+    assert dumped['organic_results'][0]['sitelinks'] == first['organic_results'][0].as_dict()['sitelinks']
+    print("✓ Records intern names, pickle and serialize to JSON")
+
+
+def main():
+    """Run all record tests."""
+    tests = [
+        test_records_read_like_dicts,
+        test_records_share_strings_and_serialize
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Record/replay tests for LocalRankLens
+
+Records responses through SearchScraper and serves them back from the local
+replay server without making actual API calls.
+"""
+
+import sys
+import json
+import tempfile
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from replay_server import ReplayServer, FixtureStore
+from search_scraper import SearchScraper, SearchScraperError
+from serp_fakes import FakeSession
+
+
+def test_record_then_replay():
+    """Recorded fixtures are served back for the same request."""
+    with tempfile.TemporaryDirectory() as fixture_dir:
+        recorder = SearchScraper('real-key', rate_limit_delay=0, record_dir=fixture_dir)
+        recorder.session = FakeSession(lambda params: {'search_metadata': {'query': params['q']},
+                                                       'engine': params['engine']})
+        recorded = recorder.search('sprinkler repair', 'Spokane')
+        recorder.search_maps('sprinkler repair', 'Spokane')
+        assert FixtureStore(fixture_dir).count() == 2
+
+        with ReplayServer(fixture_dir, strict=True) as server:
+            scraper = SearchScraper('other-key', rate_limit_delay=0, base_url=server.base_url)
+            assert scraper.search('sprinkler repair', 'Spokane') == recorded
+            assert scraper.search_maps('sprinkler repair', 'Spokane')['engine'] == 'google_maps'
+
+            try:
+                scraper.search('never recorded', 'Spokane')
+                raise AssertionError("Expected a SearchScraperError")
+            except SearchScraperError:
+                pass
+
+            assert server.stats['fixture_hits'] == 2
+            assert server.stats['misses'] == 1
+        print(f"✓ Replayed recorded fixtures: {server.stats}")
+
+
+def test_fallback_and_fault_injection():
+    """Unmatched requests get the fallback; injected errors are counted."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fallback_path = f"{tmp_dir}/fallback.json"
+        with open(fallback_path, 'w') as f:
+            json.dump({'organic_results': [{'position': 1, 'title': 'Fallback'}]}, f)
+
+        with ReplayServer(fallback_path=fallback_path, error_rate=0.5, seed=7) as server:
+            statuses = [server.respond({'q': str(i)})[0] for i in range(40)]
+
+        assert statuses.count(500) == server.stats['errors_injected'] > 0
+        assert statuses.count(200) == server.stats['fallbacks'] > 0
+        print(f"✓ Fault injection: {server.stats}")
+
+
+def main():
+    """Run all record/replay tests."""
+    tests = [
+        test_record_then_replay,
+        test_fallback_and_fault_injection
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Report template tests for LocalRankLens
+
+Tests the shared Jinja environment, the persistent bytecode cache and
+template precompilation.
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from jinja2 import Environment, FileSystemLoader
+from report_writer import ReportWriter, get_template_environment, precompile_templates
+
+
+def test_writers_share_environment():
+    """Every ReportWriter in the process reuses one compiled environment."""
+    with tempfile.TemporaryDirectory() as output_dir:
+        first = ReportWriter(template_dir="templates", output_dir=output_dir)
+        second = ReportWriter(template_dir="./templates", output_dir=output_dir)
+
+    assert first.jinja_env is second.jinja_env is get_template_environment("templates")
+    template = first.jinja_env.get_template('report_template.html')
+    assert second.jinja_env.get_template('report_template.html') is template
+    print("✓ Writers share one environment and compiled template")
+
+
+def test_bytecode_cache_and_precompile():
+    """Precompiling persists bytecode and renders identically to a fresh environment."""
+    with open('debug_aggregated_data.json', 'r', encoding='utf-8') as f:
+        aggregated = json.load(f)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache_dir = str(Path(tmp_dir) / 'bytecode')
+        assert precompile_templates("templates", cache_dir) >= 1
+        assert list(Path(cache_dir).glob('__jinja2_*.cache'))
+
+        writer = ReportWriter(template_dir="templates", output_dir=tmp_dir, bytecode_cache_dir=cache_dir)
+        template_data = writer._prepare_template_data(aggregated, 'Test Business', 'Spokane, WA')
+        rendered = writer._render_template(template_data)
+
+    fresh = Environment(loader=FileSystemLoader('templates'), autoescape=True)
+    assert rendered == fresh.get_template('report_template.html').render(**template_data)
+    print("✓ Bytecode cache written and rendering unchanged")
+
+
+def main():
+    """Run all report template tests."""
+    tests = [
+        test_writers_share_environment,
+        test_bytecode_cache_and_precompile
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Bulk reprocessing tests for LocalRankLens
+
+Archives raw responses, stores older processed results for some of the same
+days and checks that reprocessing through a process pool replaces exactly
+those results with freshly processed ones.
+"""
+
+import sys
+import json
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from data_processor import DataProcessor
+from history_store import HistoryStore
+from response_archive import ResponseArchive
+from reprocess import Reprocessor, main as reprocess_main
+
+BUSINESS = 'Test Irrigation'
+LOCATION = 'Spokane, Washington, United States'
+KEYWORD_GROUPS = {'sprinkler repair': 'core', 'irrigation repair': 'core', 'smart sprinkler': 'upsell'}
+
+
+def _timestamp(date):
+    return datetime.strptime(date, '%Y-%m-%d').replace(hour=12).timestamp()
+
+
+def _raw_response(day):
+    with open('debug_raw_response.json', 'r', encoding='utf-8') as f:
+        response = json.load(f)
+    # Vary the results per day so replaced rows are distinguishable
+    response['organic_results'] = response['organic_results'][day:] + response['organic_results'][:day]
+    return response
+
+
+def _fill(tmp_dir):
+    archive = ResponseArchive(str(Path(tmp_dir) / 'responses.lra'))
+    for day, date in enumerate(['2026-03-01', '2026-03-02', '2026-03-03']):
+        for keyword in KEYWORD_GROUPS:
+            archive.append({'engine': 'google', 'q': keyword, 'location': LOCATION}, _raw_response(day),
+                           timestamp=_timestamp(date) + len(keyword))
+    # Neither is reprocessed: another engine and another location
+    archive.append({'engine': 'google_maps', 'q': 'sprinkler repair', 'location': LOCATION}, {'local_results': []},
+                   timestamp=_timestamp('2026-03-01'))
+    archive.append({'engine': 'google', 'q': 'sprinkler repair', 'location': 'Boise, Idaho, United States'},
+                   _raw_response(0), timestamp=_timestamp('2026-03-01'))
+    archive.close()
+
+    store = HistoryStore(str(Path(tmp_dir) / 'history.sqlite3'))
+    stale = {'keyword': 'sprinkler repair', 'keyword_group': 'core', 'maps_listings': [],
+             'local_services_ads': [], 'organic_results': [], 'ads': []}
+    store.record_run(BUSINESS, LOCATION, [stale, dict(stale, keyword='irrigation repair')],
+                     observed_at=_timestamp('2026-03-02'))
+    # Not in the archive, so it must survive
+    store.record_run(BUSINESS, LOCATION, [dict(stale, keyword='sprinkler repair')],
+                     observed_at=_timestamp('2026-03-05'))
+    return store
+
+
+def test_reprocess_replaces_archived_days():
+    """Pool reprocessing replaces stored results for archived days only, one run per day."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = _fill(tmp_dir)
+        reprocessor = Reprocessor(str(Path(tmp_dir) / 'responses.lra'), store, workers=2, chunk_size=2)
+        stats = reprocessor.run(BUSINESS, LOCATION, KEYWORD_GROUPS)
+
+        assert (stats['responses'], stats['days'], stats['replaced']) == (9, 3, 2)
+        assert stats['responses_per_second'] > 0
+        assert store.count() == 10
+        runs = store._connect().execute(
+            "SELECT observed_date, keywords FROM runs ORDER BY observed_date").fetchall()
+        assert [(row['observed_date'], row['keywords']) for row in runs] == \
+            [('2026-03-01', 3), ('2026-03-02', 3), ('2026-03-03', 3), ('2026-03-05', 1)]
+
+        expected = DataProcessor().process_search_results(_raw_response(2), 'smart sprinkler', 'upsell')
+        stored = store.latest_results(BUSINESS, LOCATION, ['smart sprinkler'])['smart sprinkler']['result']
+        assert stored['organic_results'][0]['domain'] == expected['organic_results'][0]['domain']
+        assert stored['keyword_group'] == 'upsell'
+
+        history = store.rank_history(BUSINESS, LOCATION, 'sprinkler repair')
+        assert {row['date'] for row in history} == {'2026-03-01', '2026-03-02', '2026-03-03'}
+        store.close()
+        print(f"✓ Reprocessed {stats['responses']} responses with {stats['workers']} workers "
+              f"({stats['responses_per_second']:.0f} responses/sec)")
+
+
+def test_reprocess_command():
+    """The command reads the business and keywords from a config and keeps stored groups."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        _fill(tmp_dir).close()
+        config_path = Path(tmp_dir) / 'config.json'
+        config_path.write_text(json.dumps({
+            'business_name': BUSINESS,
+            'location': {'city': 'Spokane', 'state': 'WA'},
+            'keywords': {'core': ['sprinkler repair']},
+            'output_prefix': 'test'
+        }))
+
+        code = reprocess_main(['--config', str(config_path), '--archive', str(Path(tmp_dir) / 'responses.lra'),
+                               '--history', str(Path(tmp_dir) / 'history.sqlite3'), '--workers', '0',
+                               '--since', '2026-03-02', '--until', '2026-03-02'])
+        assert code == 0
+
+        store = HistoryStore(str(Path(tmp_dir) / 'history.sqlite3'))
+        # 'irrigation repair' is no longer configured but was stored, so it is reprocessed too
+        rows = store._connect().execute(
+            "SELECT keyword, keyword_group, result FROM observations WHERE observed_date = '2026-03-02'"
+        ).fetchall()
+        assert sorted(row['keyword'] for row in rows) == ['irrigation repair', 'sprinkler repair']
+        assert all(json.loads(row['result'])['organic_results'] for row in rows)
+        store.close()
+        print("✓ Reprocessing command rebuilt one day from the archive")
+
+
+def test_reprocess_merges_deeper_pages():
+    """Deeper archived pages are merged into their first page instead of being dropped."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = str(Path(tmp_dir) / 'responses.lra')
+        archive = ResponseArchive(path)
+        observed_at = _timestamp('2026-03-01')
+        params = {'engine': 'google', 'q': 'sprinkler repair', 'location': LOCATION}
+        first, second = _raw_response(0), _raw_response(3)
+        second['organic_results'] = [dict(entry, link=entry['link'].replace('://', '://page2.'))
+                                     for entry in second['organic_results']]
+        archive.append(dict(params, start=0), first, timestamp=observed_at)
+        archive.append(dict(params, start=10), second, timestamp=observed_at + 1)
+        # The next day's search must not borrow this day's second page
+        archive.append(dict(params, start=0), first, timestamp=_timestamp('2026-03-02'))
+        archive.close()
+
+        store = HistoryStore(str(Path(tmp_dir) / 'history.sqlite3'))
+        stats = Reprocessor(path, store, workers=0, max_organic_results=15).run(
+            BUSINESS, LOCATION, {'sprinkler repair': 'core'})
+        assert (stats['responses'], stats['days']) == (2, 2)
+
+        rows = store._connect().execute(
+            "SELECT observed_date, result FROM observations ORDER BY observed_date").fetchall()
+        organic = [json.loads(row['result'])['organic_results'] for row in rows]
+        assert [len(results) for results in organic] == [15, len(first['organic_results'])]
+        assert [entry['position'] for entry in organic[0]] == list(range(1, 16))
+        assert organic[0][-1]['domain'].startswith('page2.')
+
+        # With the client found on the first page, live paging stopped there
+        client = organic[1][0]['domain']
+        Reprocessor(path, store, workers=0, max_organic_results=15, stop_domains=[client]).run(
+            BUSINESS, LOCATION, {'sprinkler repair': 'core'})
+        row = store._connect().execute(
+            "SELECT result FROM observations WHERE observed_date = '2026-03-01'").fetchone()
+        assert len(json.loads(row['result'])['organic_results']) == len(first['organic_results'])
+        store.close()
+        print("✓ Reprocessing merged deeper archived pages")
+
+
+def main():
+    """Run all reprocessing tests."""
+    tests = [
+        test_reprocess_replaces_archived_days,
+        test_reprocess_command,
+        test_reprocess_merges_deeper_pages
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Response archive tests for LocalRankLens
+
+Appends raw responses, reads them back through the offset index and by
+walking the data file, and checks that the scraper archives full responses
+while returning projected ones.
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from response_archive import ResponseArchive, ResponseArchiveError
+from search_scraper import SearchScraper
+from data_processor import DataProcessor
+from serp_fakes import FakeSession, recorded_response
+
+LOCATION = 'Spokane, WA'
+
+
+def _params(query):
+    return {'api_key': 'secret', 'engine': 'google', 'q': query, 'location': LOCATION}
+
+
+def test_append_index_and_scan():
+    """Records come back by key, time range and file scan, and the index can be rebuilt."""
+    raw = recorded_response()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = str(Path(tmp_dir) / 'responses.lra')
+        archive = ResponseArchive(path)
+        for day in range(3):
+            for query in ('sprinkler repair', 'irrigation repair'):
+                response = dict(raw, search_metadata=dict(raw['search_metadata'], day=day))
+                archive.append(_params(query), response, timestamp=1000 + day * 86400)
+
+        assert archive.count() == 6
+        latest = archive.latest('sprinkler repair', LOCATION)
+        assert latest['timestamp'] == 1000 + 2 * 86400
+        assert latest['response']['search_metadata']['day'] == 2
+        assert 'api_key' not in latest['params'] and latest['engine'] == 'google'
+
+        second_day = list(archive.iter_records(since=1000 + 86400, until=1000 + 86400))
+        assert [record['query'] for record in second_day] == ['sprinkler repair', 'irrigation repair']
+        assert second_day[0]['response'] == dict(raw, search_metadata=dict(raw['search_metadata'], day=1))
+
+        # A crash mid-append leaves a partial record that scanning stops at
+        with open(path, 'ab') as f:
+            f.write(b'LR\x01\x00')
+        assert len(list(archive.scan())) == 6
+        assert archive.rebuild_index() == 6
+
+        stats = archive.get_stats()
+        assert stats['bytes'] < len(json.dumps(raw)) * 6 / 3
+        archive.close()
+
+        reopened = ResponseArchive(path)
+        assert [record['offset'] for record in reopened.iter_records()] == \
+            [entry['offset'] for entry in reopened.entries()]
+        reopened.close()
+
+        not_archive = Path(tmp_dir) / 'other.lra'
+        not_archive.write_bytes(b'{"not": "an archive"}')
+        try:
+            ResponseArchive(str(not_archive))
+            raise AssertionError("Expected ResponseArchiveError")
+        except ResponseArchiveError:
+            pass
+        print(f"✓ Archived 6 responses in {stats['bytes']} bytes ({stats['codec']})")
+
+
+def test_scraper_archives_full_responses():
+    """The scraper archives the full response and returns the projected one."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = str(Path(tmp_dir) / 'responses.lra')
+        scraper = SearchScraper('test-key', rate_limit_delay=0, project_responses=True, archive_path=path)
+        scraper.session = FakeSession(lambda params: recorded_response())
+        projected = scraper.search('sprinkler repair', LOCATION)
+
+        record = scraper.archive.latest('sprinkler repair', LOCATION)
+        assert record['response'] == recorded_response()
+        assert 'related_questions' in record['response'] and 'related_questions' not in projected
+
+        processor = DataProcessor()
+        assert processor.process_search_results(record['response'], 'sprinkler repair', 'core') == \
+            processor.process_search_results(projected, 'sprinkler repair', 'core')
+        scraper.archive.close()
+        print("✓ Scraper archived the full response")
+
+
+def main():
+    """Run all response archive tests."""
+    tests = [
+        test_append_index_and_scan,
+        test_scraper_archives_full_responses
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Result depth tests for LocalRankLens
+
+Checks that depth searches request only the results pages they need, stop
+once the client's domain is found, merge pages with continuous positions
+and that the configured depth reaches extraction.
+"""
+
+import sys
+import asyncio
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from config_manager import ConfigManager, ConfigurationError
+from data_processor import DataProcessor
+from search_scraper import SearchScraper, page_starts, merge_pages
+from async_search_scraper import AsyncSearchScraper
+from serp_fakes import FakeSession
+
+LOCATION = 'Spokane, WA'
+LAST_PAGE_START = 30
+
+
+def _page(start):
+    """A results page of 10 organic results from site<start+n>.com; the last page has no next link."""
+    page = {
+        'search_metadata': {'query': 'sprinkler repair'},
+        'local_results': {'places': [{'title': f'Place {n}', 'position': n} for n in range(1, 6)]},
+        'organic_results': [{'position': n, 'title': f'Result {start + n}',
+                             'link': f'https://www.site{start + n}.com/page'} for n in range(1, 11)]
+    }
+    if start < LAST_PAGE_START:
+        page['serpapi_pagination'] = {'next': f'https://serpapi.com/search.json?start={start + 10}'}
+    return page
+
+
+def _starts(scraper):
+    """The ``start`` offsets the scraper requested, in order."""
+    return [params['start'] for params in scraper.session.requests]
+
+
+def _scraper():
+    scraper = SearchScraper('test-key', rate_limit_delay=0, project_responses=True)
+    scraper.session = FakeSession(lambda params: _page(params['start']))
+    return scraper
+
+
+def test_page_planning_and_merge():
+    """Depths map to page offsets and merged pages keep continuous positions."""
+    assert page_starts(5) == [0]
+    assert page_starts(10) == [0]
+    assert page_starts(11) == [0, 10]
+    assert page_starts(50) == [0, 10, 20, 30, 40]
+
+    merged = merge_pages([_page(0), _page(10)])
+    assert [entry['position'] for entry in merged['organic_results']] == list(range(1, 21))
+    assert merged['organic_results'][10]['title'] == 'Result 11'
+    assert merged['local_results'] == _page(0)['local_results']
+    print("✓ Page planning and merging")
+
+
+def test_depth_search_pays_for_needed_pages():
+    """Only pages within the depth are requested, and paging stops at the client or the last page."""
+    scraper = _scraper()
+    result = scraper.search_depth('sprinkler repair', LOCATION, depth=20, page_concurrency=3)
+    assert sorted(_starts(scraper)) == [0, 10]
+    assert len(result['organic_results']) == 20
+
+    # The client ranks 14th: page 3 is never needed
+    scraper = _scraper()
+    result = scraper.search_depth('sprinkler repair', LOCATION, depth=50, stop_domains=['site14.com'])
+    assert _starts(scraper) == [0, 10]
+    assert len(result['organic_results']) == 20
+
+    # Found on the first page: no further pages at all
+    scraper = _scraper()
+    result = scraper.search_depth('sprinkler repair', LOCATION, depth=50, stop_domains=['site3.com'])
+    assert _starts(scraper) == [0] and len(result['organic_results']) == 10
+
+    # SerpAPI reports no page after start=30, so start=40 is never requested
+    scraper = _scraper()
+    result = scraper.search_depth('sprinkler repair', LOCATION, depth=50, page_concurrency=3)
+    assert sorted(_starts(scraper)) == [0, 10, 20, 30]
+    assert len(result['organic_results']) == 40
+
+    # Pages batched with the last one are requested but never change the result
+    scraper = _scraper()
+    assert scraper.search_depth('sprinkler repair', LOCATION, depth=50, page_concurrency=2) == result
+    assert sorted(_starts(scraper)) == [0, 10, 20, 30, 40]
+    print("✓ Depth searches request only the pages they need")
+
+
+def test_async_depth_search_matches_sync():
+    """The async scraper pages the same way as the sync one."""
+    requested = []
+
+    async def run():
+        scraper = AsyncSearchScraper('test-key', rate_limit_delay=0, project_responses=True)
+
+        async def request(params, query, location, kind='search'):
+            requested.append(params['start'])
+            return _page(params['start'])
+
+        scraper._request = request
+        return await scraper.search_depth('sprinkler repair', LOCATION, depth=50,
+                                          stop_domains=['site25.com'], page_concurrency=1)
+
+    result = asyncio.run(run())
+    assert requested == [0, 10, 20]
+    expected = _scraper().search_depth('sprinkler repair', LOCATION, depth=50, stop_domains=['site25.com'])
+    assert result == expected
+    print("✓ Async depth search matches the sync one")
+
+
+def test_depth_reaches_extraction():
+    """Report settings are validated and their depth limits extraction."""
+    config = {
+        'business_name': 'Test Irrigation',
+        'location': {'city': 'Spokane', 'state': 'WA'},
+        'keywords': {'core': ['sprinkler repair']},
+        'output_prefix': 'test',
+        'report_settings': {'max_maps_results': '4', 'max_organic_results': 25,
+                            'client_domain': 'https://www.Site14.com/'}
+    }
+    settings = ConfigManager(config=config, load_env=False).get_report_settings()
+    assert (settings['max_maps_results'], settings['max_organic_results']) == (4, 25)
+    assert settings['client_domain'] == 'site14.com'
+    assert settings['page_concurrency'] == 1
+
+    response = _scraper().search_depth('sprinkler repair', LOCATION, depth=25)
+    processor = DataProcessor(max_maps_results=settings['max_maps_results'],
+                              max_organic_results=settings['max_organic_results'])
+    result = processor.process_search_results(response, 'sprinkler repair', 'core')
+    assert len(result['maps_listings']) == 4
+    assert [entry['position'] for entry in result['organic_results']] == list(range(1, 26))
+    assert len(DataProcessor().process_search_results(response, 'sprinkler repair', 'core')['organic_results']) == 5
+
+    config['report_settings'] = {'max_organic_results': 0}
+    try:
+        ConfigManager(config=config, load_env=False).get_report_settings()
+        raise AssertionError("Expected ConfigurationError")
+    except ConfigurationError:
+        pass
+    print("✓ Configured depth reaches extraction")
+
+
+def main():
+    """Run all result depth tests."""
+    tests = [
+        test_page_planning_and_merge,
+        test_depth_search_pays_for_needed_pages,
+        test_async_depth_search_matches_sync,
+        test_depth_reaches_extraction
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
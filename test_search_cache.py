@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Response cache tests for LocalRankLens
+
+Tests the persistent SerpAPI response cache and its integration with
+SearchScraper without making actual API calls.
+"""
+
+import sys
+import json
+import asyncio
+import time
+import tempfile
+import threading
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, 'src')
+
+from response_cache import ResponseCache, request_fingerprint
+from search_scraper import SearchScraper, SerpResponse
+from async_search_scraper import AsyncSearchScraper
+from data_processor import DataProcessor
+from serp_fakes import FakeSession, recorded_response
+
+
+def _counting_session(delay=0.0):
+    """A session answering each query with the number of requests made so far."""
+    session = FakeSession(lambda params: {'search_metadata': {'query': params['q']}, 'call': session.calls},
+                          delay=delay)
+    return session
+
+
+def _recorded_session():
+    """A session returning the recorded debug response with a knowledge graph."""
+    data = recorded_response()
+    data['knowledge_graph'] = {'title': 'Test Irrigation', 'rating': 4.8, 'header_images': ['x']}
+    return FakeSession(lambda params: data)
+
+
+def _cache(tmp_dir, **kwargs):
+    return ResponseCache(str(Path(tmp_dir) / 'cache.sqlite3'), **kwargs)
+
+
+def test_fingerprint_ignores_api_key():
+    """Keys are stable across API keys and equivalent value types."""
+    a = {'api_key': 'one', 'engine': 'google', 'q': 'sprinkler repair', 'num': 10}
+    b = {'q': 'sprinkler repair', 'num': '10', 'engine': 'google', 'api_key': 'two'}
+    assert request_fingerprint(a) == request_fingerprint(b)
+    assert request_fingerprint(a) != request_fingerprint(dict(a, q='other'))
+    print("✓ Fingerprints exclude api_key and normalize values")
+
+
+def test_ttl_and_lru_eviction():
+    """Entries expire per engine and the least recently used are evicted."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = _cache(tmp_dir, ttls={'google_maps': 0.05}, max_entries=2)
+        maps = {'engine': 'google_maps', 'q': 'maps'}
+        cache.set(maps, {'n': 0})
+        time.sleep(0.1)
+        assert cache.get(maps) is None
+
+        first, second, third = ({'engine': 'google', 'q': str(i)} for i in range(3))
+        cache.set(first, {'n': 1})
+        cache.set(second, {'n': 2})
+        assert cache.get(first) == {'n': 1}
+        cache.set(third, {'n': 3})
+
+        assert cache.get(second) is None
+        assert cache.get(first) == {'n': 1}
+        stats = cache.get_stats()
+        assert stats['entries'] == 2 and stats['evictions'] >= 1
+        print(f"✓ TTL expiry and LRU eviction work: {stats}")
+
+
+def test_scraper_uses_cache_with_bypass_and_refresh():
+    """SearchScraper reads through the cache and honours bypass/refresh."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = SearchScraper('test-key', rate_limit_delay=0, cache=_cache(tmp_dir))
+        scraper.session = _counting_session()
+
+        first = scraper.search('sprinkler repair', 'Spokane')
+        second = scraper.search('sprinkler repair', 'Spokane')
+        assert first == second and scraper.session.calls == 1
+
+        scraper.search('sprinkler repair', 'Spokane', bypass_cache=True)
+        assert scraper.session.calls == 2
+        assert scraper.search('sprinkler repair', 'Spokane')['call'] == 1
+
+        refreshed = scraper.search('sprinkler repair', 'Spokane', refresh_cache=True)
+        assert refreshed['call'] == 3
+        assert scraper.search('sprinkler repair', 'Spokane')['call'] == 3
+
+        scraper.search_maps('sprinkler repair', 'Spokane')
+        scraper.search_maps('sprinkler repair', 'Spokane')
+        assert scraper.session.calls == 4
+        print(f"✓ Cache served repeats: {scraper.cache.get_stats()}")
+
+
+def test_concurrent_duplicates_are_coalesced():
+    """Identical concurrent searches share one request."""
+    scraper = SearchScraper('test-key', rate_limit_delay=0)
+    scraper.session = _counting_session(delay=0.2)
+    results = []
+
+    def worker():
+        results.append(scraper.search('sprinkler repair', 'Spokane'))
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert scraper.session.calls == 1
+    assert scraper.get_requests_saved() == 4
+    assert all(result is results[0] for result in results)
+    print(f"✓ 5 concurrent duplicates cost 1 request ({scraper.get_requests_saved()} saved)")
+
+
+def test_concurrent_refresh_is_not_coalesced():
+    """A refresh arriving during a normal lookup gets a fresh response, sync and async."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        scraper = SearchScraper('test-key', rate_limit_delay=0, cache=_cache(tmp_dir))
+        scraper.session = _counting_session(delay=0.2)
+        results = {}
+
+        def normal():
+            results['normal'] = scraper.search('sprinkler repair', 'Spokane')
+
+        thread = threading.Thread(target=normal)
+        thread.start()
+        time.sleep(0.05)
+        results['refresh'] = scraper.search('sprinkler repair', 'Spokane', refresh_cache=True)
+        thread.join()
+
+        # Without the refresh's own request both would share the first response object
+        assert scraper.session.calls == 2
+        assert results['refresh'] is not results['normal']
+
+    calls = []
+
+    async def run():
+        async_scraper = AsyncSearchScraper('test-key', rate_limit_delay=0)
+
+        async def request(params, query, location, kind='search'):
+            calls.append(kind)
+            call = len(calls)
+            await asyncio.sleep(0.05)
+            return {'call': call}
+
+        async_scraper._request = request
+        return await asyncio.gather(
+            async_scraper.search('sprinkler repair', 'Spokane'),
+            async_scraper.search('sprinkler repair', 'Spokane'),
+            async_scraper.search('sprinkler repair', 'Spokane', refresh_cache=True)
+        )
+
+    first, duplicate, refreshed = asyncio.run(run())
+    assert len(calls) == 2 and first == duplicate and refreshed != first
+    print("✓ Concurrent refreshes are not coalesced with normal lookups")
+
+
+def test_projected_responses_process_identically():
+    """Projected responses drop unused data, process the same and are cached apart."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cache = _cache(tmp_dir)
+        full = SearchScraper('test-key', rate_limit_delay=0, cache=cache)
+        projected = SearchScraper('test-key', rate_limit_delay=0, cache=cache,
+                                  project_responses=True, keep_raw_body=True)
+        full.session, projected.session = _recorded_session(), _recorded_session()
+
+        full_response = full.search('sprinkler repair', 'Spokane')
+        projected_response = projected.search('sprinkler repair', 'Spokane')
+        assert projected.session.calls == 1, "projected responses must not reuse full cache entries"
+        assert 'related_questions' in full_response and 'related_questions' not in projected_response
+        assert len(projected_response['organic_results']) == len(full_response['organic_results'])
+        assert set(projected_response['serpapi_pagination']) == {'next'}
+        assert len(json.dumps(projected_response)) < len(json.dumps(full_response)) / 2
+
+        assert isinstance(projected_response, SerpResponse)
+        assert json.loads(projected_response.raw_body) == full_response
+        cached = projected.search('sprinkler repair', 'Spokane')
+        assert projected.session.calls == 1 and not hasattr(cached, 'raw_body')
+
+        processor = DataProcessor()
+        assert processor.process_search_results(cached, 'sprinkler repair', 'core') == \
+            processor.process_search_results(full_response, 'sprinkler repair', 'core')
+        print(f"✓ Projected response is {len(json.dumps(cached))} of {len(json.dumps(full_response))} bytes "
+              f"and processes identically")
+
+
+def main():
+    """Run all response cache tests."""
+    tests = [
+        test_fingerprint_ignores_api_key,
+        test_ttl_and_lru_eviction,
+        test_scraper_uses_cache_with_bypass_and_refresh,
+        test_concurrent_duplicates_are_coalesced,
+        test_concurrent_refresh_is_not_coalesced,
+        test_projected_responses_process_identically
+    ]
+
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"✗ {test.__name__} failed: {e}")
+
+    print(f"\nTest Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())